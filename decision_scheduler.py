@@ -0,0 +1,125 @@
+"""
+Decision-rate scheduler: query a controller every k frames and hold its actions in between.
+
+The game runs at 60 Hz and every controller (SimpleFuzzyAI, FuzzyAI,
+EvolvableFuzzyAI, NeuralAI, MarlPolicyAI) is asked for a decision every
+frame, while sensible play only needs 10-20 Hz. DecisionScheduler wraps any
+object with decide_action() and reuses the last actions until:
+- `interval` frames have passed since the last decision
+- an event fires: either player's health or lives change (hit / death),
+  or the controlled player lands (its y stops changing after a jump or fall)
+- the last decision pressed 'up'
+
+The last rule keeps the double-jump hold logic intact: the controllers count
+jump frames per decide_action() call (max_jump_frames / max_jump_hold), so
+while a jump is in progress the controller runs every frame exactly as
+before. Holding starts again once 'up' is released.
+
+Usage:
+    ai = DecisionScheduler(FuzzyAI(), interval=4)
+    actions = ai.decide_action(me, enemy)
+    print(ai.format_stats())
+"""
+import time
+from typing import Dict, Optional
+
+
+class DecisionScheduler:
+    """
+    Args:
+        ai: Controller with decide_action(me, enemy, ...)
+        interval: Frames between scheduled decisions (1 = every frame)
+        events: Also decide immediately on hits, deaths and landings
+    """
+
+    def __init__(self, ai, interval: int = 4, events: bool = True):
+        if interval < 1:
+            raise ValueError(f"interval must be >= 1, got {interval}")
+        self.ai = ai
+        self.interval = interval
+        self.events = events
+        self.reset()
+
+    def __getattr__(self, name):
+        # Expose the wrapped controller (genome, compile(), memo_caches, ...)
+        if name == 'ai':
+            raise AttributeError(name)
+        return getattr(self.ai, name)
+
+    def reset(self, keep_stats: bool = False):
+        """
+        Forget held actions (the wrapped controller is reset too). Call it
+        before every match.
+
+        Args:
+            keep_stats: Keep the decision counters, to report several matches together
+        """
+        self.held: Optional[Dict[str, bool]] = None
+        self.frames_since_decision = 0
+        self.last_snapshot = None
+        self.last_dy = 0.0
+        if hasattr(self.ai, 'reset'):
+            self.ai.reset()
+        if keep_stats:
+            return
+        self.frames = 0
+        self.decisions = 0
+        self.event_decisions = 0
+        self.decision_seconds = 0.0
+
+    def _event(self, me: Dict, enemy: Dict) -> bool:
+        snapshot = (me['health'], me['lives'], enemy['health'], enemy['lives'], me['y'])
+        previous, self.last_snapshot = self.last_snapshot, snapshot
+        if previous is None:
+            return True
+        dy = snapshot[4] - previous[4]
+        landed = dy == 0 and self.last_dy != 0
+        self.last_dy = dy
+        return snapshot[:4] != previous[:4] or landed
+
+    def decide_action(self, me: Dict, enemy: Dict, *args, **kwargs) -> Dict[str, bool]:
+        self.frames += 1
+        self.frames_since_decision += 1
+        event = self._event(me, enemy) if self.events else False
+
+        if (self.held is not None and not event and not self.held.get('up')
+                and self.frames_since_decision < self.interval):
+            return self.held
+
+        start = time.perf_counter()
+        self.held = self.ai.decide_action(me, enemy, *args, **kwargs)
+        self.decision_seconds += time.perf_counter() - start
+        self.decisions += 1
+        if event and self.frames_since_decision < self.interval:
+            self.event_decisions += 1
+        self.frames_since_decision = 0
+        return self.held
+
+    @property
+    def decision_rate(self) -> float:
+        """Fraction of frames on which the controller actually ran."""
+        return self.decisions / self.frames if self.frames else 0.0
+
+    @property
+    def time_saved(self) -> float:
+        """Estimated seconds of inference skipped (skipped frames x average decision cost)."""
+        if not self.decisions:
+            return 0.0
+        return (self.frames - self.decisions) * (self.decision_seconds / self.decisions)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'interval': self.interval,
+            'frames': self.frames,
+            'decisions': self.decisions,
+            'event_decisions': self.event_decisions,
+            'decision_rate': self.decision_rate,
+            'decision_ms': 1000.0 * self.decision_seconds / self.decisions if self.decisions else 0.0,
+            'time_saved_s': self.time_saved,
+        }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (f"{s['decisions']}/{s['frames']} frames decided ({s['decision_rate']:.0%}, "
+                f"{s['event_decisions']} by events), {s['decision_ms']:.2f} ms/decision, "
+                f"~{s['time_saved_s'] * 1000:.0f} ms saved")
@@ -0,0 +1,56 @@
+"""
+Export trained MARL (PPO) policies to NumPy .npz files.
+
+The exported files are loaded by nn.marl_policy_ai.MarlPolicyAI, which runs
+the policy without stable-baselines3/torch (play_vs_marl_ai.py,
+tournament_eval.py and the self-play opponent all use it).
+
+Run:
+    python export_marl_policy.py                      # every .zip in models_marl/
+    python export_marl_policy.py models_marl/ppo_gunmayhem_marl.zip
+"""
+import os
+import sys
+import glob
+import argparse
+
+import numpy as np
+from stable_baselines3 import PPO
+
+from feature_extraction import INPUT_SIZE
+from nn.marl_policy_ai import MarlPolicyAI, export_policy
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(PROJECT_ROOT, "models_marl")
+
+
+def export_zip(zip_path: str, check_samples: int = 256) -> str:
+    """Export one PPO .zip next to itself and check actions match SB3."""
+    model = PPO.load(zip_path)
+    npz_path = export_policy(model, os.path.splitext(zip_path)[0] + '.npz')
+
+    # Sanity check: NumPy and SB3 deterministic actions must agree
+    obs = np.random.default_rng(0).normal(0.0, 1.0, size=(check_samples, INPUT_SIZE)).astype(np.float32)
+    sb3_actions, _ = model.predict(obs, deterministic=True)
+    np_actions, _ = MarlPolicyAI.load(npz_path).predict(obs)
+    agreement = float(np.mean(np.asarray(sb3_actions) == np_actions))
+    print(f"{os.path.basename(zip_path)} -> {os.path.basename(npz_path)} "
+          f"({os.path.getsize(npz_path)} bytes, action agreement {agreement:.1%})")
+    return npz_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export PPO policies to NumPy .npz")
+    parser.add_argument('models', nargs='*', help='PPO .zip files (default: all in models_marl/)')
+    args = parser.parse_args()
+
+    paths = args.models or sorted(glob.glob(os.path.join(MODEL_DIR, "*.zip")))
+    if not paths:
+        print(f"No models found in {MODEL_DIR}. Run marl_trainer.py first.")
+        sys.exit(1)
+    for path in paths:
+        export_zip(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,166 @@
 """
 Shared feature extraction logic for MARL.
 Based on neural_ai.py.
+
+get_observation builds the original 12 features. get_extended_observation
+appends weapon state and the K nearest incoming bullets, computed with
+NumPy over bullet arrays (see bullet_arrays) instead of per-bullet loops.
 """
 import math
 import numpy as np
+from collections import namedtuple
 from typing import Dict, List
 
 # These must match your neural_genome.py for consistency
 INPUT_SIZE = 12
 
-def get_observation(me: Dict, enemy: Dict) -> np.ndarray:
+# Extended observation: base features + weapon state + K nearest incoming bullets
+BULLET_SPEED = 1000.0        # px/s (PlayState::spawnBullet)
+BULLET_HEIGHT = 4.0          # bullet collider is 8x4
+K_NEAREST_BULLETS = 4
+BULLET_FEATURES = 6          # dx, dy, dir_x, dir_y, time-to-impact, present
+MAX_TIME_TO_IMPACT = 2.0     # seconds; later impacts are clipped
+WEAPON_FEATURES = 4          # my ammo, my reloading, enemy ammo, enemy reloading
+EXTENDED_INPUT_SIZE = INPUT_SIZE + WEAPON_FEATURES + K_NEAREST_BULLETS * BULLET_FEATURES
+
+BulletArrays = namedtuple('BulletArrays', ['x', 'y', 'direction_x', 'direction_y', 'owner_id'])
+
+def base_features_into(me: Dict, enemy: Dict, out: np.ndarray) -> np.ndarray:
     """
-    Builds the 12 normalized features for the RL agent.
+    Writes the 12 normalized features into `out` (any float array of
+    INPUT_SIZE) and returns it. This is the one feature layout: NeuralAI
+    fills its preallocated vector with it every frame, and base_features,
+    get_observation (MARL) and nn/population.features_batch build on it.
     """
     # Positions normalized by screen (assumed 1280x720-like)
     dx = (enemy['x'] - me['x']) / 640.0  # ~ -2..2
     dy = (enemy['y'] - me['y']) / 360.0  # ~ -2..2 (positive means enemy lower)
-    dist = math.hypot(dx, dy)  # ~0..3
+    out[0] = dx
+    out[1] = dy
+    out[2] = math.hypot(dx, dy)  # ~0..3
     
-    me_hp = (me['health'] / 100.0)
-    en_hp = (enemy['health'] / 100.0)
+    out[3] = me['health'] / 100.0
+    out[4] = enemy['health'] / 100.0
     
-    me_lives = (me['lives'] / 3.0)  # Assuming 3 max lives, adjust if needed
-    en_lives = (enemy['lives'] / 3.0) # Assuming 3 max lives, adjust if needed
+    out[5] = me['lives'] / 3.0  # Assuming 3 max lives, adjust if needed
+    out[6] = enemy['lives'] / 3.0 # Assuming 3 max lives, adjust if needed
     
     # Facing: -1 left, +1 right
-    facing = -1.0 if me.get('facing_direction', 1) == 0 else 1.0
+    out[7] = -1.0 if me.get('facing_direction', 1) == 0 else 1.0
     
     # Height indicators
-    above = 1.0 if me['y'] < enemy['y'] - 40 else 0.0
-    below = 1.0 if me['y'] > enemy['y'] + 40 else 0.0
-    same_y = 1.0 if abs(me['y'] - enemy['y']) <= 40 else 0.0
+    out[8] = 1.0 if me['y'] < enemy['y'] - 40 else 0.0
+    out[9] = 1.0 if me['y'] > enemy['y'] + 40 else 0.0
+    out[10] = 1.0 if abs(me['y'] - enemy['y']) <= 40 else 0.0
     
     # Bias-like constant
-    bias = 1.0
-    
-    features = [
-        dx, dy, dist, me_hp, en_hp, me_lives, en_lives, 
-        facing, above, below, same_y, bias
-    ]
-    
-    return np.array(features, dtype=np.float32)
\ No newline at end of file
+    out[11] = 1.0
+    return out
+
+
+def base_features(me: Dict, enemy: Dict) -> List[float]:
+    """The 12 normalized features as a list (see base_features_into)."""
+    return base_features_into(me, enemy, np.empty(INPUT_SIZE, dtype=np.float64)).tolist()
+
+
+def get_observation(me: Dict, enemy: Dict) -> np.ndarray:
+    """
+    Builds the 12 normalized features for the RL agent.
+    """
+    return base_features_into(me, enemy, np.empty(INPUT_SIZE, dtype=np.float32))
+
+
+def bullet_arrays(bullets: Dict) -> BulletArrays:
+    """
+    Converts bullet state into NumPy arrays.
+
+    Accepts either GameState.get_bullet_arrays() (columns, no per-bullet
+    Python objects) or GameState.get_all_bullets() (dict of dicts, kept for
+    older builds of the gunmayhem module).
+    """
+    if 'owner_id' in bullets and not isinstance(bullets['owner_id'], dict):
+        return BulletArrays(
+            np.asarray(bullets['x'], dtype=np.float32),
+            np.asarray(bullets['y'], dtype=np.float32),
+            np.asarray(bullets['direction_x'], dtype=np.float32),
+            np.asarray(bullets['direction_y'], dtype=np.float32),
+            np.asarray(bullets['owner_id'], dtype=str),
+        )
+
+    values = [b for b in bullets.values() if not b.get('expired', False)]
+    n = len(values)
+    return BulletArrays(
+        np.fromiter((b['x'] for b in values), dtype=np.float32, count=n),
+        np.fromiter((b['y'] for b in values), dtype=np.float32, count=n),
+        np.fromiter((b['direction_x'] for b in values), dtype=np.float32, count=n),
+        np.fromiter((b['direction_y'] for b in values), dtype=np.float32, count=n),
+        np.array([b['owner_id'] for b in values], dtype=str),
+    )
+
+
+def _weapon_features(state: Dict) -> List[float]:
+    max_ammo = state.get('max_ammo', 0)
+    ammo = (state.get('ammo', 0) / max_ammo) if max_ammo else 1.0
+    reloading = 1.0 if state.get('is_reloading', False) else 0.0
+    return [ammo, reloading]
+
+
+def nearest_incoming_bullets(me: Dict, bullets: BulletArrays, k: int = K_NEAREST_BULLETS) -> np.ndarray:
+    """
+    Encodes the k most urgent bullets heading at `me` into a (k, 6) array.
+
+    A bullet is incoming when it is not mine, is moving towards me and its
+    path passes within my collider. Rows are sorted by time to impact and
+    zero-padded; the last column flags which rows hold a bullet.
+    """
+    out = np.zeros((k, BULLET_FEATURES), dtype=np.float32)
+    if bullets.x.size == 0:
+        return out
+
+    w = me.get('width', 10.0)
+    h = me.get('height', 20.0)
+    # Vector from each bullet to my collider center
+    rx = (me['x'] + 0.5 * w) - bullets.x
+    ry = (me['y'] + 0.5 * h) - bullets.y
+    # Distance along the bullet's path, and miss distance across it
+    along = rx * bullets.direction_x + ry * bullets.direction_y
+    across = np.abs(rx * bullets.direction_y - ry * bullets.direction_x)
+    half_extent = 0.5 * (h + BULLET_HEIGHT) * np.abs(bullets.direction_x) + \
+                  0.5 * (w + BULLET_HEIGHT) * np.abs(bullets.direction_y)
+
+    incoming = (bullets.owner_id != str(me.get('id', ''))) & (along >= 0.0) & (across <= half_extent)
+    idx = np.flatnonzero(incoming)
+    if idx.size == 0:
+        return out
+
+    tti = along[idx] / BULLET_SPEED
+    if idx.size > k:
+        keep = np.argpartition(tti, k - 1)[:k]
+        idx, tti = idx[keep], tti[keep]
+    order = np.argsort(tti)
+    idx, tti = idx[order], tti[order]
+
+    n = idx.size
+    out[:n, 0] = -rx[idx] / 640.0   # bullet relative to me, same scale as dx/dy
+    out[:n, 1] = -ry[idx] / 360.0
+    out[:n, 2] = bullets.direction_x[idx]
+    out[:n, 3] = bullets.direction_y[idx]
+    out[:n, 4] = np.minimum(tti, MAX_TIME_TO_IMPACT) / MAX_TIME_TO_IMPACT
+    out[:n, 5] = 1.0
+    return out
+
+
+def get_extended_observation(me: Dict, enemy: Dict, bullets, k: int = K_NEAREST_BULLETS) -> np.ndarray:
+    """
+    Builds the fixed-size bullet-aware observation (float32):
+    12 base features, weapon state for both players, then k rows of
+    nearest incoming bullets (see nearest_incoming_bullets).
+
+    `bullets` may be a BulletArrays or anything bullet_arrays() accepts.
+    """
+    if not isinstance(bullets, BulletArrays):
+        bullets = bullet_arrays(bullets)
+    base = get_observation(me, enemy)
+    weapon = np.array(_weapon_features(me) + _weapon_features(enemy), dtype=np.float32)
+    incoming = nearest_incoming_bullets(me, bullets, k)
+    return np.concatenate([base, weapon, incoming.ravel()])
@@ -3,4 +3,8 @@
 __all__ = [
     "fuzzy_ai",
     "evolvable_fuzzy_ai",
+    "lookup_table",
+    "batched",
+    "analytic",
+    "rule_base",
 ]
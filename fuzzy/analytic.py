@@ -0,0 +1,137 @@
+"""
+Analytic (closed-form) Mamdani inference for the fuzzy controllers.
+
+Every fuzzy set in FuzzyAI / EvolvableFuzzyAI is a triangle, so the output
+of a rule base - the max of the clipped output triangles - is piecewise
+linear with breakpoints that can be listed exactly:
+- triangle vertices
+- where an edge of one term crosses the cut level of any term
+- where edges of two different terms intersect
+Between consecutive breakpoints the aggregate is a straight line, so its
+area and first moment (and hence the centroid) are sums of trapezoids.
+
+This replaces scikit-fuzzy's sampled universes (1301/801/101 points) and
+allocates no arrays per frame: it is plain float math on a handful of
+points. Input memberships are evaluated the way scikit-fuzzy does
+(triangle sampled on the integer universe, linearly interpolated), so the
+only difference to scikit-fuzzy is its linear interpolation across the
+point where two output sets intersect between two samples - a sliver well
+below 0.1 aggression/jump units.
+
+Select with FuzzyAI(inference='analytic') or EvolvableFuzzyAI(genome, inference='analytic').
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from fuzzy.rule_base import (
+    AGGRESSION_RULES, JUMP_RULES, NO_RULE_FIRED, UNIVERSES, sampled_membership, trimf_value,
+)
+
+
+def _edges(abc: Sequence[float]) -> List[Tuple[float, float, float, float]]:
+    """Edges of a triangle as (x_start, x_end, slope, intercept)."""
+    a, b, c = abc
+    edges = []
+    if b > a:
+        edges.append((a, b, 1.0 / (b - a), -a / (b - a)))
+    if c > b:
+        edges.append((b, c, -1.0 / (c - b), c / (c - b)))
+    return edges
+
+
+def clipped_centroid(terms: Sequence[Tuple[Sequence[float], float]], low: float, high: float) -> float:
+    """
+    Exact centroid of max_t(min(cut_t, triangle_t(x))) on [low, high].
+
+    Args:
+        terms: (abc, cut) per output term
+    """
+    active = [(abc, cut) for abc, cut in terms if cut > 0.0]
+    if not active:
+        return NO_RULE_FIRED
+
+    levels = [cut for _, cut in active]
+    edges = [_edges(abc) for abc, _ in active]
+
+    xs = [low, high]
+    for abc, _ in active:
+        xs.extend(abc)
+    for term_edges in edges:
+        for x0, x1, m, q in term_edges:
+            for level in levels:
+                x = (level - q) / m
+                if x0 <= x <= x1:
+                    xs.append(x)
+    for i in range(len(edges)):
+        for j in range(i + 1, len(edges)):
+            for x0, x1, m, q in edges[i]:
+                for y0, y1, n, r in edges[j]:
+                    if m != n:
+                        x = (r - q) / (m - n)
+                        if max(x0, y0) <= x <= min(x1, y1):
+                            xs.append(x)
+    xs = sorted(x for x in xs if low <= x <= high)
+
+    def aggregate(x):
+        y = 0.0
+        for abc, cut in active:
+            v = trimf_value(x, *abc)
+            if v > cut:
+                v = cut
+            if v > y:
+                y = v
+        return y
+
+    area = 0.0
+    moment = 0.0
+    x1 = xs[0]
+    y1 = aggregate(x1)
+    for x2 in xs[1:]:
+        if x2 == x1:
+            continue
+        y2 = aggregate(x2)
+        width = x2 - x1
+        area += 0.5 * width * (y1 + y2)
+        moment += x1 * 0.5 * width * (y1 + y2) + width * width * (y1 + 2.0 * y2) / 6.0
+        x1, y1 = x2, y2
+    if area <= 0.0:
+        return NO_RULE_FIRED
+    return moment / area
+
+
+class AnalyticInference:
+    """
+    Closed-form evaluation of the controllers' two rule bases.
+
+    Args:
+        params: (variable, term) -> [a, b, c] for every fuzzy term, e.g.
+                fuzzy_ai.MEMBERSHIP_PARAMS or evolvable_fuzzy_ai.membership_params(genes)
+    """
+
+    def __init__(self, params: Dict[Tuple[str, str], Sequence[float]]):
+        self.params = {key: tuple(float(v) for v in abc) for key, abc in params.items()}
+
+    def _infer(self, output_name: str, rules, inputs: Dict[str, float]) -> float:
+        memberships = {}
+        cuts: Dict[str, float] = {}
+        for antecedents, label in rules:
+            strength = 1.0
+            for key in antecedents:
+                if key not in memberships:
+                    var_name = key[0]
+                    low, high = UNIVERSES[var_name]
+                    memberships[key] = sampled_membership(inputs[var_name], self.params[key], low, high)
+                strength = min(strength, memberships[key])
+            cuts[label] = max(cuts.get(label, 0.0), strength)
+
+        low, high = UNIVERSES[output_name]
+        return clipped_centroid([(self.params[(output_name, label)], cut) for label, cut in cuts.items()],
+                                low, high)
+
+    def aggression(self, distance: float, health: float, enemy_health: float) -> float:
+        return self._infer('aggression', AGGRESSION_RULES,
+                           {'distance': distance, 'health': health, 'enemy_health': enemy_health})
+
+    def jump_desire(self, height_diff: float, health: float, distance: float) -> float:
+        return self._infer('should_jump', JUMP_RULES,
+                           {'height_diff': height_diff, 'health': health, 'distance': distance})
@@ -0,0 +1,96 @@
+"""
+Batched fuzzy inference for many EvolvableFuzzyAI genomes at once.
+
+GA evaluation runs controllers that only differ in their membership
+breakpoints, yet each one pays for two scalar scikit-fuzzy computes per
+frame. BatchedFuzzyInference evaluates the same rule base (see
+fuzzy/rule_base.py, shared with the controllers) for B genomes
+and B input tuples as array ops:
+
+- trimf memberships with per-genome breakpoints, sampled on the same
+  integer universes as the skfuzzy Antecedents and interpolated like
+  interp_membership, so results match EvolvableFuzzyAI
+- min (AND) / max (accumulation) rule activation
+- centroid defuzzification of the clipped output sets
+
+Usage:
+    engine = BatchedFuzzyInference([genome1, genome2])
+    aggression, jump_desire = engine.compute(distance, height_diff, health, enemy_health)
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from fuzzy.evolvable_fuzzy_ai import membership_params
+from fuzzy.lookup_table import mamdani_centroid, rule_cuts
+from fuzzy.rule_base import AGGRESSION_RULES, JUMP_RULES, UNIVERSES, sampled_trimf, trimf
+
+
+class BatchedFuzzyInference:
+    """
+    Rule base of EvolvableFuzzyAI evaluated for B genomes in one call.
+
+    Every method takes (B,) input arrays (scalars are broadcast) and returns
+    (B,) outputs; row i uses genome i.
+    """
+
+    def __init__(self, genomes: Sequence):
+        gene_dicts = [g.genes if hasattr(g, 'genes') else g for g in genomes]
+        per_genome = [membership_params(genes) for genes in gene_dicts]
+        self.size = len(per_genome)
+
+        # (var, term) -> (a, b, c) arrays of shape (B,)
+        self.params: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for key in per_genome[0]:
+            abc = np.array([p[key] for p in per_genome], dtype=np.float64)
+            self.params[key] = (abc[:, 0], abc[:, 1], abc[:, 2])
+
+        # Output sets are not evolved: sample them once on their universe
+        self.output_universes = {}
+        self.output_mfs = {}
+        for name in ('aggression', 'should_jump'):
+            low, high = UNIVERSES[name]
+            universe = np.arange(low, high + 1, dtype=np.float64)
+            self.output_universes[name] = universe
+            self.output_mfs[name] = {
+                label: trimf(universe, *per_genome[0][(var, label)])
+                for (var, label) in per_genome[0] if var == name
+            }
+
+    def membership(self, var_name: str, label: str, x) -> np.ndarray:
+        a, b, c = self.params[(var_name, label)]
+        low, high = UNIVERSES[var_name]
+        return sampled_trimf(x, a, b, c, low, high)
+
+    def _infer(self, output_name: str, rules, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        inputs = {name: np.broadcast_to(np.asarray(v, dtype=np.float64), (self.size,))
+                  for name, v in inputs.items()}
+        cuts = rule_cuts(rules, lambda var_name, label: self.membership(var_name, label, inputs[var_name]))
+        labels = list(cuts.keys())
+        return mamdani_centroid(self.output_universes[output_name],
+                                [self.output_mfs[output_name][label] for label in labels],
+                                [cuts[label] for label in labels])
+
+    def aggression(self, distance, health, enemy_health) -> np.ndarray:
+        return self._infer('aggression', AGGRESSION_RULES,
+                           {'distance': distance, 'health': health, 'enemy_health': enemy_health})
+
+    def jump_desire(self, height_diff, health, distance) -> np.ndarray:
+        return self._infer('should_jump', JUMP_RULES,
+                           {'height_diff': height_diff, 'health': health, 'distance': distance})
+
+    def compute(self, distance, height_diff, health, enemy_health) -> Tuple[np.ndarray, np.ndarray]:
+        """Aggression and jump desire vectors for all agents."""
+        return (self.aggression(distance, health, enemy_health),
+                self.jump_desire(height_diff, health, distance))
+
+    def compute_states(self, ai_states: Sequence[Dict], enemy_states: Sequence[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """compute() from player state dicts, with the same inputs as decide_action()."""
+        ai_x = np.array([s['x'] for s in ai_states], dtype=np.float64)
+        ai_y = np.array([s['y'] for s in ai_states], dtype=np.float64)
+        enemy_x = np.array([s['x'] for s in enemy_states], dtype=np.float64)
+        enemy_y = np.array([s['y'] for s in enemy_states], dtype=np.float64)
+        health = np.array([s['health'] for s in ai_states], dtype=np.float64)
+        enemy_health = np.array([s['health'] for s in enemy_states], dtype=np.float64)
+        return self.compute(np.abs(ai_x - enemy_x), ai_y - enemy_y, health, enemy_health)
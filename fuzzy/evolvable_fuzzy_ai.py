@@ -11,8 +11,15 @@ import sys
 import os
 
 # Import the original fuzzy AI
-from fuzzy.fuzzy_ai import FuzzyAI, SimpleFuzzyAI, FUZZY_AVAILABLE
+from fuzzy.fuzzy_ai import FuzzyAI, SimpleFuzzyAI, FUZZY_AVAILABLE, INFERENCE_BACKENDS
 from ga.fuzzy_genome import FuzzyGenome
+from fuzzy.lookup_table import compile_surfaces, describe as describe_surfaces
+from fuzzy.surface_cache import CACHE_DIR as SURFACE_CACHE_DIR, load_or_compile
+from fuzzy.analytic import AnalyticInference
+from fuzzy.rule_base import AGGRESSION_RULES, JUMP_RULES, UNIVERSES, skfuzzy_rules, universe
+from navigation import navigation_graph
+from threat_assessment import apply_dodge, assess
+from decision_trace import nav_bits
 
 if FUZZY_AVAILABLE:
     import numpy as np
@@ -20,229 +27,236 @@ if FUZZY_AVAILABLE:
     from skfuzzy import control as ctrl
 
 
+def _shared_universe(name):
+    shared = universe(name)
+    shared.flags.writeable = False
+    return shared
+
+
+if FUZZY_AVAILABLE:
+    # Read-only universes shared by every instance (skfuzzy only reads them)
+    SHARED_UNIVERSES = {name: _shared_universe(name) for name in UNIVERSES}
+
+# Attributes set by _build_skfuzzy(): fuzzy variables, rules, control systems
+_SKFUZZY_ATTRS = frozenset([
+    'distance', 'health', 'enemy_health', 'height_diff', 'aggression', 'should_jump',
+    'aggression_rules', 'jump_rules', 'aggression_ctrl', 'jump_ctrl', 'aggression_sim', 'jump_sim',
+])
+
+
+def membership_params(genes):
+    """
+    Triangle [a, b, c] of every fuzzy term for a genome.
+    
+    Shared by EvolvableFuzzyAI and the batched engine (fuzzy/batched.py) so
+    both always use the same membership functions.
+    """
+    g = genes  # Shorthand
+    height_same = g['height_same_range']
+    return {
+        # Distance - evolved parameters!
+        ('distance', 'close'): [0, 0, g['distance_close_max']],
+        ('distance', 'medium'): [g['distance_medium_min'],
+                                 (g['distance_medium_min'] + g['distance_medium_max']) / 2,
+                                 g['distance_medium_max']],
+        ('distance', 'far'): [g['distance_far_min'], 1000, 1300],
+        
+        # Health - evolved parameters!
+        ('health', 'low'): [0, 0, g['health_low_max']],
+        ('health', 'medium'): [g['health_medium_min'], 50, g['health_medium_max']],
+        ('health', 'high'): [g['health_high_min'], 100, 100],
+        
+        # Enemy health (same structure)
+        ('enemy_health', 'low'): [0, 0, 40],
+        ('enemy_health', 'medium'): [30, 50, 70],
+        ('enemy_health', 'high'): [60, 100, 100],
+        
+        # Height difference - evolved parameters!
+        ('height_diff', 'below'): [-400, -400, g['height_below_max']],
+        ('height_diff', 'same'): [-height_same/2, 0, height_same/2],
+        ('height_diff', 'above'): [g['height_above_min'], 400, 400],
+        
+        # Aggression output
+        ('aggression', 'defensive'): [0, 0, 40],
+        ('aggression', 'balanced'): [30, 50, 70],
+        ('aggression', 'aggressive'): [60, 100, 100],
+        
+        # Jump output
+        ('should_jump', 'no'): [0, 0, 30],
+        ('should_jump', 'maybe'): [20, 50, 80],
+        ('should_jump', 'yes'): [70, 100, 100],
+    }
+
+
 class EvolvableFuzzyAI:
     """
     Fuzzy AI that uses genome parameters.
     Wraps the existing fuzzy logic but allows parameters to be evolved.
     """
     
-    def __init__(self, genome: FuzzyGenome = None):
+    def __init__(self, genome: FuzzyGenome = None, inference='skfuzzy'):
         """
         Initialize with a genome.
         
         Args:
             genome: FuzzyGenome object with evolved parameters.
                    If None, uses default parameters.
+            inference: 'skfuzzy', 'analytic' or 'lut' (see FuzzyAI)
         """
+        if inference not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown fuzzy inference backend: {inference}")
         self.genome = genome if genome else FuzzyGenome()
+        self.inference = inference
+        self.trace = None  # DecisionTrace when enabled (decision_trace.attach_trace)
         
         if not FUZZY_AVAILABLE:
             self.fallback_ai = SimpleFuzzyAI()
             return
         
-        # Initialize fuzzy variables with genome parameters
-        self._setup_fuzzy_variables()
-        self._setup_membership_functions()
-        self._setup_rules()
-        self._create_control_systems()
+        # scikit-fuzzy variables, rules and simulations are built on first use
+        # (see __getattr__): GA controllers fed by BatchedFuzzyInference never need them
+        
+        # Lookup tables from compile() / closed-form backend; None -> scikit-fuzzy
+        self.aggression_surface = None
+        self.jump_surface = None
+        self.analytic = AnalyticInference(membership_params(self.genome.genes)) if inference == 'analytic' else None
+        if inference == 'lut':
+            self.compile(error_samples=0, verbose=False)
         
         # Jump tracking (from original FuzzyAI)
+        self.max_jump_frames = int(self.genome.genes['jump_frames'])
+        self.reset()
+    
+    def reset(self):
+        """Clear per-match state so the controller can be reused for another match"""
         self.last_jump_command = False
         self.jump_frames = 0
-        self.max_jump_frames = int(self.genome.genes['jump_frames'])
+        # ((distance, height_diff, health, enemy_health), aggression, jump_desire) of the last decision
+        self.last_fuzzy_state = None
+    
+    def __getattr__(self, name):
+        """Build the scikit-fuzzy objects the first time one of them is read"""
+        if name in _SKFUZZY_ATTRS and FUZZY_AVAILABLE:
+            self._build_skfuzzy()
+            return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+    
+    def _build_skfuzzy(self):
+        """Initialize fuzzy variables with genome parameters"""
+        self._setup_fuzzy_variables()
+        self._setup_membership_functions()
+        self._setup_rules()
+        self._create_control_systems()
     
     def _setup_fuzzy_variables(self):
         """Define fuzzy variables (same as original)"""
-        self.distance = ctrl.Antecedent(np.arange(0, 1301, 1), 'distance')
-        self.health = ctrl.Antecedent(np.arange(0, 101, 1), 'health')
-        self.enemy_health = ctrl.Antecedent(np.arange(0, 101, 1), 'enemy_health')
-        self.height_diff = ctrl.Antecedent(np.arange(-400, 401, 1), 'height_diff')
-        
-        self.aggression = ctrl.Consequent(np.arange(0, 101, 1), 'aggression')
-        self.should_jump = ctrl.Consequent(np.arange(0, 101, 1), 'should_jump')
+        for name in ('distance', 'health', 'enemy_health', 'height_diff'):
+            setattr(self, name, ctrl.Antecedent(SHARED_UNIVERSES[name], name))
+        for name in ('aggression', 'should_jump'):
+            setattr(self, name, ctrl.Consequent(SHARED_UNIVERSES[name], name))
     
     def _setup_membership_functions(self):
         """Define membership functions using GENOME PARAMETERS"""
-        g = self.genome.genes  # Shorthand
-        
-        # Distance - evolved parameters!
-        self.distance['close'] = fuzz.trimf(
-            self.distance.universe, 
-            [0, 0, g['distance_close_max']]
-        )
-        self.distance['medium'] = fuzz.trimf(
-            self.distance.universe,
-            [g['distance_medium_min'], 
-             (g['distance_medium_min'] + g['distance_medium_max']) / 2,
-             g['distance_medium_max']]
-        )
-        self.distance['far'] = fuzz.trimf(
-            self.distance.universe,
-            [g['distance_far_min'], 1000, 1300]
-        )
-        
-        # Health - evolved parameters!
-        self.health['low'] = fuzz.trimf(
-            self.health.universe,
-            [0, 0, g['health_low_max']]
-        )
-        self.health['medium'] = fuzz.trimf(
-            self.health.universe,
-            [g['health_medium_min'], 50, g['health_medium_max']]
-        )
-        self.health['high'] = fuzz.trimf(
-            self.health.universe,
-            [g['health_high_min'], 100, 100]
-        )
-        
-        # Enemy health (same structure)
-        self.enemy_health['low'] = fuzz.trimf(self.enemy_health.universe, [0, 0, 40])
-        self.enemy_health['medium'] = fuzz.trimf(self.enemy_health.universe, [30, 50, 70])
-        self.enemy_health['high'] = fuzz.trimf(self.enemy_health.universe, [60, 100, 100])
-        
-        # Height difference - evolved parameters!
-        height_same = g['height_same_range']
-        self.height_diff['below'] = fuzz.trimf(
-            self.height_diff.universe,
-            [-400, -400, g['height_below_max']]
-        )
-        self.height_diff['same'] = fuzz.trimf(
-            self.height_diff.universe,
-            [-height_same/2, 0, height_same/2]
-        )
-        self.height_diff['above'] = fuzz.trimf(
-            self.height_diff.universe,
-            [g['height_above_min'], 400, 400]
-        )
-        
-        # Aggression output
-        self.aggression['defensive'] = fuzz.trimf(self.aggression.universe, [0, 0, 40])
-        self.aggression['balanced'] = fuzz.trimf(self.aggression.universe, [30, 50, 70])
-        self.aggression['aggressive'] = fuzz.trimf(self.aggression.universe, [60, 100, 100])
-        
-        # Jump output
-        self.should_jump['no'] = fuzz.trimf(self.should_jump.universe, [0, 0, 30])
-        self.should_jump['maybe'] = fuzz.trimf(self.should_jump.universe, [20, 50, 80])
-        self.should_jump['yes'] = fuzz.trimf(self.should_jump.universe, [70, 100, 100])
+        for (var_name, label), abc in membership_params(self.genome.genes).items():
+            var = getattr(self, var_name)
+            var[label] = fuzz.trimf(var.universe, abc)
     
     def _setup_rules(self):
-        """Define fuzzy rules (same as original)"""
-        # Aggression rules
-        self.rule1 = ctrl.Rule(self.health['low'], self.aggression['defensive'])
-        self.rule2 = ctrl.Rule(self.health['high'] & self.enemy_health['low'], self.aggression['aggressive'])
-        self.rule3 = ctrl.Rule(self.distance['close'] & self.health['high'], self.aggression['aggressive'])
-        self.rule4 = ctrl.Rule(self.distance['far'], self.aggression['balanced'])
-        
-        # Jump rules
-        self.rule5 = ctrl.Rule(self.height_diff['below'], self.should_jump['yes'])
-        self.rule6 = ctrl.Rule(self.height_diff['above'], self.should_jump['no'])
-        self.rule7 = ctrl.Rule(self.health['low'] & self.distance['close'], self.should_jump['yes'])
-        self.rule8 = ctrl.Rule(self.distance['medium'], self.should_jump['maybe'])
+        """Define fuzzy logic rules (the shared rule base, fuzzy/rule_base.py)"""
+        self.aggression_rules = skfuzzy_rules(self, 'aggression', AGGRESSION_RULES)
+        self.jump_rules = skfuzzy_rules(self, 'should_jump', JUMP_RULES)
     
     def _create_control_systems(self):
         """Create control systems"""
-        self.aggression_ctrl = ctrl.ControlSystem([self.rule1, self.rule2, self.rule3, self.rule4])
-        self.jump_ctrl = ctrl.ControlSystem([self.rule5, self.rule6, self.rule7, self.rule8])
+        self.aggression_ctrl = ctrl.ControlSystem(self.aggression_rules)
+        self.jump_ctrl = ctrl.ControlSystem(self.jump_rules)
         
         self.aggression_sim = ctrl.ControlSystemSimulation(self.aggression_ctrl)
         self.jump_sim = ctrl.ControlSystemSimulation(self.jump_ctrl)
     
-    def _get_platform_navigation(self, ai_state, enemy_state):
-        """Platform navigation with evolved parameters"""
-        ai_x, ai_y = ai_state['x'], ai_state['y']
-        enemy_x, enemy_y = enemy_state['x'], enemy_state['y']
-        
-        g = self.genome.genes
-        platform_tolerance = g['platform_y_tolerance']
-        jump_zone = g['jump_zone_width']
-        
-        # Platform definitions
-        PLATFORMS = [
-            {'id': 'top', 'x1': 280, 'x2': 680, 'y': 300},
-            {'id': 'bottom_left', 'x1': 100, 'x2': 400, 'y': 430},
-            {'id': 'bottom_right', 'x1': 600, 'x2': 900, 'y': 430},
-        ]
-        
-        # Detect platforms
-        ai_platform = None
-        enemy_platform = None
-        
-        for plat in PLATFORMS:
-            if plat['x1'] <= ai_x <= plat['x2'] and abs(ai_y - plat['y']) < platform_tolerance:
-                ai_platform = plat
-            if plat['x1'] <= enemy_x <= plat['x2'] and abs(enemy_y - plat['y']) < platform_tolerance:
-                enemy_platform = plat
+    def compile(self, resolution=None, error_samples=200, verbose=True, cache_dir=SURFACE_CACHE_DIR):
+        """
+        Precompile both rule bases into lookup tables (see fuzzy/lookup_table.py).
         
-        move_left = ai_x > enemy_x
-        move_right = ai_x < enemy_x
-        should_jump = False
-        needs_double_jump = False
+        After this, decide_action() interpolates the tables instead of running
+        scikit-fuzzy twice per frame. Tables are memory-mapped from the on-disk
+        cache (fuzzy/surface_cache.py) when this controller's membership
+        functions were compiled before, in any process.
         
-        if ai_platform and enemy_platform and ai_platform['id'] != enemy_platform['id']:
-            if ai_platform['id'] in ['bottom_left', 'bottom_right'] and enemy_platform['id'] == 'top':
-                needs_double_jump = True
-                top_center_x = (PLATFORMS[0]['x1'] + PLATFORMS[0]['x2']) / 2
-                
-                if ai_x < PLATFORMS[0]['x1'] - 50:
-                    move_left = False
-                    move_right = True
-                    if PLATFORMS[0]['x1'] - jump_zone <= ai_x <= PLATFORMS[0]['x1'] - 20:
-                        should_jump = True
-                elif ai_x > PLATFORMS[0]['x2'] + 50:
-                    move_left = True
-                    move_right = False
-                    if PLATFORMS[0]['x2'] + 20 <= ai_x <= PLATFORMS[0]['x2'] + jump_zone:
-                        should_jump = True
-                else:
-                    should_jump = True
-                    move_left = ai_x > top_center_x
-                    move_right = ai_x < top_center_x
-            
-            elif ai_platform['id'] == 'top' and enemy_platform['id'] in ['bottom_left', 'bottom_right']:
-                if enemy_platform['id'] == 'bottom_left':
-                    edge_x = PLATFORMS[0]['x1'] + 50
-                    move_left = ai_x > edge_x
-                    move_right = ai_x < edge_x
-                    if ai_x <= PLATFORMS[0]['x1'] + 30:
-                        should_jump = True
-                        move_left = True
-                else:
-                    edge_x = PLATFORMS[0]['x2'] - 50
-                    move_left = ai_x > edge_x
-                    move_right = ai_x < edge_x
-                    if ai_x >= PLATFORMS[0]['x2'] - 30:
-                        should_jump = True
-                        move_right = True
-            
-            elif ai_platform['id'] == 'bottom_left' and enemy_platform['id'] == 'bottom_right':
-                needs_double_jump = True
-                if ai_x < PLATFORMS[0]['x1'] - 80:
-                    move_right = True
-                    move_left = False
-                elif PLATFORMS[0]['x1'] - jump_zone <= ai_x <= PLATFORMS[0]['x1'] - 20:
-                    should_jump = True
-                    move_right = True
+        Args:
+            resolution: Grid spacing per input, e.g. {'distance': 5, 'health': 2}
+            error_samples: Random inputs compared against scikit-fuzzy (0 to skip)
+            verbose: Print grid sizes and the measured error
+            cache_dir: Surface cache folder (None to always recompile)
             
-            elif ai_platform['id'] == 'bottom_right' and enemy_platform['id'] == 'bottom_left':
-                needs_double_jump = True
-                if ai_x > PLATFORMS[0]['x2'] + 80:
-                    move_left = True
-                    move_right = False
-                elif PLATFORMS[0]['x2'] + 20 <= ai_x <= PLATFORMS[0]['x2'] + jump_zone:
-                    should_jump = True
-                    move_left = True
-        
-        elif not ai_platform:
-            move_left = ai_x > enemy_x
-            move_right = ai_x < enemy_x
-            should_jump = ai_y > enemy_y
-        
-        return move_left, move_right, should_jump, needs_double_jump
+        Returns:
+            Dictionary of FuzzySurface objects ('aggression', 'should_jump')
+        """
+        if not FUZZY_AVAILABLE:
+            return {}
+        if cache_dir:
+            surfaces, hit = load_or_compile(self, membership_params(self.genome.genes), resolution, error_samples, cache_dir)
+        else:
+            surfaces, hit = compile_surfaces(self, resolution, error_samples), False
+        self.aggression_surface = surfaces['aggression']
+        self.jump_surface = surfaces['should_jump']
+        if verbose:
+            print(("[cache] " if hit else "") + describe_surfaces(surfaces))
+        return surfaces
     
-    def decide_action(self, ai_state, enemy_state, platforms=None):
-        """Make decision using genome parameters"""
+    def _compute_aggression(self, distance, health, enemy_health):
+        """Aggression output (0-100) from the selected backend"""
+        distance = min(distance, 1300)
+        if self.aggression_surface is not None:
+            return self.aggression_surface(distance, health, enemy_health)
+        if self.analytic is not None:
+            return self.analytic.aggression(distance, health, enemy_health)
+        try:
+            self.aggression_sim.input['distance'] = distance
+            self.aggression_sim.input['health'] = health
+            self.aggression_sim.input['enemy_health'] = enemy_health
+            self.aggression_sim.compute()
+            return self.aggression_sim.output['aggression']
+        except:
+            return 50.0
+    
+    def _compute_jump_desire(self, height_diff, health, distance):
+        """Jump desire output (0-100) from the selected backend"""
+        height_diff = max(-400, min(400, height_diff))
+        distance = min(distance, 1300)
+        if self.jump_surface is not None:
+            return self.jump_surface(height_diff, health, distance)
+        if self.analytic is not None:
+            return self.analytic.jump_desire(height_diff, health, distance)
+        try:
+            self.jump_sim.input['height_diff'] = height_diff
+            self.jump_sim.input['health'] = health
+            self.jump_sim.input['distance'] = distance
+            self.jump_sim.compute()
+            return self.jump_sim.output['should_jump']
+        except:
+            return 50.0
+    
+    def _get_platform_navigation(self, ai_state, enemy_state, platforms=None):
+        """Platform navigation (navigation.py) with evolved tolerance and jump zone"""
+        g = self.genome.genes
+        return navigation_graph(platforms).route(
+            ai_state['x'], ai_state['y'], enemy_state['x'], enemy_state['y'],
+            tolerance=g['platform_y_tolerance'], jump_zone=g['jump_zone_width'])
+    
+    def decide_action(self, ai_state, enemy_state, platforms=None, fuzzy_outputs=None, bullets=None):
+        """
+        Make decision using genome parameters
+        
+        Args:
+            platforms: GameState.get_all_platforms() result or its NavigationGraph (None = map1 from gameConfig.json)
+            fuzzy_outputs: Optional precomputed (aggression, jump_desire) for this
+                           frame, e.g. from BatchedFuzzyInference (fuzzy/batched.py)
+            bullets: Optional GameState.get_bullet_arrays() result; imminent hits
+                     are dodged (threat_assessment.py)
+        """
         if not FUZZY_AVAILABLE:
-            return self.fallback_ai.decide_action(ai_state, enemy_state)
+            return self.fallback_ai.decide_action(ai_state, enemy_state, platforms)
         
         g = self.genome.genes
         
@@ -250,26 +264,14 @@ class EvolvableFuzzyAI:
         height_diff = ai_state['y'] - enemy_state['y']
         
         # Platform navigation
-        nav_left, nav_right, nav_jump, needs_double_jump = self._get_platform_navigation(ai_state, enemy_state)
+        nav_left, nav_right, nav_jump, needs_double_jump = self._get_platform_navigation(ai_state, enemy_state, platforms)
         
         # Fuzzy logic
-        try:
-            self.aggression_sim.input['distance'] = min(distance, 1300)
-            self.aggression_sim.input['health'] = ai_state['health']
-            self.aggression_sim.input['enemy_health'] = enemy_state['health']
-            self.aggression_sim.compute()
-            aggression = self.aggression_sim.output['aggression']
-        except:
-            aggression = 50.0
-        
-        try:
-            self.jump_sim.input['height_diff'] = max(-400, min(400, height_diff))
-            self.jump_sim.input['health'] = ai_state['health']
-            self.jump_sim.input['distance'] = min(distance, 1300)
-            self.jump_sim.compute()
-            fuzzy_jump_desire = self.jump_sim.output['should_jump']
-        except:
-            fuzzy_jump_desire = 50.0
+        if fuzzy_outputs is not None:
+            aggression, fuzzy_jump_desire = fuzzy_outputs
+        else:
+            aggression = self._compute_aggression(distance, ai_state['health'], enemy_state['health'])
+            fuzzy_jump_desire = self._compute_jump_desire(height_diff, ai_state['health'], distance)
         
         # Double jump handling
         if needs_double_jump and nav_jump:
@@ -317,7 +319,7 @@ class EvolvableFuzzyAI:
         # Combat using evolved parameters
         can_shoot = abs(height_diff) < g['shoot_height_diff_max'] and distance < g['shoot_distance_max']
         
-        return {
+        actions = {
             'up': should_jump,
             'left': move_left,
             'right': move_right,
@@ -325,3 +327,17 @@ class EvolvableFuzzyAI:
             'primaryFire': can_shoot and aggression > g['aggression_threshold'],
             'secondaryFire': can_shoot and aggression > g['secondary_fire_threshold']
         }
+        if bullets is not None:
+            actions = apply_dodge(actions, assess([ai_state], bullets))
+        self.last_fuzzy_state = ((distance, height_diff, ai_state['health'], enemy_state['health']),
+                                 aggression, fuzzy_jump_desire)
+        if self.trace is not None:
+            self.trace.record(distance, height_diff, ai_state['health'], enemy_state['health'],
+                              aggression, fuzzy_jump_desire,
+                              nav_bits(nav_left, nav_right, nav_jump, needs_double_jump),
+                              self.jump_frames, actions=actions)
+        return actions
+    
+    def get_fuzzy_state(self, ai_state, enemy_state):
+        """Aggression/jump desire for debugging (cached from the last decide_action() when possible)"""
+        return FuzzyAI.get_fuzzy_state(self, ai_state, enemy_state)
@@ -0,0 +1,358 @@
+"""
+Precompiled lookup-table inference for FuzzyAI and EvolvableFuzzyAI.
+
+Each decide_action() runs two scikit-fuzzy ControlSystemSimulation.compute()
+calls (~2 ms each). Both rule bases only depend on three inputs, so
+compile_surfaces() samples them once on a quantized input grid into dense
+NumPy tables (FuzzySurface), and decisions become a trilinear lookup.
+
+The grid is filled with a vectorized version of exactly what scikit-fuzzy
+does for these controllers, on the rule lists of fuzzy/rule_base.py that
+the controllers themselves are built from:
+- inputs fuzzified by interpolating the sampled membership arrays
+- AND = min, rule accumulation = max, implication = clip (min)
+- centroid of the aggregated output, sampled on the output universe plus
+  the points where each term crosses its cut level
+- 50.0 when no rule fires (the controllers' except-branch fallback)
+
+After compiling, random inputs are run through the real simulation to
+report how far the interpolated table is from scikit-fuzzy (max_error).
+"""
+
+import time
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fuzzy.rule_base import AGGRESSION_INPUTS, AGGRESSION_RULES, JUMP_INPUTS, JUMP_RULES, NO_RULE_FIRED
+
+# Bound on |table - scikit-fuzzy| (max, 99th percentile) in output units
+# (0-100), checked by compile_surfaces. With the default grid FuzzyAI
+# measures max < 2.1 / p99 < 0.6, so a decision can only flip when the exact
+# output is within 2.5 of a controller threshold. Random genomes keep p99
+# below 1 (40 genomes: p99 <= 0.9), but some have a corner where two rules
+# fire only faintly against each other (e.g. health just inside 'low' while
+# height_diff is barely 'above'): the centroid swings between their output
+# terms within one cell and the max reaches 5-20 there. compile_surfaces
+# warns for those surfaces.
+ERROR_TOLERANCE = (2.5, 1.0)
+
+# Grid spacing per input (in input units), refined by grid_axis
+DEFAULT_RESOLUTION = {
+    'distance': 10.0,
+    'health': 5.0,
+    'enemy_health': 5.0,
+    'height_diff': 10.0,
+}
+
+# Half-width of the grid cells around a membership's zero point (input units)
+EDGE_WIDTH = 1e-3
+# Extra grid lines next to a zero point, as fractions of the grid spacing:
+# a rule fading in or out changes the centroid steeply there
+EDGE_REFINEMENT = (1 / 8, 1 / 2)
+CHUNK_SIZE = 4096
+
+
+class FuzzySurface:
+    """
+    One controller output tabulated over a 3-D input grid.
+
+    Each axis is a sorted array of grid coordinates: a regular grid refined
+    around the membership breakpoints (see grid_axis). Calling the surface
+    with three inputs returns the trilinear interpolation of the table;
+    inputs outside the grid are clipped like scikit-fuzzy clips them to the
+    universe.
+    """
+
+    def __init__(self, names: Sequence[str], axes: Sequence[Sequence[float]], table: np.ndarray):
+        self.names = tuple(names)
+        self.table = np.ascontiguousarray(table, dtype=np.float64)
+        self.shape = self.table.shape
+        self.axes = tuple(np.asarray(a, dtype=np.float64) for a in axes)
+        # Plain lists: bisect on them is the fastest scalar search
+        self._axis_lists = tuple(a.tolist() for a in self.axes)
+        self.lows = tuple(float(a[0]) for a in self.axes)
+        self.highs = tuple(float(a[-1]) for a in self.axes)
+        self._flat = self.table.ravel()
+
+        # Filled in by compile_surfaces()
+        self.max_error: Optional[float] = None
+        self.mean_error: Optional[float] = None
+        self.p99_error: Optional[float] = None
+        self.compile_seconds: Optional[float] = None
+
+    @staticmethod
+    def _locate(value: float, axis: List[float]) -> Tuple[int, float]:
+        if value <= axis[0]:
+            return 0, 0.0
+        if value >= axis[-1]:
+            return len(axis) - 2, 1.0
+        i = bisect_right(axis, value) - 1
+        return i, (value - axis[i]) / (axis[i + 1] - axis[i])
+
+    def __call__(self, a: float, b: float, c: float) -> float:
+        _, n1, n2 = self.shape
+        axes = self._axis_lists
+        i, fa = self._locate(a, axes[0])
+        j, fb = self._locate(b, axes[1])
+        k, fc = self._locate(c, axes[2])
+
+        t = self._flat
+        base = (i * n1 + j) * n2 + k
+        c00 = t[base] + (t[base + 1] - t[base]) * fc
+        c01 = t[base + n2] + (t[base + n2 + 1] - t[base + n2]) * fc
+        base += n1 * n2
+        c10 = t[base] + (t[base + 1] - t[base]) * fc
+        c11 = t[base + n2] + (t[base + n2 + 1] - t[base + n2]) * fc
+        c0 = c00 + (c01 - c00) * fb
+        c1 = c10 + (c11 - c10) * fb
+        return float(c0 + (c1 - c0) * fa)
+
+    def lookup(self, points: np.ndarray) -> np.ndarray:
+        """Vectorized lookup for an (N, 3) array of inputs."""
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        idx, frac = [], []
+        for axis, coords in enumerate(self.axes):
+            x = np.clip(points[:, axis], coords[0], coords[-1])
+            i = np.clip(np.searchsorted(coords, x, side='right') - 1, 0, len(coords) - 2)
+            idx.append(i)
+            frac.append((x - coords[i]) / (coords[i + 1] - coords[i]))
+
+        out = np.zeros(len(points))
+        for da in (0, 1):
+            wa = frac[0] if da else 1.0 - frac[0]
+            for db in (0, 1):
+                wb = frac[1] if db else 1.0 - frac[1]
+                for dc in (0, 1):
+                    wc = frac[2] if dc else 1.0 - frac[2]
+                    out += wa * wb * wc * self.table[idx[0] + da, idx[1] + db, idx[2] + dc]
+        return out
+
+
+# ----------------------------------------------------------------------
+# Vectorized evaluation of a scikit-fuzzy rule base
+# ----------------------------------------------------------------------
+def rule_cuts(rules, membership) -> Dict[str, np.ndarray]:
+    """
+    Activation level of every output term.
+
+    Args:
+        rules: AGGRESSION_RULES or JUMP_RULES
+        membership: Callable (variable, term) -> membership array
+    """
+    memberships = {}
+    cuts: Dict[str, np.ndarray] = {}
+    for antecedents, term in rules:
+        strength = None
+        for key in antecedents:
+            if key not in memberships:
+                memberships[key] = membership(*key)
+            strength = memberships[key] if strength is None else np.fmin(strength, memberships[key])
+        cuts[term] = strength if term not in cuts else np.fmax(cuts[term], strength)
+    return cuts
+
+
+def mamdani_centroid(universe: np.ndarray, term_mfs: List[np.ndarray], cuts: List[np.ndarray]) -> np.ndarray:
+    """
+    Centroid of max_t(min(cut_t, mf_t)) for N cut vectors, reproducing
+    scikit-fuzzy's find_memberships() upsampling and centroid().
+    """
+    n = len(cuts[0])
+    x = universe.astype(np.float64)
+    dx = np.diff(x)
+    points = [np.broadcast_to(x, (n, len(x)))]
+
+    # Points where each term crosses its cut level. Output terms are
+    # triangles, so there are at most two: the first and the last crossing.
+    # (Duplicates are harmless, they only add zero-width segments.)
+    for mf, cut in zip(term_mfs, cuts):
+        y = cut[:, None]
+        above = np.where(y == 0.0, mf > y, mf >= y)
+        crossing = above[:, 1:] != above[:, :-1]
+        has_crossing = crossing.any(axis=1)
+        first = np.argmax(crossing, axis=1)
+        last = crossing.shape[1] - 1 - np.argmax(crossing[:, ::-1], axis=1)
+        for i in (first, last):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                xc = x[i] + (cut - mf[i]) * dx[i] / (mf[i + 1] - mf[i])
+            points.append(np.where(has_crossing, xc, x[0])[:, None])
+    points = np.sort(np.concatenate(points, axis=1), axis=1)
+
+    output_mf = np.zeros_like(points)
+    for mf, cut in zip(term_mfs, cuts):
+        np.maximum(output_mf, np.fmin(cut[:, None], np.interp(points, x, mf)), out=output_mf)
+
+    x1, x2 = points[:, :-1], points[:, 1:]
+    y1, y2 = output_mf[:, :-1], output_mf[:, 1:]
+    width = x2 - x1
+    area = 0.5 * width * (y1 + y2)
+    moment = x1 * area + width * width * (y1 + 2.0 * y2) / 6.0
+    value = moment.sum(axis=1) / np.fmax(area.sum(axis=1), np.finfo(float).eps)
+    return np.where(output_mf.sum(axis=1) > 0.0, value, NO_RULE_FIRED)
+
+
+def evaluate_rules(ai, output_name: str, rules, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Crisp output of one rule base for N input tuples, as scikit-fuzzy would
+    compute it on `ai`'s own membership functions.
+
+    Args:
+        ai: Controller holding the skfuzzy Antecedents/Consequents as attributes
+        output_name: Consequent attribute ('aggression' or 'should_jump')
+        rules: AGGRESSION_RULES or JUMP_RULES
+        inputs: {variable name: (N,) array}, already inside the universes
+    """
+    def membership(var_name, label):
+        var = getattr(ai, var_name)
+        return np.interp(inputs[var_name], var.universe, var[label].mf)
+
+    output = getattr(ai, output_name)
+    cuts = rule_cuts(rules, membership)
+    labels = list(cuts.keys())
+    return mamdani_centroid(output.universe,
+                            [output[label].mf for label in labels],
+                            [cuts[label] for label in labels])
+
+
+# ----------------------------------------------------------------------
+# Compilation
+# ----------------------------------------------------------------------
+def grid_axis(ai, name: str, step: float) -> np.ndarray:
+    """
+    Grid coordinates of one input: a regular grid with spacing `step`,
+    refined where the exact surface is not smooth.
+
+    - every kink of a membership function (triangle vertices, as sampled on
+      the integer universe) gets a grid line, so piecewise-linear stretches
+      are interpolated exactly
+    - where a membership reaches zero, a rule can switch off. If it was the
+      only rule firing, the output jumps to NO_RULE_FIRED, so the zero point
+      gets grid lines at +-EDGE_WIDTH and the jump is confined to that sliver
+    """
+    var = getattr(ai, name)
+    universe = var.universe.astype(np.float64)
+    low, high = universe[0], universe[-1]
+    n = max(2, int(round((high - low) / step)) + 1)
+    coords = [np.linspace(low, high, n)]
+    for term in var.terms.values():
+        mf = np.asarray(term.mf, dtype=np.float64)
+        kinks = np.flatnonzero(np.abs(np.diff(mf, 2)) > 1e-9) + 1
+        coords.append(universe[kinks])
+        zero = mf == 0.0
+        edges = np.flatnonzero(zero[:-1] != zero[1:])
+        at_zero = universe[np.where(zero[edges], edges, edges + 1)]
+        for offset in (0.0, EDGE_WIDTH) + tuple(step * f for f in EDGE_REFINEMENT):
+            coords.extend([at_zero - offset, at_zero + offset])
+    return np.unique(np.clip(np.concatenate(coords), low, high))
+
+
+def compile_surface(ai, output_name: str, input_names: Sequence[str], rules,
+                    resolution: Optional[Dict[str, float]] = None) -> FuzzySurface:
+    """Sample one rule base of `ai` on the input grid into a FuzzySurface."""
+    steps = dict(DEFAULT_RESOLUTION)
+    if resolution:
+        steps.update(resolution)
+    axes = [grid_axis(ai, name, steps[name]) for name in input_names]
+
+    grid = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(axes))
+    values = np.empty(len(grid))
+    for start in range(0, len(grid), CHUNK_SIZE):
+        chunk = grid[start:start + CHUNK_SIZE]
+        inputs = {name: chunk[:, i] for i, name in enumerate(input_names)}
+        values[start:start + CHUNK_SIZE] = evaluate_rules(ai, output_name, rules, inputs)
+
+    table = values.reshape(tuple(len(a) for a in axes))
+    return FuzzySurface(input_names, axes, table)
+
+
+def _skfuzzy_output(sim, output_name: str, inputs: Dict[str, float]) -> float:
+    try:
+        for name, value in inputs.items():
+            sim.input[name] = value
+        sim.compute()
+        return sim.output[output_name]
+    except Exception:
+        return NO_RULE_FIRED
+
+
+def measure_error(surface: FuzzySurface, control_system, output_name: str,
+                  samples: int = 200, seed: int = 0) -> Tuple[float, float, float]:
+    """
+    Max, mean and 99th percentile absolute difference between `surface` and
+    scikit-fuzzy on random inputs.
+
+    The reference simulation runs with cache=False: the controllers' cached
+    simulations can return a stale output for inputs they have seen before
+    when no rule fired on them.
+
+    The max comes from the cells next to a rule switching off (e.g. health
+    leaving 'low'), where the centroid changes steeply; grid_axis refines
+    the grid there so it stays within ERROR_TOLERANCE.
+    """
+    from skfuzzy import control as ctrl
+
+    sim = ctrl.ControlSystemSimulation(control_system, cache=False)
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(surface.lows, surface.highs, size=(samples, len(surface.names)))
+    approx = surface.lookup(points)
+    exact = np.array([
+        _skfuzzy_output(sim, output_name, dict(zip(surface.names, map(float, p))))
+        for p in points
+    ])
+    err = np.abs(approx - exact)
+    return float(err.max()), float(err.mean()), float(np.percentile(err, 99))
+
+
+def within_tolerance(surface: FuzzySurface) -> bool:
+    """Whether a measured surface stays within ERROR_TOLERANCE (True when unmeasured)."""
+    if surface.max_error is None:
+        return True
+    max_bound, p99_bound = ERROR_TOLERANCE
+    return surface.max_error <= max_bound and surface.p99_error <= p99_bound
+
+
+def compile_surfaces(ai, resolution: Optional[Dict[str, float]] = None,
+                     error_samples: int = 200, seed: int = 0) -> Dict[str, FuzzySurface]:
+    """
+    Compile both rule bases of a FuzzyAI/EvolvableFuzzyAI.
+
+    Args:
+        ai: Controller (its membership functions are read, not modified)
+        resolution: Grid spacing per input, overriding DEFAULT_RESOLUTION
+        error_samples: Random inputs checked against scikit-fuzzy (0 to skip)
+        seed: RNG seed for the error check
+
+    Returns:
+        {'aggression': FuzzySurface, 'should_jump': FuzzySurface}
+    """
+    specs = [
+        ('aggression', AGGRESSION_INPUTS, AGGRESSION_RULES, ai.aggression_ctrl),
+        ('should_jump', JUMP_INPUTS, JUMP_RULES, ai.jump_ctrl),
+    ]
+    surfaces = {}
+    for output_name, input_names, rules, control_system in specs:
+        start = time.perf_counter()
+        surface = compile_surface(ai, output_name, input_names, rules, resolution)
+        surface.compile_seconds = time.perf_counter() - start
+        if error_samples > 0:
+            surface.max_error, surface.mean_error, surface.p99_error = measure_error(
+                surface, control_system, output_name, error_samples, seed)
+            if not within_tolerance(surface):
+                print(f"[lookup table] WARNING: {output_name} error max {surface.max_error:.2f} / "
+                      f"p99 {surface.p99_error:.2f} exceeds ERROR_TOLERANCE {ERROR_TOLERANCE}")
+        surfaces[output_name] = surface
+    return surfaces
+
+
+def describe(surfaces: Dict[str, FuzzySurface]) -> str:
+    """One line per surface: grid size, compile time and error vs scikit-fuzzy."""
+    lines = []
+    for name, s in surfaces.items():
+        grid = "x".join(str(n) for n in s.shape)
+        line = f"{name}: {grid} grid ({s.table.nbytes / 1024:.0f} KB) in {s.compile_seconds:.2f}s"
+        if s.max_error is not None:
+            line += (f", error vs scikit-fuzzy: max {s.max_error:.3f} / "
+                     f"p99 {s.p99_error:.3f} / mean {s.mean_error:.3f}")
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,121 @@
+"""
+Rule base of the fuzzy controllers, defined once.
+
+FuzzyAI and EvolvableFuzzyAI build their scikit-fuzzy rules from these
+lists (skfuzzy_rules), and the lookup-table, analytic and batched backends
+evaluate the very same lists, so no backend can drift from the controllers.
+
+A rule is ([(variable, term), ...], output term): the antecedents are
+ANDed (min) and rules with the same output term are accumulated (max).
+
+The universes and the membership math the backends use to reproduce
+scikit-fuzzy live here too: trimf/sampled_trimf on arrays (batched,
+decision traces) and trimf_value/sampled_membership on single floats
+(analytic, where NumPy's per-call overhead would dominate).
+"""
+import math
+from typing import Sequence
+
+import numpy as np
+
+# Integer universes of the skfuzzy variables (low, high), step 1
+UNIVERSES = {
+    'distance': (0, 1300),
+    'health': (0, 100),
+    'enemy_health': (0, 100),
+    'height_diff': (-400, 400),
+    'aggression': (0, 100),
+    'should_jump': (0, 100),
+}
+
+# Inputs of each rule base, in lookup-table axis order
+AGGRESSION_INPUTS = ('distance', 'health', 'enemy_health')
+JUMP_INPUTS = ('height_diff', 'health', 'distance')
+
+AGGRESSION_RULES = [
+    ([('health', 'low')], 'defensive'),
+    ([('health', 'high'), ('enemy_health', 'low')], 'aggressive'),
+    ([('distance', 'close'), ('health', 'high')], 'aggressive'),
+    ([('distance', 'far')], 'balanced'),
+]
+JUMP_RULES = [
+    ([('height_diff', 'below')], 'yes'),
+    ([('height_diff', 'above')], 'no'),
+    ([('health', 'low'), ('distance', 'close')], 'yes'),
+    ([('distance', 'medium')], 'maybe'),
+]
+
+# Output when no rule fires (the controllers' except-branch fallback)
+NO_RULE_FIRED = 50.0
+
+
+def skfuzzy_rules(ai, output_name: str, rules) -> list:
+    """
+    scikit-fuzzy Rule objects of one rule base.
+
+    Args:
+        ai: Controller holding the Antecedents/Consequents as attributes
+        output_name: Consequent attribute ('aggression' or 'should_jump')
+        rules: AGGRESSION_RULES or JUMP_RULES
+    """
+    from skfuzzy import control as ctrl
+
+    output = getattr(ai, output_name)
+    built = []
+    for antecedents, term in rules:
+        condition = None
+        for var_name, label in antecedents:
+            antecedent = getattr(ai, var_name)[label]
+            condition = antecedent if condition is None else condition & antecedent
+        built.append(ctrl.Rule(condition, output[term]))
+    return built
+
+
+def universe(name: str) -> np.ndarray:
+    """Sampled universe of a variable, as its skfuzzy Antecedent/Consequent holds it."""
+    low, high = UNIVERSES[name]
+    return np.arange(low, high + 1, 1)
+
+
+def trimf(x, a, b, c):
+    """Elementwise skfuzzy trimf with broadcastable breakpoints."""
+    x, a, b, c = np.broadcast_arrays(np.asarray(x, dtype=np.float64), a, b, c)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        left = np.where((a < x) & (x < b), (x - a) / (b - a), 0.0)
+        right = np.where((b < x) & (x < c), (c - x) / (c - b), 0.0)
+    return np.where(x == b, 1.0, left + right)
+
+
+def sampled_trimf(x, a, b, c, low, high):
+    """
+    trimf sampled on the integer universe low..high, then linearly
+    interpolated at x (what interp_membership does on the skfuzzy arrays).
+    """
+    x = np.clip(np.asarray(x, dtype=np.float64), low, high)
+    x0 = np.minimum(np.floor(x), high - 1)
+    m0 = trimf(x0, a, b, c)
+    m1 = trimf(x0 + 1.0, a, b, c)
+    return m0 + (m1 - m0) * (x - x0)
+
+
+def trimf_value(x: float, a: float, b: float, c: float) -> float:
+    """trimf at a single point."""
+    if x == b:
+        return 1.0
+    if a < x < b:
+        return (x - a) / (b - a)
+    if b < x < c:
+        return (c - x) / (c - b)
+    return 0.0
+
+
+def sampled_membership(x: float, abc: Sequence[float], low: int, high: int) -> float:
+    """sampled_trimf at a single point."""
+    a, b, c = abc
+    x = min(max(x, low), high)
+    x0 = math.floor(x)
+    if x0 >= high:
+        x0 = high - 1
+    m0 = trimf_value(x0, a, b, c)
+    m1 = trimf_value(x0 + 1, a, b, c)
+    return m0 + (m1 - m0) * (x - x0)
@@ -0,0 +1,177 @@
+"""
+On-disk cache of compiled fuzzy decision surfaces.
+
+Compiling the lookup tables of a controller (fuzzy/lookup_table.py) takes a
+few seconds, and every GA worker, tournament and play script used to redo
+it. Surfaces are saved here as plain .npy tables plus a small .json header
+and memory-mapped on load, so a fresh process maps them instantly and
+several processes share the same pages.
+
+Cache key = hash of the membership functions (FuzzyAI defaults or the
+genome's genes) + grid resolution + rule-base fingerprint. The controllers
+build their rules and universes from fuzzy/rule_base.py, which is what gets
+fingerprinted, so editing the rules, universes, grid refinement or surface
+format changes the key and stale tables are simply never found again.
+
+Prebuild for FuzzyAI and every saved genome:
+    python -m fuzzy.surface_cache
+    python -m fuzzy.surface_cache evolved_genomes/best_genome.json
+"""
+
+import os
+import sys
+import glob
+import json
+import hashlib
+import argparse
+from typing import Dict, Optional
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from fuzzy.lookup_table import (
+    DEFAULT_RESOLUTION, EDGE_REFINEMENT, EDGE_WIDTH, FuzzySurface, compile_surfaces,
+)
+from fuzzy.rule_base import (
+    AGGRESSION_INPUTS, AGGRESSION_RULES, JUMP_INPUTS, JUMP_RULES, NO_RULE_FIRED, UNIVERSES,
+)
+
+CACHE_DIR = os.path.join(PROJECT_ROOT, "fuzzy_cache")
+SURFACE_FORMAT = 2
+SURFACE_NAMES = ('aggression', 'should_jump')
+
+
+def rule_base_fingerprint() -> str:
+    """
+    Hash of everything besides the membership functions that shapes a surface:
+    the rule base and universes the controllers are built from
+    (fuzzy/rule_base.py), the grid refinement and the file format.
+    """
+    payload = {
+        'format': SURFACE_FORMAT,
+        'universes': UNIVERSES,
+        'grid': [EDGE_WIDTH, list(EDGE_REFINEMENT)],
+        'aggression': [AGGRESSION_INPUTS, AGGRESSION_RULES],
+        'should_jump': [JUMP_INPUTS, JUMP_RULES],
+        'no_rule_fired': NO_RULE_FIRED,
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def cache_key(params: Dict, resolution: Optional[Dict[str, float]] = None) -> str:
+    """
+    Args:
+        params: (variable, term) -> [a, b, c], e.g. fuzzy_ai.MEMBERSHIP_PARAMS
+                or evolvable_fuzzy_ai.membership_params(genome.genes)
+        resolution: Grid spacing overrides (see lookup_table.DEFAULT_RESOLUTION)
+    """
+    steps = dict(DEFAULT_RESOLUTION)
+    if resolution:
+        steps.update(resolution)
+    payload = {
+        'params': sorted((f"{var}.{label}", [float(v) for v in abc]) for (var, label), abc in params.items()),
+        'resolution': sorted((k, float(v)) for k, v in steps.items()),
+        'rules': rule_base_fingerprint(),
+    }
+    return hashlib.sha1(json.dumps(payload).encode('utf-8')).hexdigest()
+
+
+def _paths(key: str, cache_dir: str):
+    return (os.path.join(cache_dir, f"{key}.json"),
+            {name: os.path.join(cache_dir, f"{key}_{name}.npy") for name in SURFACE_NAMES})
+
+
+def load(key: str, cache_dir: str = CACHE_DIR) -> Optional[Dict[str, FuzzySurface]]:
+    """Memory-map cached surfaces, or None if they are not in the cache."""
+    header_path, table_paths = _paths(key, cache_dir)
+    if not os.path.exists(header_path):
+        return None
+    try:
+        with open(header_path, 'r') as f:
+            header = json.load(f)
+        surfaces = {}
+        for name in SURFACE_NAMES:
+            meta = header['surfaces'][name]
+            table = np.load(table_paths[name], mmap_mode='r')
+            surface = FuzzySurface(meta['names'], meta['axes'], table)
+            surface.max_error = meta.get('max_error')
+            surface.mean_error = meta.get('mean_error')
+            surface.p99_error = meta.get('p99_error')
+            surface.compile_seconds = meta.get('compile_seconds')
+            surfaces[name] = surface
+        return surfaces
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[fuzzy cache] Ignoring unreadable entry {key}: {e}")
+        return None
+
+
+def save(key: str, surfaces: Dict[str, FuzzySurface], cache_dir: str = CACHE_DIR):
+    """Write surfaces atomically enough for concurrent workers (tables first, header last)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    header_path, table_paths = _paths(key, cache_dir)
+    header = {'format': SURFACE_FORMAT, 'surfaces': {}}
+    for name in SURFACE_NAMES:
+        s = surfaces[name]
+        tmp = f"{table_paths[name]}.{os.getpid()}.tmp.npy"
+        np.save(tmp, np.asarray(s.table, dtype=np.float64))
+        os.replace(tmp, table_paths[name])
+        header['surfaces'][name] = {
+            'names': list(s.names), 'axes': [a.tolist() for a in s.axes],
+            'max_error': s.max_error, 'mean_error': s.mean_error, 'p99_error': s.p99_error,
+            'compile_seconds': s.compile_seconds,
+        }
+    tmp = f"{header_path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(header, f, indent=2)
+    os.replace(tmp, header_path)
+
+
+def load_or_compile(ai, params: Dict, resolution: Optional[Dict[str, float]] = None,
+                    error_samples: int = 200, cache_dir: str = CACHE_DIR):
+    """
+    Surfaces for a controller from the cache, compiling and storing them on a miss.
+
+    Returns:
+        (surfaces, hit) where hit tells whether they came from disk
+    """
+    key = cache_key(params, resolution)
+    surfaces = load(key, cache_dir)
+    if surfaces is not None:
+        return surfaces, True
+    surfaces = compile_surfaces(ai, resolution, error_samples)
+    try:
+        save(key, surfaces, cache_dir)
+    except OSError as e:
+        print(f"[fuzzy cache] Could not save {key}: {e}")
+    return surfaces, False
+
+
+def main():
+    from fuzzy.fuzzy_ai import FuzzyAI
+    from fuzzy.evolvable_fuzzy_ai import EvolvableFuzzyAI
+    from ga.fuzzy_genome import FuzzyGenome
+
+    parser = argparse.ArgumentParser(description="Precompile fuzzy surfaces into the on-disk cache")
+    parser.add_argument('genomes', nargs='*',
+                        help='Genome .json files (default: evolved_genomes/*.json)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    paths = args.genomes or sorted(glob.glob(os.path.join(PROJECT_ROOT, "evolved_genomes", "*.json")))
+
+    print("FuzzyAI (defaults)")
+    FuzzyAI().compile(cache_dir=args.cache_dir)
+    for path in paths:
+        try:
+            genome = FuzzyGenome.load(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            continue  # not a genome file (e.g. generation stats)
+        print(os.path.basename(path))
+        EvolvableFuzzyAI(genome).compile(cache_dir=args.cache_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,4 +5,9 @@ __all__ = [
     "ga_trainer",
     "neural_genome",
     "ga_nn_trainer",
+    "es_trainer",
+    "cma_trainer",
+    "match_pool",
+    "match_cache",
+    "match_schedule",
 ]
@@ -0,0 +1,393 @@
+"""
+CMA-ES trainer for the 21-parameter FuzzyGenome.
+
+The fuzzy GA runs truncation selection over 3-5 genomes. The genome is a
+small, bounded, continuous vector, which suits CMA-ES better: it adapts a
+full covariance over the genes and usually needs far fewer matches.
+
+- Search runs in normalized space: x in [0, 1]^21 maps to
+  GENE_LOWER..GENE_UPPER (ga/fuzzy_genome.py).
+- Bounds: a candidate is clipped into the box before it plays. The update
+  still uses the unclipped sample, with a quadratic penalty on its
+  distance to the box, so the mean is pulled back inside.
+- Each generation's lambda candidates play in parallel on a persistent
+  process pool. Each worker keeps its own GeneticTrainer, and so its own
+  engine and controllers.
+- The whole state (mean, step size, covariance, evolution paths, RNG,
+  best genome, opponent pool, match count) is checkpointed to
+  evolved_genomes/cma_state.npz every generation and can be resumed.
+- matches_to_target records how many matches it took for the best
+  fitness to reach a target.
+
+Fitness is the mean of the GA's per-match score (ga_trainer.match_score)
+against a fixed opponent pool. GeneticTrainer's fitness comes from matches
+inside its own, evolving population, so the two are NOT comparable.
+--compare-ga therefore runs GeneticTrainer on the same budget and scores
+each new best GA genome against this trainer's opponent pool, then prints
+both matches-to-target counts.
+
+Run:
+    python -m ga.cma_trainer --generations 30 --workers 4 --target 80
+    python -m ga.cma_trainer --resume --generations 10
+    python -m ga.cma_trainer --compare-ga --target 80 --budget 300
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import multiprocessing as mp
+from typing import Callable, List, Optional
+
+import numpy as np
+
+# Ensure project root on path when running this module directly
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ga.fuzzy_genome import FuzzyGenome, GENE_NAMES, GENE_LOWER, GENE_UPPER, NUM_GENES
+
+BOUND_PENALTY = 1000.0  # fitness lost per unit squared distance outside [0, 1]^21
+MAX_FRAMES = 1200       # as GeneticTrainer.evaluate_fitness
+
+
+def to_genes(x: np.ndarray) -> np.ndarray:
+    """Normalized point(s) in [0, 1] -> gene values."""
+    return GENE_LOWER + np.clip(x, 0.0, 1.0) * (GENE_UPPER - GENE_LOWER)
+
+
+def to_normalized(genes: np.ndarray) -> np.ndarray:
+    return (np.asarray(genes, dtype=np.float64) - GENE_LOWER) / (GENE_UPPER - GENE_LOWER)
+
+
+def genome_from_genes(genes: np.ndarray) -> FuzzyGenome:
+    return FuzzyGenome({name: float(v) for name, v in zip(GENE_NAMES, genes)})
+
+
+# Per-process worker state, set by _init_worker
+_worker = {}
+
+
+def _init_worker(opponents: List[np.ndarray], matches: int):
+    # Engine bindings and skfuzzy are imported once per worker
+    from ga.ga_trainer import GeneticTrainer, match_score
+    _worker.update(trainer=GeneticTrainer(verbose=False, match_cache=None), match_score=match_score,
+                   opponents=[genome_from_genes(g) for g in opponents], matches=matches)
+
+
+def _evaluate_candidate(job):
+    """Average match score of one candidate (gene values) against its opponents."""
+    index, genes, seed = job
+    w = _worker
+    genome = genome_from_genes(genes)
+    picks = np.random.default_rng(seed).integers(len(w['opponents']), size=w['matches'])
+    total = 0.0
+    for k in picks:
+        winner, stats = w['trainer'].play_match(genome, w['opponents'][k], max_frames=MAX_FRAMES, headless=True)
+        total += w['match_score'](winner, stats, max_frames=MAX_FRAMES)[0]
+    return index, total / max(1, w['matches'])
+
+
+class CMAESTrainer:
+    """
+    (mu/mu_w, lambda)-CMA-ES over normalized FuzzyGenome genes (maximizing fitness).
+
+    Args:
+        population_size: lambda (default 4 + 3 ln 21 = 13)
+        sigma: Initial step size in normalized units
+        matches: Matches per candidate
+        opponents: Opponent genomes (default: seeded random genomes +
+                   evolved_genomes/best_genome.json if present)
+        workers: Worker processes (default: CPU count; 1 evaluates in this process)
+        target_fitness: Best fitness at which matches_to_target is recorded
+        seed: Seed of the sampling RNG
+        mean: Optional initial genome (default: center of the gene ranges)
+    """
+
+    def __init__(self, population_size: Optional[int] = None, sigma: float = 0.3, matches: int = 3,
+                 opponents: Optional[List[FuzzyGenome]] = None, workers: Optional[int] = None,
+                 target_fitness: Optional[float] = None, seed: Optional[int] = None,
+                 mean: Optional[FuzzyGenome] = None):
+        n = NUM_GENES
+        self.n = n
+        self.lam = population_size or 4 + int(3 * math.log(n))
+        self.mu = self.lam // 2
+        w = math.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = w / w.sum()
+        self.mueff = 1.0 / np.sum(self.weights ** 2)
+        # Default strategy parameters (Hansen, "The CMA Evolution Strategy: A Tutorial")
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0.0, math.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n * n))
+
+        self.rng = np.random.default_rng(seed)
+        self.mean = np.full(n, 0.5) if mean is None else to_normalized([mean.genes[k] for k in GENE_NAMES])
+        self.sigma = sigma
+        self.C = np.eye(n)
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.generation = 0
+        self.total_matches = 0
+        self.best_fitness = float('-inf')
+        self.best_genes = to_genes(self.mean)
+        self.target_fitness = target_fitness
+        self.matches_to_target = None
+
+        self.matches = matches
+        self.workers = workers or os.cpu_count() or 1
+        self.opponents = opponents if opponents is not None else self._default_opponents(seed)
+        self._pool = None
+        self.genomes_dir = "evolved_genomes"
+        os.makedirs(self.genomes_dir, exist_ok=True)
+        self.checkpoint_path = os.path.join(self.genomes_dir, "cma_state.npz")
+
+    def _default_opponents(self, seed: Optional[int]) -> List[FuzzyGenome]:
+        rng = np.random.default_rng(None if seed is None else seed + 1)
+        opponents = [genome_from_genes(to_genes(rng.random(NUM_GENES))) for _ in range(4)]
+        best = os.path.join("evolved_genomes", "best_genome.json")
+        if os.path.exists(best):
+            opponents.append(FuzzyGenome.load(best))
+        return opponents
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+    def _start_pool(self):
+        args = (list(self._opponent_genes()), self.matches)
+        if self.workers <= 1:
+            if not _worker:
+                _init_worker(*args)
+        elif self._pool is None:
+            self._pool = mp.Pool(self.workers, initializer=_init_worker, initargs=args)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _opponent_genes(self) -> np.ndarray:
+        return np.array([[g.genes[k] for k in GENE_NAMES] for g in self.opponents], dtype=np.float64)
+
+    def evaluate(self, genes: np.ndarray) -> np.ndarray:
+        """Fitness of every row of gene values, evaluated in parallel."""
+        fitness = self._play(genes)
+        self.total_matches += len(genes) * self.matches
+        return fitness
+
+    def score(self, genome: FuzzyGenome) -> float:
+        """Fitness of any genome against the opponent pool (not counted in total_matches)."""
+        return float(self._play(np.array([[genome.genes[k] for k in GENE_NAMES]]))[0])
+
+    def _play(self, genes: np.ndarray) -> np.ndarray:
+        self._start_pool()
+        seeds = self.rng.integers(2 ** 31 - 1, size=len(genes))
+        jobs = [(i, genes[i], int(seeds[i])) for i in range(len(genes))]
+        fitness = np.zeros(len(genes))
+        results = map(_evaluate_candidate, jobs) if self._pool is None else \
+            self._pool.imap_unordered(_evaluate_candidate, jobs)
+        for i, score in results:
+            fitness[i] = score
+        return fitness
+
+    # ------------------------------------------------------------------
+    # CMA-ES
+    # ------------------------------------------------------------------
+    def ask(self) -> np.ndarray:
+        """lambda samples N(mean, sigma^2 C) in normalized space (may leave the box)."""
+        eigvals, B = np.linalg.eigh(self.C)
+        D = np.sqrt(np.maximum(eigvals, 1e-20))
+        z = self.rng.standard_normal((self.lam, self.n))
+        return self.mean + self.sigma * (z * D) @ B.T
+
+    def tell(self, x: np.ndarray, fitness: np.ndarray):
+        """Update the distribution from samples x and their (unpenalized) fitness."""
+        n = self.n
+        clipped = np.clip(x, 0.0, 1.0)
+        penalized = fitness - BOUND_PENALTY * np.sum((x - clipped) ** 2, axis=1)
+        order = np.argsort(-penalized, kind='stable')
+        elite = x[order[:self.mu]]
+
+        old_mean = self.mean
+        self.mean = self.weights @ elite
+        y = (self.mean - old_mean) / self.sigma
+
+        eigvals, B = np.linalg.eigh(self.C)
+        inv_sqrt_C = B @ np.diag(1.0 / np.sqrt(np.maximum(eigvals, 1e-20))) @ B.T
+        self.ps = (1 - self.cs) * self.ps + math.sqrt(self.cs * (2 - self.cs) * self.mueff) * inv_sqrt_C @ y
+        ps_norm = np.linalg.norm(self.ps)
+        hsig = ps_norm / math.sqrt(1 - (1 - self.cs) ** (2 * (self.generation + 1))) / self.chi_n < 1.4 + 2 / (n + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * math.sqrt(self.cc * (2 - self.cc) * self.mueff) * y
+
+        artmp = (elite - old_mean) / self.sigma
+        self.C = ((1 - self.c1 - self.cmu) * self.C
+                  + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C)
+                  + self.cmu * (artmp.T * self.weights) @ artmp)
+        self.C = np.triu(self.C) + np.triu(self.C, 1).T  # keep symmetric
+        self.sigma *= math.exp((self.cs / self.damps) * (ps_norm / self.chi_n - 1))
+        self.generation += 1
+
+    def step(self) -> dict:
+        start = time.time()
+        x = self.ask()
+        genes = to_genes(x)
+        fitness = self.evaluate(genes)
+        best = int(np.argmax(fitness))
+        if fitness[best] > self.best_fitness:
+            self.best_fitness = float(fitness[best])
+            self.best_genes = genes[best]
+        if (self.target_fitness is not None and self.matches_to_target is None
+                and self.best_fitness >= self.target_fitness):
+            self.matches_to_target = self.total_matches
+        self.tell(x, fitness)
+        return {
+            'generation': self.generation - 1,
+            'best_fitness': self.best_fitness,
+            'avg_fitness': float(fitness.mean()),
+            'max_fitness': float(fitness.max()),
+            'sigma': self.sigma,
+            'matches': self.total_matches,
+            'matches_to_target': self.matches_to_target,
+            'time': time.time() - start,
+        }
+
+    # ------------------------------------------------------------------
+    # Checkpoints and results
+    # ------------------------------------------------------------------
+    def save_checkpoint(self, path: Optional[str] = None) -> str:
+        path = path or self.checkpoint_path
+        np.savez(path, mean=self.mean, sigma=self.sigma, C=self.C, pc=self.pc, ps=self.ps,
+                 generation=self.generation, total_matches=self.total_matches,
+                 best_fitness=self.best_fitness, best_genes=self.best_genes,
+                 matches_to_target=-1 if self.matches_to_target is None else self.matches_to_target,
+                 lam=self.lam, rng_state=json.dumps(self.rng.bit_generator.state),
+                 opponents=self._opponent_genes())
+        return path
+
+    def load_checkpoint(self, path: Optional[str] = None):
+        path = path or self.checkpoint_path
+        with np.load(path) as data:
+            if int(data['lam']) != self.lam:
+                raise ValueError(f"Checkpoint has population_size {int(data['lam'])}, trainer has {self.lam}")
+            self.mean, self.C, self.pc, self.ps = data['mean'], data['C'], data['pc'], data['ps']
+            self.best_genes = data['best_genes']
+            self.sigma = float(data['sigma'])
+            self.generation = int(data['generation'])
+            self.total_matches = int(data['total_matches'])
+            self.best_fitness = float(data['best_fitness'])
+            self.matches_to_target = int(data['matches_to_target']) if int(data['matches_to_target']) >= 0 else None
+            self.rng.bit_generator.state = json.loads(str(data['rng_state']))
+            # Resume against the pool the run started with (random opponents are not reproducible without it)
+            if 'opponents' in data.files:
+                self.close()
+                _worker.clear()
+                self.opponents = [genome_from_genes(g) for g in data['opponents']]
+
+    def save_best_genome(self):
+        genome = genome_from_genes(self.best_genes)
+        genome.fitness = self.best_fitness
+        genome.save(os.path.join(self.genomes_dir, "cma_best_genome.json"))
+
+    def save_stats(self, row: dict):
+        stats_file = os.path.join(self.genomes_dir, "cma_stats.json")
+        if os.path.exists(stats_file):
+            with open(stats_file, 'r') as f:
+                data = json.load(f)
+        else:
+            data = []
+        data.append(row)
+        with open(stats_file, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def run(self, generations: int = 10, budget: Optional[int] = None):
+        """Run until `generations` are done or `budget` matches have been played."""
+        print(f"CMA-ES: lambda={self.lam} mu={self.mu} sigma={self.sigma:.3f} "
+              f"matches/candidate={self.matches} workers={self.workers}")
+        try:
+            for _ in range(generations):
+                if budget is not None and self.total_matches >= budget:
+                    break
+                row = self.step()
+                self.save_checkpoint()
+                self.save_best_genome()
+                self.save_stats(row)
+                print(f"  gen {row['generation']}: best={row['best_fitness']:.2f} avg={row['avg_fitness']:.2f} "
+                      f"sigma={row['sigma']:.3f} matches={row['matches']} ({row['time']:.1f}s)")
+        finally:
+            self.close()
+        return self.best_fitness
+
+
+def ga_matches_to_target(target: float, budget: int, score: Callable[[FuzzyGenome], float],
+                         population_size: int = 5, elite_size: int = 2,
+                         tournament_size: int = 2) -> Optional[int]:
+    """
+    Matches GeneticTrainer plays until its best genome reaches target (None within budget).
+
+    Args:
+        score: Fitness of a genome on the CMA-ES scale (CMAESTrainer.score). Each
+               new best GA genome is scored with it; those matches are not counted.
+    """
+    from ga.ga_trainer import GeneticTrainer
+
+    trainer = GeneticTrainer(population_size, elite_size, verbose=False, match_cache=None)
+    trainer.tournament_size = tournament_size
+    trainer.initialize_population()
+    scored = None
+    try:
+        while trainer.total_matches < budget:
+            trainer.evolve_generation()
+            best = trainer.best_genome
+            if best is not None and best is not scored:
+                scored = best
+                if score(best) >= target:
+                    return trainer.total_matches
+    finally:
+        trainer.match_pool.close()
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CMA-ES trainer for FuzzyGenome")
+    parser.add_argument('--generations', type=int, default=30)
+    parser.add_argument('--population', type=int, default=None, help='lambda (default 13)')
+    parser.add_argument('--sigma', type=float, default=0.3)
+    parser.add_argument('--matches', type=int, default=3, help='matches per candidate')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--target', type=float, default=None, help='fitness for matches-to-target')
+    parser.add_argument('--budget', type=int, default=None, help='stop after this many matches')
+    parser.add_argument('--resume', action='store_true', help='continue from evolved_genomes/cma_state.npz')
+    parser.add_argument('--compare-ga', action='store_true',
+                        help='also run GeneticTrainer on the same budget, score its best genomes against '
+                             'the same opponents and compare matches-to-target')
+    args = parser.parse_args()
+
+    trainer = CMAESTrainer(args.population, args.sigma, args.matches, workers=args.workers,
+                           target_fitness=args.target, seed=args.seed)
+    if args.resume:
+        trainer.load_checkpoint()
+        print(f"Resumed at generation {trainer.generation} ({trainer.total_matches} matches)")
+    trainer.run(args.generations, args.budget)
+    print(f"Best fitness {trainer.best_fitness:.2f} after {trainer.total_matches} matches "
+          f"-> {trainer.genomes_dir}/cma_best_genome.json")
+
+    if args.compare_ga:
+        if args.target is None:
+            parser.error("--compare-ga needs --target")
+        budget = args.budget or trainer.total_matches
+        try:
+            ga = ga_matches_to_target(args.target, budget, trainer.score)
+        finally:
+            trainer.close()
+        fmt = lambda m: f"{m} matches" if m is not None else f"not reached in {budget} matches"
+        print(f"Matches to fitness {args.target}: CMA-ES {fmt(trainer.matches_to_target)}, GA {fmt(ga)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Evolution Strategies trainer for NeuralGenome (OpenAI-ES).
+
+Instead of elite crossover over a handful of genomes, ES keeps one center
+weight vector and follows an estimate of the fitness gradient:
+
+- mirrored (antithetic) sampling: each noise vector eps is evaluated as
+  center + sigma*eps and center - sigma*eps, which cancels much of the
+  variance of the gradient estimate
+- rank-based fitness shaping: returns are replaced by centered ranks in
+  [-0.5, 0.5], so a few lopsided matches cannot dominate an update
+- shared-seed noise: eps is rebuilt from an integer seed, so a job sent to a
+  worker is just (seed, sign) and only a scalar return comes back. The
+  center lives in shared memory and is written once per generation.
+- every perturbation of a generation is evaluated in parallel on a
+  persistent process pool (one game engine per worker)
+
+Both perturbations of a pair play the same opponents (common random
+numbers). Progress is appended to evolved_nn/evolution_stats.json and the
+center is saved as evolved_nn/es_center.json (.bin) every generation.
+
+Run:
+    python -m ga.es_trainer --generations 50 --population 20 --workers 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing as mp
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Ensure project root on path when running this module directly
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ga.neural_genome import NeuralGenome, TOTAL_GENES, GENE_LIMIT
+
+
+def perturbation(seed: int) -> np.ndarray:
+    """Standard normal noise vector of a seed (identical in every process)."""
+    return np.random.default_rng(seed).standard_normal(TOTAL_GENES, dtype=np.float32)
+
+
+def centered_ranks(returns: np.ndarray) -> np.ndarray:
+    """Returns replaced by their ranks, scaled to [-0.5, 0.5] (ties get distinct ranks)."""
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.size < 2:
+        return np.zeros_like(returns)
+    ranks = np.empty(returns.size, dtype=np.float64)
+    ranks[np.argsort(returns, kind='stable')] = np.arange(returns.size)
+    return ranks / (returns.size - 1) - 0.5
+
+
+# Per-process worker state, set by _init_worker
+_worker = {}
+
+
+def _init_worker(shared_center, opponents: List[np.ndarray], sigma: float, matches: int, max_frames: int):
+    # Engine bindings are imported once per worker, not per match
+    from ga.ga_nn_trainer import play_match, match_score
+    _worker.update(center=np.frombuffer(shared_center, dtype=np.float32), opponents=opponents,
+                   sigma=sigma, matches=matches, max_frames=max_frames,
+                   play_match=play_match, match_score=match_score)
+
+
+def _evaluate_perturbation(job: Tuple[int, int]) -> Tuple[int, int, float]:
+    """Average match score of center + sign * sigma * eps(seed)."""
+    seed, sign = job
+    w = _worker
+    genes = np.clip(w['center'] + sign * w['sigma'] * perturbation(seed), -GENE_LIMIT, GENE_LIMIT)
+    genome = NeuralGenome(genes)
+    # Opponents depend on the seed only, so both signs face the same ones
+    picks = np.random.default_rng(seed + 1).integers(len(w['opponents']), size=w['matches'])
+    total = 0.0
+    for k in picks:
+        winner, stats = w['play_match'](genome, NeuralGenome(w['opponents'][k]), max_frames=w['max_frames'])
+        total += w['match_score'](winner, stats, max_frames=w['max_frames'])
+    return seed, sign, total / max(1, w['matches'])
+
+
+class ESTrainer:
+    """
+    OpenAI-ES over the NeuralGenome weight vector.
+
+    Args:
+        population_size: Perturbations per generation (even; population_size // 2 mirrored pairs)
+        sigma: Noise standard deviation
+        learning_rate: Step size of the center update
+        weight_decay: L2 pull of the center towards zero
+        matches: Matches per perturbation
+        opponents: Opponent genomes (default: random genomes + evolved_nn/best_genome.json if present)
+        workers: Worker processes (default: CPU count; 1 evaluates in this process)
+        seed: Seed of the trainer's RNG (perturbation seeds, initial center)
+    """
+
+    def __init__(self, population_size: int = 20, sigma: float = 0.05, learning_rate: float = 0.03,
+                 weight_decay: float = 0.005, matches: int = 2, max_frames: int = 1800,
+                 opponents: Optional[List[NeuralGenome]] = None, workers: Optional[int] = None,
+                 seed: Optional[int] = None):
+        if population_size < 2 or population_size % 2:
+            raise ValueError(f"population_size must be even and >= 2, got {population_size}")
+        self.population_size = population_size
+        self.sigma = sigma
+        self.learning_rate = learning_rate
+        self.weight_decay = weight_decay
+        self.matches = matches
+        self.max_frames = max_frames
+        self.workers = workers or os.cpu_count() or 1
+        self.rng = np.random.default_rng(seed)
+        self.generation = 0
+        self.best_fitness = float('-inf')
+        self.out_dir = "evolved_nn"
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        self._shared = mp.RawArray('f', TOTAL_GENES)
+        self.center = np.frombuffer(self._shared, dtype=np.float32)
+        self.center[:] = NeuralGenome(rng=self.rng).genes
+        self.opponents = opponents if opponents is not None else self._default_opponents()
+        self._pool = None
+
+        print("=" * 70)
+        print("NEURAL EVOLUTION STRATEGIES TRAINER")
+        print("=" * 70)
+        print(f"Perturbations: {population_size} ({population_size // 2} mirrored pairs) | "
+              f"sigma={sigma} | lr={learning_rate} | Matches/perturbation: {matches} | Workers: {self.workers}")
+
+    def _default_opponents(self) -> List[NeuralGenome]:
+        opponents = [NeuralGenome(rng=self.rng) for _ in range(3)]
+        best = os.path.join(self.out_dir, "best_genome.json")
+        if os.path.exists(best):
+            opponents.append(NeuralGenome.load(best))
+        return opponents
+
+    def _start_pool(self):
+        args = (self._shared, [g.genes for g in self.opponents], self.sigma, self.matches, self.max_frames)
+        if self.workers <= 1:
+            _init_worker(*args)
+        elif self._pool is None:
+            self._pool = mp.Pool(self.workers, initializer=_init_worker, initargs=args)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def evaluate(self, seeds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(returns of +eps, returns of -eps) for every seed, evaluated in parallel."""
+        self._start_pool()
+        jobs = [(int(s), sign) for s in seeds for sign in (1, -1)]
+        index = {int(s): i for i, s in enumerate(seeds)}
+        returns = np.zeros((len(seeds), 2))
+        results = map(_evaluate_perturbation, jobs) if self._pool is None else \
+            self._pool.imap_unordered(_evaluate_perturbation, jobs)
+        for seed, sign, score in results:
+            returns[index[seed], 0 if sign > 0 else 1] = score
+        return returns[:, 0], returns[:, 1]
+
+    def step(self) -> dict:
+        """One generation: evaluate all mirrored perturbations and move the center."""
+        seeds = self.rng.choice(2 ** 31 - 1, size=self.population_size // 2, replace=False)
+        pos, neg = self.evaluate(seeds)
+        shaped = centered_ranks(np.concatenate([pos, neg]))
+        weights = shaped[:len(seeds)] - shaped[len(seeds):]
+
+        grad = np.zeros(TOTAL_GENES, dtype=np.float64)
+        for w, s in zip(weights, seeds):
+            grad += w * perturbation(int(s))
+        grad /= self.population_size * self.sigma
+        update = self.learning_rate * (grad - self.weight_decay * self.center)
+        self.center[:] = np.clip(self.center + update, -GENE_LIMIT, GENE_LIMIT)
+
+        returns = np.concatenate([pos, neg])
+        self.best_fitness = max(self.best_fitness, float(returns.max()))
+        return {
+            'generation': self.generation,
+            'best_fitness': self.best_fitness,
+            'avg_fitness': float(returns.mean()),
+            'min_fitness': float(returns.min()),
+            'max_fitness': float(returns.max()),
+            'population': self.population_size,
+            'trainer': 'es',
+            'sigma': self.sigma,
+            'learning_rate': self.learning_rate,
+            'grad_norm': float(np.linalg.norm(grad)),
+            'update_norm': float(np.linalg.norm(update)),
+            'matches': self.population_size * self.matches,
+        }
+
+    def save_center(self):
+        genome = NeuralGenome(self.center.copy())
+        genome.save(os.path.join(self.out_dir, "es_center.json"))
+        genome.save(os.path.join(self.out_dir, "es_center.bin"))
+
+    def save_stats(self, row: dict):
+        stats_file = os.path.join(self.out_dir, "evolution_stats.json")
+        if os.path.exists(stats_file):
+            with open(stats_file, 'r') as f:
+                data = json.load(f)
+        else:
+            data = []
+        data.append(row)
+        with open(stats_file, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def run(self, generations: int = 10):
+        print(f"Starting ES for {generations} generations...")
+        try:
+            for _ in range(generations):
+                start = time.time()
+                row = self.step()
+                row['seconds'] = time.time() - start
+                self.save_center()
+                self.save_stats(row)
+                print(f"  gen {self.generation}: avg={row['avg_fitness']:.2f} max={row['max_fitness']:.2f} "
+                      f"|update|={row['update_norm']:.4f} ({row['seconds']:.1f}s)")
+                self.generation += 1
+        finally:
+            self.close()
+        print(f"Done. Best fitness={self.best_fitness:.2f}. Center in {self.out_dir}/es_center.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-ES trainer for NeuralGenome")
+    parser.add_argument('--generations', type=int, default=10)
+    parser.add_argument('--population', type=int, default=20, help='perturbations per generation (even)')
+    parser.add_argument('--sigma', type=float, default=0.05)
+    parser.add_argument('--lr', type=float, default=0.03)
+    parser.add_argument('--matches', type=int, default=2, help='matches per perturbation')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    trainer = ESTrainer(args.population, args.sigma, args.lr, matches=args.matches,
+                        workers=args.workers, seed=args.seed)
+    trainer.run(args.generations)
+
+
+if __name__ == "__main__":
+    main()
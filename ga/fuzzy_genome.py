@@ -3,11 +3,67 @@ Fuzzy AI Genome for Genetic Algorithm Evolution
 
 This file defines the genome structure for evolving fuzzy logic AI parameters.
 Each genome contains tunable parameters that control the fuzzy AI's behavior.
+
+FuzzyPopulation keeps a whole population as one (P, 21) array (columns in
+GENE_NAMES order, bounds in GENE_LOWER / GENE_UPPER) and runs the genetic
+operators on all rows at once. Its genomes are FuzzyGenome objects whose
+genes are GeneView rows of that array, so the AI, hashing and save/load
+work on them unchanged.
 """
 
 import random
 import json
-from typing import Dict, Any
+import hashlib
+from collections.abc import MutableMapping
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+
+# Valid range of every gene, in genome order
+GENE_RANGES = {
+    # Distance membership function boundaries
+    'distance_close_max': (200, 500),
+    'distance_medium_min': (150, 400),
+    'distance_medium_max': (400, 800),
+    'distance_far_min': (500, 900),
+    
+    # Health membership function boundaries
+    'health_low_max': (20, 60),
+    'health_medium_min': (20, 50),
+    'health_medium_max': (50, 80),
+    'health_high_min': (50, 80),
+    
+    # Height difference boundaries
+    'height_below_max': (-80, -40),
+    'height_same_range': (50, 120),
+    'height_above_min': (40, 80),
+    
+    # Combat parameters
+    'aggression_threshold': (20, 70),
+    'secondary_fire_threshold': (60, 90),
+    'shoot_distance_max': (300, 700),
+    'shoot_height_diff_max': (50, 150),
+    
+    # Jump parameters
+    'jump_frames': (15, 30),
+    'fuzzy_jump_threshold': (40, 80),
+    
+    # Platform navigation parameters
+    'platform_y_tolerance': (80, 120),
+    'jump_zone_width': (60, 120),
+    
+    # Tactical parameters
+    'retreat_health_threshold': (10, 40),
+    'aggressive_distance': (100, 400),
+}
+DEFAULT_GENE_RANGE = (0, 100)
+
+GENE_NAMES = tuple(GENE_RANGES)
+GENE_INDEX = {name: i for i, name in enumerate(GENE_NAMES)}
+GENE_LOWER = np.array([GENE_RANGES[n][0] for n in GENE_NAMES], dtype=np.float64)
+GENE_UPPER = np.array([GENE_RANGES[n][1] for n in GENE_NAMES], dtype=np.float64)
+NUM_GENES = len(GENE_NAMES)  # 21
 
 
 class FuzzyGenome:
@@ -22,9 +78,12 @@ class FuzzyGenome:
         
         Args:
             genome_dict: Optional dictionary of parameter values.
-                        If None, creates random genome.
+                        If None, creates random genome. A GeneView (a
+                        FuzzyPopulation row) is used in place, not copied.
         """
-        if genome_dict:
+        if isinstance(genome_dict, GeneView):
+            self.genes = genome_dict
+        elif genome_dict:
             self.genes = genome_dict.copy()
         else:
             self.genes = self._create_random_genome()
@@ -37,42 +96,7 @@ class FuzzyGenome:
     
     def _create_random_genome(self) -> Dict[str, float]:
         """Create random genome with all parameters within valid ranges"""
-        return {
-            # Distance membership function boundaries
-            'distance_close_max': random.uniform(200, 500),
-            'distance_medium_min': random.uniform(150, 400),
-            'distance_medium_max': random.uniform(400, 800),
-            'distance_far_min': random.uniform(500, 900),
-            
-            # Health membership function boundaries
-            'health_low_max': random.uniform(20, 60),
-            'health_medium_min': random.uniform(20, 50),
-            'health_medium_max': random.uniform(50, 80),
-            'health_high_min': random.uniform(50, 80),
-            
-            # Height difference boundaries
-            'height_below_max': random.uniform(-80, -40),
-            'height_same_range': random.uniform(50, 120),
-            'height_above_min': random.uniform(40, 80),
-            
-            # Combat parameters
-            'aggression_threshold': random.uniform(20, 70),
-            'secondary_fire_threshold': random.uniform(60, 90),
-            'shoot_distance_max': random.uniform(300, 700),
-            'shoot_height_diff_max': random.uniform(50, 150),
-            
-            # Jump parameters
-            'jump_frames': random.uniform(15, 30),
-            'fuzzy_jump_threshold': random.uniform(40, 80),
-            
-            # Platform navigation parameters
-            'platform_y_tolerance': random.uniform(80, 120),
-            'jump_zone_width': random.uniform(60, 120),
-            
-            # Tactical parameters
-            'retreat_health_threshold': random.uniform(10, 40),
-            'aggressive_distance': random.uniform(100, 400),
-        }
+        return {name: random.uniform(low, high) for name, (low, high) in GENE_RANGES.items()}
     
     def mutate(self, mutation_rate: float = 0.1, mutation_strength: float = 0.2):
         """
@@ -97,30 +121,7 @@ class FuzzyGenome:
     
     def _get_gene_range(self, gene_name: str) -> tuple:
         """Get valid range for a specific gene"""
-        ranges = {
-            'distance_close_max': (200, 500),
-            'distance_medium_min': (150, 400),
-            'distance_medium_max': (400, 800),
-            'distance_far_min': (500, 900),
-            'health_low_max': (20, 60),
-            'health_medium_min': (20, 50),
-            'health_medium_max': (50, 80),
-            'health_high_min': (50, 80),
-            'height_below_max': (-80, -40),
-            'height_same_range': (50, 120),
-            'height_above_min': (40, 80),
-            'aggression_threshold': (20, 70),
-            'secondary_fire_threshold': (60, 90),
-            'shoot_distance_max': (300, 700),
-            'shoot_height_diff_max': (50, 150),
-            'jump_frames': (15, 30),
-            'fuzzy_jump_threshold': (40, 80),
-            'platform_y_tolerance': (80, 120),
-            'jump_zone_width': (60, 120),
-            'retreat_health_threshold': (10, 40),
-            'aggressive_distance': (100, 400),
-        }
-        return ranges.get(gene_name, (0, 100))
+        return GENE_RANGES.get(gene_name, DEFAULT_GENE_RANGE)
     
     def crossover(self, other: 'FuzzyGenome') -> 'FuzzyGenome':
         """
@@ -146,7 +147,7 @@ class FuzzyGenome:
     def save(self, filename: str):
         """Save genome to JSON file"""
         data = {
-            'genes': self.genes,
+            'genes': dict(self.genes),
             'fitness': self.fitness,
             'wins': self.wins,
             'losses': self.losses,
@@ -187,6 +188,11 @@ Genome Summary:
     - Matches: {self.matches_played}
 """
     
+    def content_hash(self) -> str:
+        """Stable hash of the gene values (identical genes -> identical hash in any process)"""
+        payload = json.dumps(dict(self.genes), sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
     @property
     def win_rate(self) -> float:
         """Calculate win rate"""
@@ -196,3 +202,129 @@ Genome Summary:
     
     def __repr__(self):
         return f"FuzzyGenome(fitness={self.fitness:.2f}, wins={self.wins}, losses={self.losses})"
+
+
+class GeneView(MutableMapping):
+    """Dict-like view of one FuzzyPopulation row (reads and writes go to the array)."""
+    
+    __slots__ = ('_row',)
+    
+    def __init__(self, row: np.ndarray):
+        self._row = row
+    
+    def __getitem__(self, name: str) -> float:
+        return float(self._row[GENE_INDEX[name]])
+    
+    def __setitem__(self, name: str, value: float):
+        self._row[GENE_INDEX[name]] = value
+    
+    def __delitem__(self, name: str):
+        raise TypeError("Genes of a population row cannot be removed")
+    
+    def __iter__(self):
+        return iter(GENE_NAMES)
+    
+    def __len__(self) -> int:
+        return NUM_GENES
+    
+    def copy(self) -> Dict[str, float]:
+        return dict(self)
+    
+    def __repr__(self):
+        return f"GeneView({dict(self)!r})"
+
+
+class FuzzyPopulation:
+    """
+    P fuzzy genomes as one (P, NUM_GENES) float64 array.
+    
+    Args:
+        genes: (P, NUM_GENES) gene matrix in GENE_NAMES order (not copied)
+        rng: np.random.Generator for the genetic operators
+    """
+    
+    def __init__(self, genes: np.ndarray, rng: Optional[np.random.Generator] = None):
+        self.genes = np.asarray(genes, dtype=np.float64).reshape(-1, NUM_GENES)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.genomes: List[FuzzyGenome] = [FuzzyGenome(GeneView(row)) for row in self.genes]
+    
+    @classmethod
+    def random(cls, size: int, rng: Optional[np.random.Generator] = None) -> 'FuzzyPopulation':
+        """Genes drawn uniformly within GENE_LOWER..GENE_UPPER"""
+        rng = rng if rng is not None else np.random.default_rng()
+        return cls(GENE_LOWER + rng.random((size, NUM_GENES)) * (GENE_UPPER - GENE_LOWER), rng)
+    
+    @classmethod
+    def from_genomes(cls, genomes: Sequence[FuzzyGenome], rng: Optional[np.random.Generator] = None) -> 'FuzzyPopulation':
+        """Copy genomes' genes (and fitness stats) into a new population"""
+        population = cls(np.array([[g.genes[n] for n in GENE_NAMES] for g in genomes], dtype=np.float64), rng)
+        for view, genome in zip(population.genomes, genomes):
+            _copy_stats(genome, view)
+        return population
+    
+    def __len__(self) -> int:
+        return len(self.genomes)
+    
+    def __getitem__(self, i: int) -> FuzzyGenome:
+        return self.genomes[i]
+    
+    def __iter__(self):
+        return iter(self.genomes)
+    
+    @property
+    def fitness(self) -> np.ndarray:
+        return np.array([g.fitness for g in self.genomes], dtype=np.float64)
+    
+    def clamp(self):
+        """Clip every gene to its valid range (in place)"""
+        np.clip(self.genes, GENE_LOWER, GENE_UPPER, out=self.genes)
+    
+    def mutate(self, mutation_rate: float = 0.1, mutation_strength: float = 0.2, rows=None):
+        """
+        FuzzyGenome.mutate() on all rows (or `rows`) at once: each gene moves by
+        up to +-mutation_strength of its range with probability mutation_rate.
+        """
+        target = self.genes if rows is None else self.genes[rows]
+        mask = self.rng.random(target.shape) < mutation_rate
+        delta = self.rng.uniform(-mutation_strength, mutation_strength, target.shape) * (GENE_UPPER - GENE_LOWER)
+        target += np.where(mask, delta, 0.0)
+        np.clip(target, GENE_LOWER, GENE_UPPER, out=target)
+        if rows is not None:
+            self.genes[rows] = target
+    
+    def crossover(self, parents1, parents2) -> np.ndarray:
+        """Uniform crossover of row pairs: (len(parents1), NUM_GENES) child genes"""
+        a, b = self.genes[np.asarray(parents1)], self.genes[np.asarray(parents2)]
+        return np.where(self.rng.random(a.shape) < 0.5, a, b)
+    
+    def elite_indices(self, elite_size: int) -> np.ndarray:
+        """Rows of the elite_size fittest genomes, best first (ties keep population order)"""
+        return np.argsort(-self.fitness, kind='stable')[:elite_size]
+    
+    def select(self, elite_size: int) -> List[FuzzyGenome]:
+        return [self.genomes[i] for i in self.elite_indices(elite_size)]
+    
+    def breed(self, size: int, mutation_rate: float = 0.1, mutation_strength: float = 0.2) -> 'FuzzyPopulation':
+        """
+        Next population: every row of this one (the elites) followed by
+        size - len(self) mutated uniform-crossover children of two distinct
+        random parents.
+        """
+        n_parents = len(self)
+        n_children = max(0, size - n_parents)
+        first = self.rng.integers(n_parents, size=n_children)
+        # A different second parent whenever there is more than one
+        second = (first + self.rng.integers(1, max(n_parents, 2), size=n_children)) % n_parents
+        children = FuzzyPopulation(self.crossover(first, second), self.rng)
+        children.mutate(mutation_rate, mutation_strength)
+        population = FuzzyPopulation(np.concatenate([self.genes, children.genes]), self.rng)
+        for view, genome in zip(population.genomes, self.genomes):
+            _copy_stats(genome, view)
+        return population
+
+
+def _copy_stats(src: FuzzyGenome, dst: FuzzyGenome):
+    dst.fitness = src.fitness
+    dst.wins = src.wins
+    dst.losses = src.losses
+    dst.matches_played = src.matches_played
@@ -30,10 +30,92 @@ if PROJECT_ROOT not in sys.path:
 import gunmayhem
 from ga.neural_genome import NeuralGenome
 from nn.neural_ai import NeuralAI
+from ga.match_pool import MatchPool
+from ga.match_cache import MatchCache
+from ga.match_schedule import round_robin, swap_sides
+
+
+def play_match(g1: NeuralGenome, g2: NeuralGenome, max_frames=1800, headless=True) -> Tuple[str, dict]:
+    """Play one NeuralAI vs NeuralAI match; returns (winner, stats)."""
+    # Change to build directory at repo root so ../assets resolves correctly
+    build_dir = os.path.join(PROJECT_ROOT, 'build')
+    os.makedirs(build_dir, exist_ok=True)
+    original_dir = os.getcwd()
+    os.chdir(build_dir)
+    try:
+        game = gunmayhem.GameRunner()
+        if not game.init_game("GA NN - Bot vs Bot"):
+            os.chdir(original_dir)
+            return 'draw', {}
+        ai1 = NeuralAI(g1)
+        ai2 = NeuralAI(g2)
+        game_state = gunmayhem.GameState()
+        game_control = gunmayhem.GameControl()
+        frame = 0
+        disabled = False
+        while game.is_running() and frame < max_frames:
+            game.handle_events()
+            players = game_state.get_all_players()
+            if len(players) >= 2:
+                pids = list(players.keys())
+                if not disabled:
+                    game_control.disable_keyboard_for_player(pids[0])
+                    game_control.disable_keyboard_for_player(pids[1])
+                    disabled = True
+                p1 = players[pids[0]]
+                p2 = players[pids[1]]
+                # win checks
+                if p2['lives'] <= 0:
+                    game.quit(); os.chdir(original_dir)
+                    return 'player1', {'frames': frame, 'winner_health': p1['health'], 'winner_lives': p1['lives']}
+                if p1['lives'] <= 0:
+                    game.quit(); os.chdir(original_dir)
+                    return 'player2', {'frames': frame, 'winner_health': p2['health'], 'winner_lives': p2['lives']}
+                a1 = ai1.decide_action(p1, p2)
+                a2 = ai2.decide_action(p2, p1)
+                game_control.set_player_movement(pids[0], bool(a1['up']), bool(a1['left']), bool(a1['down']), bool(a1['right']), bool(a1['primaryFire']), bool(a1['secondaryFire']))
+                game_control.set_player_movement(pids[1], bool(a2['up']), bool(a2['left']), bool(a2['down']), bool(a2['right']), bool(a2['primaryFire']), bool(a2['secondaryFire']))
+            game.update(0.0166)
+            if not headless:
+                game.render()
+            frame += 1
+        game.quit(); os.chdir(original_dir)
+        return 'draw', {'frames': frame}
+    except Exception as e:
+        try:
+            game.quit()
+        except Exception:
+            pass
+        os.chdir(original_dir)
+        return 'draw', {}
+
+
+def match_score(winner: str, stats: dict, max_frames=1800) -> float:
+    """Player 1's fitness from one match (win bonuses for speed, health and lives; draws 25)."""
+    if winner == 'player1':
+        speed_bonus = max(0, max_frames - stats.get('frames', max_frames)) / 100
+        health_bonus = stats.get('winner_health', 0) / 10
+        lives_bonus = stats.get('winner_lives', 0) * 50
+        return 100 + speed_bonus + health_bonus + lives_bonus
+    if winner == 'player2':
+        return 0.0
+    return 25.0
+
+
+def play_genes(job) -> Tuple[str, dict]:
+    """One training match of a (genes1, genes2) job."""
+    genes1, genes2 = job
+    return play_match(NeuralGenome(genes1), NeuralGenome(genes2), max_frames=1800, headless=True)
+
+
+def _match_worker():
+    """Match runner of a MatchPool worker: (genes1, genes2) -> (winner, stats)."""
+    return play_genes
 
 
 class NeuralGATrainer:
-    def __init__(self, population_size=5, elite_size=2, tournament_size=2):
+    def __init__(self, population_size=5, elite_size=2, tournament_size=2, workers=None,
+                 match_cache='match_cache.sqlite'):
         self.population_size = population_size
         self.elite_size = elite_size
         self.tournament_size = tournament_size
@@ -44,86 +126,68 @@ class NeuralGATrainer:
         # artifacts dir
         self.out_dir = "evolved_nn"
         os.makedirs(self.out_dir, exist_ok=True)
+        # Persistent worker processes playing the generation's matches (ga/match_pool.py)
+        self.match_pool = MatchPool(_match_worker, workers=workers)
+        # Match outcomes by genome hashes, reused across generations and runs (ga/match_cache.py)
+        self.match_cache = MatchCache(os.path.join(self.out_dir, match_cache)) if match_cache else None
         print("="*70)
         print("NEURAL GA TRAINER")
         print("="*70)
-        print(f"Population: {population_size} | Elites: {elite_size} | Matches/bot: {tournament_size}")
+        print(f"Population: {population_size} | Elites: {elite_size} | Matches/bot: {tournament_size} | "
+              f"Workers: {self.match_pool.workers}")
+        if self.match_cache is not None:
+            print(f"Match cache: {self.match_cache.path} ({len(self.match_cache)} results)")
 
     def initialize_population(self):
         self.population = [NeuralGenome() for _ in range(self.population_size)]
 
     def _play_match(self, g1: NeuralGenome, g2: NeuralGenome, max_frames=1800, headless=True) -> Tuple[str, dict]:
-        # Change to build directory at repo root so ../assets resolves correctly
-        build_dir = os.path.join(PROJECT_ROOT, 'build')
-        os.makedirs(build_dir, exist_ok=True)
-        original_dir = os.getcwd()
-        os.chdir(build_dir)
-        try:
-            game = gunmayhem.GameRunner()
-            if not game.init_game("GA NN - Bot vs Bot"):
-                os.chdir(original_dir)
-                return 'draw', {}
-            ai1 = NeuralAI(g1)
-            ai2 = NeuralAI(g2)
-            game_state = gunmayhem.GameState()
-            game_control = gunmayhem.GameControl()
-            frame = 0
-            disabled = False
-            while game.is_running() and frame < max_frames:
-                game.handle_events()
-                players = game_state.get_all_players()
-                if len(players) >= 2:
-                    pids = list(players.keys())
-                    if not disabled:
-                        game_control.disable_keyboard_for_player(pids[0])
-                        game_control.disable_keyboard_for_player(pids[1])
-                        disabled = True
-                    p1 = players[pids[0]]
-                    p2 = players[pids[1]]
-                    # win checks
-                    if p2['lives'] <= 0:
-                        game.quit(); os.chdir(original_dir)
-                        return 'player1', {'frames': frame, 'winner_health': p1['health'], 'winner_lives': p1['lives']}
-                    if p1['lives'] <= 0:
-                        game.quit(); os.chdir(original_dir)
-                        return 'player2', {'frames': frame, 'winner_health': p2['health'], 'winner_lives': p2['lives']}
-                    a1 = ai1.decide_action(p1, p2)
-                    a2 = ai2.decide_action(p2, p1)
-                    game_control.set_player_movement(pids[0], bool(a1['up']), bool(a1['left']), bool(a1['down']), bool(a1['right']), bool(a1['primaryFire']), bool(a1['secondaryFire']))
-                    game_control.set_player_movement(pids[1], bool(a2['up']), bool(a2['left']), bool(a2['down']), bool(a2['right']), bool(a2['primaryFire']), bool(a2['secondaryFire']))
-                game.update(0.0166)
-                if not headless:
-                    game.render()
-                frame += 1
-            game.quit(); os.chdir(original_dir)
-            return 'draw', {'frames': frame}
-        except Exception as e:
-            try:
-                game.quit()
-            except Exception:
-                pass
-            os.chdir(original_dir)
-            return 'draw', {}
+        return play_match(g1, g2, max_frames, headless)
 
     def evaluate_fitness(self, genome: NeuralGenome, pool: List[NeuralGenome]) -> float:
-        wins = 0; losses = 0; total = 0.0
         opponents = random.sample(pool, min(self.tournament_size, len(pool)))
-        for opp in opponents:
-            winner, stats = self._play_match(genome, opp, max_frames=1800, headless=True)
+        return self._credit(genome, self.play_matches([(genome, opp) for opp in opponents],
+                                                      lambda jobs: [play_genes(job) for job in jobs]))
+
+    def play_matches(self, pairs: List[Tuple[NeuralGenome, NeuralGenome]], play) -> List[Tuple[str, dict]]:
+        """(player1, player2) match results in order: cached ones looked up, the rest run by play(jobs)."""
+        hashes = [(g1.content_hash(), g2.content_hash()) for g1, g2 in pairs]
+        jobs = [(g1.genes, g2.genes) for g1, g2 in pairs]
+        cache = self.match_cache
+        results = [cache.lookup(h1, h2, 1800) if cache else None for h1, h2 in hashes]
+        pending = [k for k, r in enumerate(results) if r is None]
+        for k, result in zip(pending, play([jobs[k] for k in pending])):
+            results[k] = result
+        if cache is not None:
+            cache.store((*hashes[k], 1800, results[k]) for k in pending)
+            print(f"  [cache] reused {len(jobs) - len(pending)}/{len(jobs)} matches")
+        return results
+
+    def _credit(self, genome: NeuralGenome, results: List[Tuple[str, dict]]) -> float:
+        wins = 0; losses = 0; total = 0.0
+        for winner, stats in results:
             if winner == 'player1':
                 wins += 1
-                speed_bonus = max(0, 1800 - stats.get('frames', 1800)) / 100
-                health_bonus = stats.get('winner_health', 0) / 10
-                lives_bonus = stats.get('winner_lives', 0) * 50
-                total += 100 + speed_bonus + health_bonus + lives_bonus
             elif winner == 'player2':
                 losses += 1
-            else:
-                total += 25
-        genome.wins = wins; genome.losses = losses; genome.matches_played = len(opponents)
-        genome.fitness = total / max(1, len(opponents))
+            total += match_score(winner, stats, max_frames=1800)
+        genome.wins = wins; genome.losses = losses; genome.matches_played = len(results)
+        genome.fitness = total / max(1, len(results))
         return genome.fitness
 
+    def evaluate_population(self):
+        """Every genome vs tournament_size opponents: a round-robin plan, each match credited to both players."""
+        plan = round_robin(len(self.population), self.tournament_size)
+        results = self.play_matches([(self.population[i], self.population[j]) for i, j in plan],
+                                    self.match_pool.play)
+        per_genome = [[] for _ in self.population]
+        for (i, j), result in zip(plan, results):
+            per_genome[i].append(result)
+            per_genome[j].append(swap_sides(result))
+        for i, (g, genome_results) in enumerate(zip(self.population, per_genome)):
+            fit = self._credit(g, genome_results)
+            print(f"  [{i+1}/{len(self.population)}] fitness={fit:.2f}")
+
     def selection(self) -> List[NeuralGenome]:
         return sorted(self.population, key=lambda g: g.fitness, reverse=True)[:self.elite_size]
 
@@ -148,6 +212,7 @@ class NeuralGATrainer:
             cur_file = os.path.join(self.out_dir, "best_genome.json")
             self.best_genome.save(gen_file)
             self.best_genome.save(cur_file)
+            self.best_genome.save(os.path.join(self.out_dir, "best_genome.bin"))
             print(f"[SAVE] {gen_file}")
 
     def save_stats(self):
@@ -162,6 +227,8 @@ class NeuralGATrainer:
             'elites': self.elite_size,
             'tournament': self.tournament_size,
         }
+        if self.match_cache is not None:
+            row.update(self.match_cache.take_stats())
         if os.path.exists(stats_file):
             with open(stats_file, 'r') as f:
                 data = json.load(f)
@@ -174,10 +241,7 @@ class NeuralGATrainer:
     def evolve_generation(self):
         print(f"\n=== GENERATION {self.generation} ===")
         start = time.time()
-        for i, g in enumerate(self.population):
-            pool = [x for x in self.population if x is not g]
-            fit = self.evaluate_fitness(g, pool)
-            print(f"  [{i+1}/{len(self.population)}] fitness={fit:.2f}")
+        self.evaluate_population()
         elites = self.selection()
         self.population = self.crossover_and_mutate(elites)
         self.save_best(); self.save_stats()
@@ -186,8 +250,11 @@ class NeuralGATrainer:
 
     def run(self, generations=3):
         print(f"Starting NN evolution for {generations} generations...")
-        for _ in range(generations):
-            self.evolve_generation()
+        try:
+            for _ in range(generations):
+                self.evolve_generation()
+        finally:
+            self.match_pool.close()
         print(f"Done. Best fitness={self.best_fitness:.2f}. Artifacts in {self.out_dir}/")
 
 
@@ -14,7 +14,6 @@ import random
 import json
 import math
 from typing import List, Tuple
-import multiprocessing as mp
 
 # Add DLL paths
 dll_paths = [
@@ -35,8 +34,68 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 import gunmayhem
-from ga.fuzzy_genome import FuzzyGenome
+from ga.fuzzy_genome import FuzzyGenome, FuzzyPopulation
 from fuzzy.evolvable_fuzzy_ai import EvolvableFuzzyAI
+from fuzzy.batched import BatchedFuzzyInference
+from ga.match_pool import MatchPool
+from ga.match_cache import MatchCache
+from ga.match_schedule import round_robin, swap_sides
+from navigation import navigation_graph
+
+
+def match_score(winner: str, stats: dict, max_frames=1200) -> Tuple[float, str]:
+    """
+    Player 1's fitness terms from one match.
+    
+    Returns:
+        (score, result) with result 'win', 'loss' or 'draw'; timeouts are
+        decided by remaining health (technical win/loss)
+    """
+    if winner == 'player1':
+        # Bonus points for faster wins and remaining health
+        speed_bonus = max(0, max_frames - stats.get('frames', max_frames)) / 100
+        health_bonus = stats.get('winner_health', 0) / 10
+        lives_bonus = stats.get('winner_lives', 0) * 50
+        return 100 + speed_bonus + health_bonus + lives_bonus, 'win'
+    
+    if winner == 'player2':
+        return 0.0, 'loss'  # Loss = 0 points
+    
+    # Timeout: decide a technical winner by remaining health
+    p1_hp = stats.get('p1_health', 0.0)
+    p2_hp = stats.get('p2_health', 0.0)
+    avg_dist = stats.get('avg_distance', 2000.0)
+    shots1 = stats.get('shots1', 0)
+    # engagement features reused
+    proximity_bonus = max(0.0, 500.0 - min(500.0, avg_dist)) / 10.0  # 0..50
+    shots_bonus = min(20.0, shots1 * 0.5)
+    
+    if p1_hp > p2_hp + 0.5:
+        # Count as technical WIN for player1
+        speed_bonus = 0.0  # no KO, keep modest
+        health_bonus = (p1_hp - p2_hp) / 2.0  # reward clear advantage
+        return 60 + speed_bonus + health_bonus + proximity_bonus + shots_bonus, 'win'
+    if p2_hp > p1_hp + 0.5:
+        # Count as technical LOSS for player1
+        # small shaping still applied to avoid zero-signal
+        return max(0.0, proximity_bonus + shots_bonus - 5.0), 'loss'
+    # True draw — equal health: small shaped reward to break ties
+    base_draw = 5.0
+    hp_bonus = 0.0
+    return base_draw + proximity_bonus + shots_bonus + hp_bonus, 'draw'
+
+
+def _match_worker():
+    """Match runner of a MatchPool worker: one quiet trainer (engine, skfuzzy, controllers) per process."""
+    trainer = GeneticTrainer(verbose=False, match_cache=None)
+    
+    def play(job):
+        # Controllers are cached by genome hash; keep the cache bounded across generations
+        if len(trainer.controllers) > 256:
+            trainer.controllers.clear()
+        return trainer.play_genes(*job)
+    
+    return play
 
 
 class GeneticTrainer:
@@ -44,20 +103,33 @@ class GeneticTrainer:
     Genetic Algorithm trainer for evolving fuzzy AI bots.
     """
     
-    def __init__(self, population_size=5, elite_size=2):
+    def __init__(self, population_size=5, elite_size=2, verbose=True, workers=None,
+                 match_cache='match_cache.sqlite'):
         """
         Initialize GA trainer.
         
         Args:
             population_size: Number of bots in population (default: 100)
             elite_size: Number of top bots to keep each generation (default: 10)
+            verbose: Print the banner (off for trainers created in worker processes)
+            workers: Match worker processes (default: CPU count; 1 plays in this process)
+            match_cache: Match result cache file in evolved_genomes/ (None disables it)
         """
         self.population_size = population_size
         self.elite_size = elite_size
         self.population: List[FuzzyGenome] = []
+        # Gene matrix behind self.population (ga/fuzzy_genome.py)
+        self.fuzzy_population = None
         self.generation = 0
         self.best_genome = None
         self.best_fitness = 0.0
+        # One controller per genome (by content hash), reused for all of its
+        # matches in the current generation
+        self.controllers = {}
+        # Matches simulated so far (for matches-to-target comparisons)
+        self.total_matches = 0
+        # Persistent worker processes playing the generation's matches (ga/match_pool.py)
+        self.match_pool = MatchPool(_match_worker, workers=workers)
         
         # Evolution parameters
         self.mutation_rate = 0.15  # 15% chance per gene
@@ -68,14 +140,23 @@ class GeneticTrainer:
         self.genomes_dir = "evolved_genomes"
         if not os.path.exists(self.genomes_dir):
             os.makedirs(self.genomes_dir)
-            print(f"Created '{self.genomes_dir}/' directory for saving genomes\n")
+            if verbose:
+                print(f"Created '{self.genomes_dir}/' directory for saving genomes\n")
+        
+        # Match outcomes by genome hashes, reused across generations and runs (ga/match_cache.py)
+        self.match_cache = MatchCache(os.path.join(self.genomes_dir, match_cache)) if match_cache else None
         
+        if not verbose:
+            return
         print("=" * 70)
         print("GENETIC ALGORITHM TRAINER FOR FUZZY AI")
         print("=" * 70)
         print(f"Population Size: {population_size}")
         print(f"Elite Size: {elite_size}")
         print(f"Tournament Size: {self.tournament_size}")
+        print(f"Match Workers: {self.match_pool.workers}")
+        if self.match_cache is not None:
+            print(f"Match Cache: {self.match_cache.path} ({len(self.match_cache)} results)")
         print(f"Training Mode: HEADLESS (no rendering, faster training)")
         print()
         print("NOTE: SDL2 windows will be created and destroyed for each match.")
@@ -86,7 +167,8 @@ class GeneticTrainer:
     def initialize_population(self):
         """Create initial random population"""
         print(f"\n[INIT] Creating {self.population_size} random genomes...")
-        self.population = [FuzzyGenome() for _ in range(self.population_size)]
+        self.fuzzy_population = FuzzyPopulation.random(self.population_size)
+        self.population = self.fuzzy_population.genomes
         print(f"[INIT] Population initialized!")
     
     def play_match(self, genome1: FuzzyGenome, genome2: FuzzyGenome, 
@@ -124,9 +206,10 @@ class GeneticTrainer:
                 os.chdir(original_dir)
                 return 'draw', {}
             
-            # Create AIs
-            ai1 = EvolvableFuzzyAI(genome1)
-            ai2 = EvolvableFuzzyAI(genome2)
+            # Get (reused) AIs for both genomes
+            ai1, ai2 = self.get_controllers(genome1, genome2)
+            # Both bots' fuzzy outputs in one vectorized call per frame
+            fuzzy_engine = BatchedFuzzyInference([genome1, genome2])
             
             # Create wrappers
             game_state = gunmayhem.GameState()
@@ -154,6 +237,9 @@ class GeneticTrainer:
                         game_control.disable_keyboard_for_player(player_ids[0])
                         game_control.disable_keyboard_for_player(player_ids[1])
                         players_disabled = True
+                        # Map is fixed for the match: resolve its navigation graph once
+                        # and hand the graph itself to the controllers every frame
+                        platforms = navigation_graph(game_state.get_all_platforms() or None)
                     
                     player1_state = players[player_ids[0]]
                     player2_state = players[player_ids[1]]
@@ -184,8 +270,12 @@ class GeneticTrainer:
                         }
                     
                     # AI decisions
-                    ai1_actions = ai1.decide_action(player1_state, player2_state)
-                    ai2_actions = ai2.decide_action(player2_state, player1_state)
+                    aggression, jump_desire = fuzzy_engine.compute_states(
+                        [player1_state, player2_state], [player2_state, player1_state])
+                    ai1_actions = ai1.decide_action(player1_state, player2_state, platforms=platforms,
+                                                    fuzzy_outputs=(aggression[0], jump_desire[0]))
+                    ai2_actions = ai2.decide_action(player2_state, player1_state, platforms=platforms,
+                                                    fuzzy_outputs=(aggression[1], jump_desire[1]))
                     # track shooting attempts
                     if ai1_actions.get('primaryFire'): shots1 += 1
                     if ai2_actions.get('primaryFire'): shots2 += 1
@@ -242,6 +332,30 @@ class GeneticTrainer:
             os.chdir(original_dir)
             return 'draw', {}
     
+    def get_controllers(self, genome1: FuzzyGenome, genome2: FuzzyGenome) -> Tuple[EvolvableFuzzyAI, EvolvableFuzzyAI]:
+        """
+        Controllers for a match, reset and ready to play.
+        
+        Each genome keeps one EvolvableFuzzyAI for the whole generation. Two
+        genomes with identical genes would map to the same controller, so the
+        second side then gets its own instance.
+        """
+        ai1 = self._controller_for(genome1)
+        ai2 = self._controller_for(genome2)
+        if ai2 is ai1:
+            ai2 = EvolvableFuzzyAI(genome2)
+        ai1.reset()
+        ai2.reset()
+        return ai1, ai2
+    
+    def _controller_for(self, genome: FuzzyGenome) -> EvolvableFuzzyAI:
+        key = genome.content_hash()
+        ai = self.controllers.get(key)
+        if ai is None:
+            ai = EvolvableFuzzyAI(genome)
+            self.controllers[key] = ai
+        return ai
+    
     def evaluate_fitness(self, genome: FuzzyGenome, opponent_pool: List[FuzzyGenome]) -> float:
         """
         Evaluate fitness by fighting against random opponents.
@@ -253,65 +367,87 @@ class GeneticTrainer:
         Returns:
             Fitness score (higher is better)
         """
-        wins = 0
-        losses = 0
-        total_score = 0.0
-        
         # Select random opponents
         opponents = random.sample(opponent_pool, min(self.tournament_size, len(opponent_pool)))
         
-        for opponent in opponents:
-            # Shorter matches to reduce stalemates and speed up learning
-            winner, stats = self.play_match(genome, opponent, max_frames=1200, headless=True)
-            
-            if winner == 'player1':
+        # Shorter matches to reduce stalemates and speed up learning
+        results = self.play_matches([(genome, opponent) for opponent in opponents],
+                                    lambda jobs: [self.play_genes(*job) for job in jobs])
+        return self._credit(genome, results)
+    
+    def play_genes(self, genes1, genes2) -> Tuple[str, dict]:
+        """One training match (1200 frames) of two gene sets"""
+        return self.play_match(FuzzyGenome(genes1), FuzzyGenome(genes2), max_frames=1200, headless=True)
+    
+    def play_matches(self, pairs: List[Tuple[FuzzyGenome, FuzzyGenome]], play) -> List[Tuple[str, dict]]:
+        """
+        Results of (player1, player2) training matches, in order.
+        
+        A pairing seen before (e.g. two surviving elites) is taken from the
+        match cache. The remaining (genes1, genes2) jobs are run by
+        play(jobs) and cached.
+        """
+        hashes = [(g1.content_hash(), g2.content_hash()) for g1, g2 in pairs]
+        jobs = [(g1.genes.copy(), g2.genes.copy()) for g1, g2 in pairs]
+        if self.match_cache is not None:
+            results = [self.match_cache.lookup(h1, h2, 1200) for h1, h2 in hashes]
+        else:
+            results = [None] * len(jobs)
+        
+        pending = [k for k, result in enumerate(results) if result is None]
+        for k, result in zip(pending, play([jobs[k] for k in pending])):
+            results[k] = result
+        self.total_matches += len(pending)
+        
+        if self.match_cache is not None:
+            self.match_cache.store((*hashes[k], 1200, results[k]) for k in pending)
+        return results
+    
+    def _credit(self, genome: FuzzyGenome, results: List[Tuple[str, dict]]) -> float:
+        """Set a genome's stats and fitness from its match results (seen as player 1)"""
+        wins = 0
+        losses = 0
+        total_score = 0.0
+        for winner, stats in results:
+            score, result = match_score(winner, stats, max_frames=1200)
+            total_score += score
+            if result == 'win':
                 wins += 1
-                # Bonus points for faster wins and remaining health
-                speed_bonus = max(0, 1200 - stats.get('frames', 1200)) / 100
-                health_bonus = stats.get('winner_health', 0) / 10
-                lives_bonus = stats.get('winner_lives', 0) * 50
-                total_score += 100 + speed_bonus + health_bonus + lives_bonus
-            
-            elif winner == 'player2':
+            elif result == 'loss':
                 losses += 1
-                total_score += 0  # Loss = 0 points
-            
-            else:
-                # Timeout: decide a technical winner by remaining health
-                p1_hp = stats.get('p1_health', 0.0)
-                p2_hp = stats.get('p2_health', 0.0)
-                avg_dist = stats.get('avg_distance', 2000.0)
-                shots1 = stats.get('shots1', 0)
-                # engagement features reused
-                proximity_bonus = max(0.0, 500.0 - min(500.0, avg_dist)) / 10.0  # 0..50
-                shots_bonus = min(20.0, shots1 * 0.5)
-
-                if p1_hp > p2_hp + 0.5:
-                    # Count as technical WIN for player1
-                    wins += 1
-                    speed_bonus = 0.0  # no KO, keep modest
-                    health_bonus = (p1_hp - p2_hp) / 2.0  # reward clear advantage
-                    lives_bonus = 0
-                    total_score += 60 + speed_bonus + health_bonus + proximity_bonus + shots_bonus
-                elif p2_hp > p1_hp + 0.5:
-                    # Count as technical LOSS for player1
-                    losses += 1
-                    # small shaping still applied to avoid zero-signal
-                    total_score += max(0.0, proximity_bonus + shots_bonus - 5.0)
-                else:
-                    # True draw — equal health: small shaped reward to break ties
-                    base_draw = 5.0
-                    hp_bonus = 0.0
-                    total_score += base_draw + proximity_bonus + shots_bonus + hp_bonus
         
         # Update genome stats
         genome.wins = wins
         genome.losses = losses
-        genome.matches_played = len(opponents)
-        genome.fitness = total_score / len(opponents)  # Average fitness
+        genome.matches_played = len(results)
+        genome.fitness = total_score / max(1, len(results))  # Average fitness
         
         return genome.fitness
     
+    def evaluate_population(self):
+        """
+        Evaluate every genome against tournament_size opponents.
+        
+        The generation's round-robin plan (ga/match_schedule.py) plays every
+        pairing once on the match pool and credits it to both genomes, so
+        this takes about half the matches of one evaluate_fitness() per genome.
+        """
+        plan = round_robin(len(self.population), self.tournament_size)
+        
+        played = self.total_matches
+        results = self.play_matches([(self.population[i], self.population[j]) for i, j in plan],
+                                    self.match_pool.play)
+        if self.match_cache is not None:
+            reused = len(plan) - (self.total_matches - played)
+            print(f"       [CACHE] Reused {reused}/{len(plan)} match results ({reused / max(1, len(plan)):.1%})")
+        
+        per_genome = [[] for _ in self.population]
+        for (i, j), result in zip(plan, results):
+            per_genome[i].append(result)
+            per_genome[j].append(swap_sides(result))
+        for genome, genome_results in zip(self.population, per_genome):
+            self._credit(genome, genome_results)
+    
     def selection(self) -> List[FuzzyGenome]:
         """
         Select elite genomes for next generation.
@@ -319,11 +455,11 @@ class GeneticTrainer:
         Returns:
             List of elite genomes
         """
-        # Sort by fitness (descending)
-        sorted_pop = sorted(self.population, key=lambda g: g.fitness, reverse=True)
-        
-        # Return top performers
-        return sorted_pop[:self.elite_size]
+        # Top performers by fitness (descending)
+        if self.fuzzy_population is None or self.population is not self.fuzzy_population.genomes:
+            self.fuzzy_population = FuzzyPopulation.from_genomes(self.population)
+            self.population = self.fuzzy_population.genomes
+        return self.fuzzy_population.select(self.elite_size)
     
     def crossover_and_mutate(self, elites: List[FuzzyGenome]) -> List[FuzzyGenome]:
         """
@@ -335,22 +471,11 @@ class GeneticTrainer:
         Returns:
             New population including elites and offspring
         """
-        new_population = elites.copy()  # Keep elites
-        
-        # Create offspring to fill rest of population
-        while len(new_population) < self.population_size:
-            # Select two random parents from elites
-            parent1, parent2 = random.sample(elites, 2)
-            
-            # Crossover
-            child = parent1.crossover(parent2)
-            
-            # Mutate
-            child.mutate(self.mutation_rate, self.mutation_strength)
-            
-            new_population.append(child)
-        
-        return new_population
+        # Keep elites, then breed all offspring at once (uniform crossover of
+        # two distinct elites + mutation, see FuzzyPopulation.breed)
+        self.fuzzy_population = FuzzyPopulation.from_genomes(elites).breed(
+            self.population_size, self.mutation_rate, self.mutation_strength)
+        return self.fuzzy_population.genomes
     
     def evolve_generation(self):
         """Run one generation of evolution"""
@@ -364,18 +489,7 @@ class GeneticTrainer:
         
         start_time = time.time()
         
-        for i, genome in enumerate(self.population):
-            # Use rest of population as opponent pool
-            opponent_pool = [g for g in self.population if g is not genome]
-            
-            fitness = self.evaluate_fitness(genome, opponent_pool)
-            
-            if (i + 1) % 10 == 0 or (i + 1) == len(self.population):
-                elapsed = time.time() - start_time
-                eta = (elapsed / (i + 1)) * (len(self.population) - (i + 1))
-                print(f"       [{i+1}/{len(self.population)}] "
-                      f"Fitness: {fitness:.2f} | "
-                      f"ETA: {eta:.1f}s")
+        self.evaluate_population()
         
         # Find best genome
         best = max(self.population, key=lambda g: g.fitness)
@@ -401,6 +515,10 @@ class GeneticTrainer:
         print(f"\n[BREED] Creating {self.population_size - self.elite_size} offspring...")
         self.population = self.crossover_and_mutate(elites)
         
+        # Drop controllers of genomes that left the population (elites keep theirs)
+        alive = {g.content_hash() for g in self.population}
+        self.controllers = {k: ai for k, ai in self.controllers.items() if k in alive}
+        
         # Save best genome
         self.save_best_genome()
         
@@ -437,6 +555,8 @@ class GeneticTrainer:
             'min_fitness': min(g.fitness for g in self.population),
             'max_fitness': max(g.fitness for g in self.population),
         }
+        if self.match_cache is not None:
+            stats.update(self.match_cache.take_stats())
         
         # Append to stats file in evolved_genomes folder
         stats_file = os.path.join(self.genomes_dir, "evolution_stats.json")
@@ -462,8 +582,11 @@ class GeneticTrainer:
         
         overall_start = time.time()
         
-        for gen in range(num_generations):
-            self.evolve_generation()
+        try:
+            for gen in range(num_generations):
+                self.evolve_generation()
+        finally:
+            self.match_pool.close()
         
         total_time = time.time() - overall_start
         
@@ -496,7 +619,7 @@ def main():
     print(f"  Elites: {ELITE_SIZE} best bots kept each generation")
     print(f"  Generations: {NUM_GENERATIONS}")
     print(f"  Matches per bot: {TOURNAMENT_SIZE} (tournament size)")
-    print(f"  Total matches: ~{POPULATION_SIZE * TOURNAMENT_SIZE * NUM_GENERATIONS}")
+    print(f"  Total matches: ~{(POPULATION_SIZE * TOURNAMENT_SIZE + 1) // 2 * NUM_GENERATIONS}")
 
     input("\nPress ENTER to start evolution...")
 
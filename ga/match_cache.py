@@ -0,0 +1,126 @@
+"""
+Persistent cache of match outcomes for the GA trainers.
+
+Elites survive unchanged from one generation to the next, and the same
+pairing comes up again and again, but every generation used to replay all
+of their matches. The trainers now look each match up here first. Results
+are stored in an SQLite file, so they are reused across runs as well.
+
+Key = (genome A hash, genome B hash, side, max_frames, engine):
+- the two genome content hashes in sorted order; side says which of them
+  played player1 (0 = genome A), so both orders of a pairing are distinct
+  entries
+- engine: fingerprint of the gunmayhem bindings plus MATCH_FORMAT. Bump
+  MATCH_FORMAT when play_match or the controllers change what a match
+  produces, and stale results are simply never found again.
+
+There is no seed: nothing in a match draws from a seedable RNG. The
+controllers are deterministic, and the engine's only rand() picks the map,
+of which assets/gameConfig.json has one (map1). What can still vary is the
+engine's wall-clock frame time, so a cached result is one sample of the
+pairing, kept for as long as the genomes and the engine are unchanged.
+
+The stored value is play_match's (winner, stats), with winner relative to
+the genome that played player1. Failed matches (empty stats) are not stored.
+
+Usage:
+    cache = MatchCache("evolved_genomes/match_cache.sqlite")
+    result = cache.lookup(h1, h2, 1200)
+    if result is None:
+        result = play_match(...)
+        cache.store([(h1, h2, 1200, result)])
+    print(cache.take_stats())     # hits / misses since the last call
+"""
+import os
+import json
+import hashlib
+import sqlite3
+from typing import Dict, Iterable, Optional, Tuple
+
+MATCH_FORMAT = 2
+
+_COLUMNS = ('genome_a', 'genome_b', 'side', 'max_frames', 'engine', 'winner', 'stats')
+
+Result = Tuple[str, dict]
+
+
+def engine_version() -> str:
+    """Fingerprint of the game engine bindings: __version__, else a digest of the compiled module."""
+    try:
+        import gunmayhem
+    except ImportError:
+        return f"{MATCH_FORMAT}:none"
+    version = getattr(gunmayhem, '__version__', None)
+    path = getattr(gunmayhem, '__file__', None)
+    if version is None and path and os.path.exists(path):
+        with open(path, 'rb') as f:
+            version = hashlib.sha1(f.read()).hexdigest()
+    return f"{MATCH_FORMAT}:{version or 'unknown'}"
+
+
+class MatchCache:
+    """
+    SQLite-backed match results.
+
+    Args:
+        path: Database file (created if missing)
+        engine: Engine fingerprint of stored/looked-up results (default: engine_version())
+    """
+
+    def __init__(self, path: str, engine: Optional[str] = None):
+        self.path = path
+        self.engine = engine or engine_version()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        # Files from an older key layout (MATCH_FORMAT 1 had a seed column) start over
+        columns = tuple(row[1] for row in self._db.execute("PRAGMA table_info(matches)"))
+        if columns and columns != _COLUMNS:
+            self._db.execute("DROP TABLE matches")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS matches ("
+            " genome_a TEXT, genome_b TEXT, side INTEGER, max_frames INTEGER, engine TEXT,"
+            " winner TEXT, stats TEXT,"
+            " PRIMARY KEY (genome_a, genome_b, side, max_frames, engine))")
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, hash1: str, hash2: str, max_frames: int) -> tuple:
+        if hash1 <= hash2:
+            return hash1, hash2, 0, int(max_frames), self.engine
+        return hash2, hash1, 1, int(max_frames), self.engine
+
+    def lookup(self, hash1: str, hash2: str, max_frames: int) -> Optional[Result]:
+        """(winner, stats) of a match with genome hash1 as player1, or None if not cached."""
+        row = self._db.execute(
+            "SELECT winner, stats FROM matches WHERE genome_a=? AND genome_b=? AND side=?"
+            " AND max_frames=? AND engine=?", self._key(hash1, hash2, max_frames)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0], json.loads(row[1])
+
+    def store(self, entries: Iterable[Tuple[str, str, int, Result]]):
+        """Save (hash1, hash2, max_frames, (winner, stats)) entries in one transaction."""
+        rows = [self._key(h1, h2, max_frames) + (winner, json.dumps(stats, default=float))
+                for h1, h2, max_frames, (winner, stats) in entries if stats]
+        if rows:
+            self._db.executemany("INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def take_stats(self) -> Dict[str, float]:
+        """Hits, misses and hit rate since the last call (e.g. one generation), then reset them."""
+        total = self.hits + self.misses
+        stats = {'cache_hits': self.hits, 'cache_misses': self.misses,
+                 'cache_hit_rate': self.hits / total if total else 0.0}
+        self.hits = self.misses = 0
+        return stats
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,103 @@
+"""
+Persistent process pool for match evaluation in the GA trainers.
+
+Every worker process imports the engine bindings and skfuzzy, and builds its
+match runner (the factory's return value) once. After that it only receives
+small picklable jobs, such as (genome genes, opponent genes), and
+returns the match stats. Results come back out of order as matches finish.
+Progress and an ETA are printed as they arrive, and MatchPool.play() returns
+them in job order. A generation's wall time then drops almost linearly with
+the number of cores.
+
+workers=1 runs the same runner in this process, which is the serial
+behavior the trainers had before.
+
+Usage:
+    pool = MatchPool(_match_worker, workers=4)
+    results = pool.play(jobs)          # [runner(job) for job in jobs]
+    pool.close()
+"""
+import os
+import time
+import multiprocessing as mp
+from typing import Callable, List, Optional, Sequence
+
+# Match runner of this process, built by _init_worker
+_runner = None
+
+
+def _init_worker(factory: Callable, args: tuple):
+    global _runner
+    _runner = factory(*args)
+
+
+def _run(job):
+    index, payload = job
+    return index, _runner(payload)
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+class MatchPool:
+    """
+    Args:
+        factory: Picklable top-level function returning the match runner;
+                 called once per worker with *args
+        args: Arguments of factory
+        workers: Worker processes (default: CPU count; 1 = in this process)
+        label: Name of the jobs in progress lines
+        report_every: Print progress every this many results (default: ~10 lines per batch)
+    """
+
+    def __init__(self, factory: Callable, args: tuple = (), workers: Optional[int] = None,
+                 label: str = 'matches', report_every: Optional[int] = None):
+        self.factory = factory
+        self.args = args
+        self.workers = workers or default_workers()
+        self.label = label
+        self.report_every = report_every
+        self._pool = None
+        self._local = None  # runner of workers=1
+
+    def _start(self):
+        if self.workers <= 1:
+            if self._local is None:
+                self._local = self.factory(*self.args)
+        elif self._pool is None:
+            self._pool = mp.Pool(self.workers, initializer=_init_worker, initargs=(self.factory, self.args))
+
+    def play(self, jobs: Sequence, verbose: bool = True) -> List:
+        """Run every job; results in job order (gathered as they finish)."""
+        if not jobs:
+            return []
+        self._start()
+        indexed = list(enumerate(jobs))
+        results = [None] * len(indexed)
+        if self._pool is None:
+            stream = ((index, self._local(payload)) for index, payload in indexed)
+        else:
+            stream = self._pool.imap_unordered(_run, indexed)
+        every = self.report_every or max(1, len(indexed) // 10)
+        start = time.time()
+        for done, (index, result) in enumerate(stream, 1):
+            results[index] = result
+            if verbose and (done % every == 0 or done == len(indexed)):
+                elapsed = time.time() - start
+                eta = elapsed / done * (len(indexed) - done)
+                print(f"       [{done}/{len(indexed)}] {self.label} | "
+                      f"{done / max(elapsed, 1e-9):.2f}/s | ETA: {eta:.1f}s")
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
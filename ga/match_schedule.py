@@ -0,0 +1,84 @@
+"""
+Match plans for a generation: every pairing played once, both genomes credited.
+
+The trainers used to let each genome draw its own opponents. Every match
+then only scored player1, the same pairing was played again when the
+opponent took its turn, and a generation cost P x k matches. round_robin()
+instead builds one plan for the whole population:
+
+- each genome gets exactly k distinct opponents (one genome gets k + 1
+  when P and k are both odd, as P x k / 2 is not a whole number)
+- no pair appears twice, in either order
+- sides are balanced: every genome plays player1 and player2 equally
+  often, or one more of either when its match count is odd
+
+The plan is a circulant graph on a shuffled order of the population: the
+genome at position i meets positions i +- 1 .. i +- k // 2 (as player1
+against i + d, player2 against i - d), and for odd k also one partner of
+a matching at distance P // 2, so it is a fresh plan every generation.
+
+Each match is played once and credited to both players. Player2's result
+comes from swap_sides(), so a generation costs about P x k / 2 matches.
+
+Usage:
+    plan = round_robin(len(population), tournament_size)
+    results = play([(population[i], population[j]) for i, j in plan])
+    for (i, j), result in zip(plan, results):
+        per_genome[i].append(result)
+        per_genome[j].append(swap_sides(result))
+"""
+import random
+from typing import List, Tuple
+
+# Per-side stats of play_match, as (player1 key, player2 key)
+SIDE_KEYS = (('p1_health', 'p2_health'), ('shots1', 'shots2'))
+_SWAPPED_WINNER = {'player1': 'player2', 'player2': 'player1'}
+
+
+def round_robin(size: int, k: int, rng: random.Random = random) -> List[Tuple[int, int]]:
+    """
+    Balanced (player1, player2) index pairs for a population.
+
+    Args:
+        size: Population size
+        k: Opponents per genome (capped at size - 1)
+        rng: Source of the shuffle and the side tie-breaks
+    """
+    k = min(k, size - 1)
+    if k <= 0:
+        return []
+    order = list(range(size))
+    rng.shuffle(order)
+    plan = []
+    # Ring distances 1 .. k // 2: each genome is player1 once and player2 once per distance
+    for d in range(1, k // 2 + 1):
+        plan.extend((order[i], order[(i + d) % size]) for i in range(size))
+    if k % 2:
+        # One more opponent each: a matching along distance size // 2, sides drawn at random
+        d = size // 2
+        if size % 2 == 0:
+            matching = [(i, i + d) for i in range(d)]
+        else:
+            # Distance d walks one cycle through every position (gcd(size, d) = 1);
+            # every other edge of it is a matching that leaves the last position out
+            cycle = [(j * d) % size for j in range(size)]
+            matching = [(cycle[j], cycle[j + 1]) for j in range(0, size - 1, 2)]
+        matching = [pair if rng.random() < 0.5 else pair[::-1] for pair in matching]
+        if size % 2:
+            # The left-out position plays the cycle's closing edge; its partner
+            # takes the side it did not take in the matching
+            spare, partner = cycle[-1], cycle[0]
+            matching.append((spare, partner) if matching[0][0] == partner else (partner, spare))
+        plan.extend((order[a], order[b]) for a, b in matching)
+    rng.shuffle(plan)
+    return plan
+
+
+def swap_sides(result: Tuple[str, dict]) -> Tuple[str, dict]:
+    """A play_match (winner, stats) as seen from player2 (winner_* stats already follow the winner)."""
+    winner, stats = result
+    stats = dict(stats)
+    for key1, key2 in SIDE_KEYS:
+        if key1 in stats or key2 in stats:
+            stats[key1], stats[key2] = stats.get(key2, 0), stats.get(key1, 0)
+    return _SWAPPED_WINNER.get(winner, winner), stats
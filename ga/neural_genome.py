@@ -5,14 +5,21 @@ Architecture (fixed):
 - Hidden: 16 units (tanh)
 - Outputs: 6 actions (sigmoid -> threshold)
 
-Genes: flattened list of weights and biases in order [W1, b1, W2, b2].
+Genes: flat float32 array of weights and biases in order [W1, b1, W2, b2]
+(1.2 KB per genome). mutate()/crossover() draw whole-genome masks from a
+np.random.Generator (module default, see seed_rng()); save()/load() use JSON,
+or a compact binary file (BINARY_SUFFIX: fixed header + raw float32 genes)
+when the filename ends in .bin.
 """
 from __future__ import annotations
 import json
+import hashlib
 import math
-import random
+import struct
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import Optional
+
+import numpy as np
 
 INPUT_SIZE = 12
 HIDDEN_SIZE = 16
@@ -24,66 +31,88 @@ B1_SIZE = HIDDEN_SIZE                        # 16
 W2_SIZE = HIDDEN_SIZE * OUTPUT_SIZE          # 16*6 = 96
 B2_SIZE = OUTPUT_SIZE                        # 6
 TOTAL_GENES = W1_SIZE + B1_SIZE + W2_SIZE + B2_SIZE  # 310
+GENE_LIMIT = 3.0  # clamp to avoid exploding weights
+
+BINARY_SUFFIX = ".bin"
+# magic, input, hidden, output, fitness, wins, losses, matches_played; then TOTAL_GENES float32.
+# The header is 30 bytes (no padding), so a file is 30 + 4 * TOTAL_GENES = 1270 bytes.
+_BINARY_HEADER = struct.Struct('<4s3Hd3i')
+_BINARY_MAGIC = b'NGv1'
+
+_rng = np.random.default_rng()
+
 
+def seed_rng(seed: Optional[int] = None) -> np.random.Generator:
+    """Reseed the default generator used by NeuralGenome."""
+    global _rng
+    _rng = np.random.default_rng(seed)
+    return _rng
 
-def _rand_weight(scale: float = 1.0) -> float:
-    # Xavier-like init range
-    return random.uniform(-scale, scale)
 
+def random_genes(rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Xavier-like uniform weights, zero biases."""
+    rng = _rng if rng is None else rng
+    scale1 = math.sqrt(6.0 / (INPUT_SIZE + HIDDEN_SIZE))
+    scale2 = math.sqrt(6.0 / (HIDDEN_SIZE + OUTPUT_SIZE))
+    genes = np.zeros(TOTAL_GENES, dtype=np.float32)
+    genes[:W1_SIZE] = rng.uniform(-scale1, scale1, W1_SIZE)
+    off = W1_SIZE + B1_SIZE
+    genes[off:off + W2_SIZE] = rng.uniform(-scale2, scale2, W2_SIZE)
+    return genes
 
-@dataclass
+
+# eq=False: genomes compare by identity (gene arrays have no truth value)
+@dataclass(eq=False)
 class NeuralGenome:
-    genes: List[float] = field(default_factory=list)
+    genes: Optional[np.ndarray] = None
     fitness: float = 0.0
     wins: int = 0
     losses: int = 0
     matches_played: int = 0
+    rng: Optional[np.random.Generator] = field(default=None, repr=False)
 
     def __post_init__(self):
-        if not self.genes:
-            # Initialize with small random values
-            scale1 = math.sqrt(6.0 / (INPUT_SIZE + HIDDEN_SIZE))
-            scale2 = math.sqrt(6.0 / (HIDDEN_SIZE + OUTPUT_SIZE))
-            # W1
-            self.genes = [_rand_weight(scale1) for _ in range(W1_SIZE)]
-            # b1
-            self.genes += [0.0 for _ in range(B1_SIZE)]
-            # W2
-            self.genes += [_rand_weight(scale2) for _ in range(W2_SIZE)]
-            # b2
-            self.genes += [0.0 for _ in range(B2_SIZE)]
+        if self.genes is None or len(self.genes) == 0:
+            self.genes = random_genes(self.rng)
+        else:
+            self.genes = np.array(self.genes, dtype=np.float32)
 
     @property
     def win_rate(self) -> float:
         return (self.wins / self.matches_played) if self.matches_played else 0.0
 
+    def content_hash(self) -> str:
+        """Stable hash of the gene values (identical genes -> identical hash in any process)."""
+        return hashlib.sha1(self.genes.astype('<f4').tobytes()).hexdigest()
+
     def clone(self) -> "NeuralGenome":
-        g = NeuralGenome(self.genes.copy())
+        g = NeuralGenome(self.genes.copy(), rng=self.rng)
         g.fitness = self.fitness
         g.wins = self.wins
         g.losses = self.losses
         g.matches_played = self.matches_played
         return g
 
-    def mutate(self, mutation_rate: float = 0.15, sigma: float = 0.1):
+    def mutate(self, mutation_rate: float = 0.15, sigma: float = 0.1, rng: Optional[np.random.Generator] = None):
         """Gaussian noise per gene with given probability."""
-        for i in range(len(self.genes)):
-            if random.random() < mutation_rate:
-                self.genes[i] += random.gauss(0.0, sigma)
-                # clamp to avoid exploding weights
-                if self.genes[i] > 3.0:
-                    self.genes[i] = 3.0
-                elif self.genes[i] < -3.0:
-                    self.genes[i] = -3.0
-
-    def crossover(self, other: "NeuralGenome") -> "NeuralGenome":
-        child = NeuralGenome(self.genes.copy())
-        for i in range(len(self.genes)):
-            if random.random() < 0.5:
-                child.genes[i] = other.genes[i]
-        return child
+        rng = rng or self.rng or _rng
+        mask = rng.random(TOTAL_GENES) < mutation_rate
+        self.genes[mask] += rng.normal(0.0, sigma, int(mask.sum())).astype(np.float32)
+        np.clip(self.genes, -GENE_LIMIT, GENE_LIMIT, out=self.genes)
+
+    def crossover(self, other: "NeuralGenome", rng: Optional[np.random.Generator] = None) -> "NeuralGenome":
+        """Uniform crossover: each gene from either parent with probability 0.5."""
+        rng = rng or self.rng or _rng
+        mask = rng.random(TOTAL_GENES) < 0.5
+        return NeuralGenome(np.where(mask, other.genes, self.genes), rng=self.rng)
 
     def save(self, filename: str):
+        if filename.endswith(BINARY_SUFFIX):
+            with open(filename, "wb") as f:
+                f.write(_BINARY_HEADER.pack(_BINARY_MAGIC, INPUT_SIZE, HIDDEN_SIZE, OUTPUT_SIZE,
+                                            self.fitness, self.wins, self.losses, self.matches_played))
+                f.write(self.genes.astype('<f4').tobytes())
+            return
         data = {
             "arch": {
                 "input": INPUT_SIZE,
@@ -91,7 +120,7 @@ class NeuralGenome:
                 "output": OUTPUT_SIZE,
                 "total": TOTAL_GENES,
             },
-            "genes": self.genes,
+            "genes": self.genes.tolist(),
             "fitness": self.fitness,
             "wins": self.wins,
             "losses": self.losses,
@@ -102,6 +131,8 @@ class NeuralGenome:
 
     @classmethod
     def load(cls, filename: str) -> "NeuralGenome":
+        if filename.endswith(BINARY_SUFFIX):
+            return cls._load_binary(filename)
         with open(filename, "r") as f:
             data = json.load(f)
         genes = data["genes"]
@@ -115,6 +146,25 @@ class NeuralGenome:
         g.matches_played = data.get("matches_played", 0)
         return g
 
+    @classmethod
+    def _load_binary(cls, filename: str) -> "NeuralGenome":
+        with open(filename, "rb") as f:
+            data = f.read()
+        magic, n_in, n_hidden, n_out, fitness, wins, losses, matches = _BINARY_HEADER.unpack_from(data)
+        if magic != _BINARY_MAGIC:
+            raise ValueError(f"{filename} is not a binary NeuralGenome")
+        if (n_in, n_hidden, n_out) != (INPUT_SIZE, HIDDEN_SIZE, OUTPUT_SIZE):
+            raise ValueError(f"Invalid architecture {(n_in, n_hidden, n_out)} != {(INPUT_SIZE, HIDDEN_SIZE, OUTPUT_SIZE)}")
+        genes = np.frombuffer(data, dtype='<f4', offset=_BINARY_HEADER.size)
+        if len(genes) != TOTAL_GENES:
+            raise ValueError(f"Invalid gene length {len(genes)} != {TOTAL_GENES}")
+        g = NeuralGenome(genes)
+        g.fitness = fitness
+        g.wins = wins
+        g.losses = losses
+        g.matches_played = matches
+        return g
+
     def summary(self) -> str:
         return (
             f"NeuralGenome: {len(self.genes)} genes (I={INPUT_SIZE}, H={HIDDEN_SIZE}, O={OUTPUT_SIZE})\n"
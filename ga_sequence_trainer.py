@@ -26,6 +26,7 @@ if sys.version_info >= (3, 8):
 
 import gunmayhem
 from sequence_genome import SequenceGenome, TOTAL_FRAMES, NUM_WINDOWS
+from ga.match_pool import MatchPool
 
 # --- Configuration ---
 RECORDING_FILE = "my_recording.json"
@@ -34,8 +35,24 @@ ELITE_SIZE = 5
 NUM_GENERATIONS = 100
 # ---
 
+def _match_worker():
+    """Match runner of a MatchPool worker: (genes, seed) -> fitness vs the recording."""
+    trainer = SequenceGATrainer(worker=True)
+
+    def play(job):
+        genes, seed = job
+        random.seed(seed)
+        return trainer._play_match_vs_recording(SequenceGenome(genes=genes))
+    return play
+
+
 class SequenceGATrainer:
-    def __init__(self):
+    def __init__(self, workers=None, worker=False):
+        """
+        Args:
+            workers: Match worker processes (default: CPU count; 1 plays in this process)
+            worker: Only load what a match needs (trainers created inside MatchPool workers)
+        """
         self.generation = 0
         self.recording = self._load_recording()
         
@@ -46,6 +63,11 @@ class SequenceGATrainer:
         self.build_dir = os.path.join(project_root, 'build')
         self.original_dir = os.getcwd()
         os.makedirs(self.build_dir, exist_ok=True)
+        if worker:
+            return
+        
+        # Persistent worker processes playing the generation's matches (ga/match_pool.py)
+        self.match_pool = MatchPool(_match_worker, workers=workers)
         
         # --- NEW: Seed the population with new 3-int genome ---
         print("Creating initial population with seeds...")
@@ -69,7 +91,7 @@ class SequenceGATrainer:
         print("="*60)
         print("GA Sequence Trainer")
         print(f"Population: {POPULATION_SIZE} (seeded) | Elites: {ELITE_SIZE}")
-        print(f"Opponent: {RECORDING_FILE}")
+        print(f"Opponent: {RECORDING_FILE} | Workers: {self.match_pool.workers}")
         print("="*60)
         
     def _load_recording(self):
@@ -197,33 +219,36 @@ class SequenceGATrainer:
         print(f"Running evolution for {generations} generations...")
         best_fitness = -float('inf')
         
-        for gen in range(generations):
-            start_time = time.time()
+        try:
+            for gen in range(generations):
+                start_time = time.time()
             
-            for genome in self.population:
-                genome.fitness = self._play_match_vs_recording(genome)
+                fitness = self.match_pool.play([(genome.genes, random.getrandbits(31)) for genome in self.population])
+                for genome, value in zip(self.population, fitness):
+                    genome.fitness = value
             
-            sorted_pop = sorted(self.population, key=lambda g: g.fitness, reverse=True)
-            elites = sorted_pop[:ELITE_SIZE]
-            best_of_gen = elites[0]
+                sorted_pop = sorted(self.population, key=lambda g: g.fitness, reverse=True)
+                elites = sorted_pop[:ELITE_SIZE]
+                best_of_gen = elites[0]
             
-            if best_of_gen.fitness > best_fitness:
-                best_fitness = best_of_gen.fitness
-                print(f"[NEW BEST] Gen {gen}: Fitness = {best_fitness:.2f}")
+                if best_of_gen.fitness > best_fitness:
+                    best_fitness = best_of_gen.fitness
+                    print(f"[NEW BEST] Gen {gen}: Fitness = {best_fitness:.2f}")
 
-            best_of_gen.save(os.path.join(self.out_dir, "best_genome.json"))
+                best_of_gen.save(os.path.join(self.out_dir, "best_genome.json"))
             
-            new_population = elites.copy()
-            while len(new_population) < POPULATION_SIZE:
-                p1, p2 = random.sample(elites, 2)
-                child = p1.crossover(p2)
-                child.mutate(mutation_rate=0.1) 
-                new_population.append(child)
+                new_population = elites.copy()
+                while len(new_population) < POPULATION_SIZE:
+                    p1, p2 = random.sample(elites, 2)
+                    child = p1.crossover(p2)
+                    child.mutate(mutation_rate=0.1) 
+                    new_population.append(child)
                 
-            self.population = new_population
-            gen_time = time.time() - start_time
-            print(f"Gen {gen} complete in {gen_time:.2f}s. Best Fitness: {best_of_gen.fitness:.2f}. (Best bot saved)")
-            
+                self.population = new_population
+                gen_time = time.time() - start_time
+                print(f"Gen {gen} complete in {gen_time:.2f}s. Best Fitness: {best_of_gen.fitness:.2f}. (Best bot saved)")
+        finally:
+            self.match_pool.close()
         print("\nEvolution complete!")
         print(f"Final best bot saved to {self.out_dir}/best_genome.json")
 
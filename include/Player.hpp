@@ -31,6 +31,9 @@ public:
 
     // Weapon *getWeapon() { return weapon; }
     void setPrimaryWeapon(Weapon *pw);
+    Weapon *getPrimaryWeapon() const { return primaryWeapon; }
+    // weapon that handleWeapon() fires with (secondary takes precedence)
+    Weapon *getActiveWeapon() const { return secondaryWeapon ? secondaryWeapon : primaryWeapon; }
     void handleWeapon();
     float getHealth() { return health; }
     float getLives() { return lives; }
@@ -4,6 +4,10 @@ Gym Environment Wrapper for Gun Mayhem for MARL training.
 This environment implements a self-play scenario.
 - The 'agent' (Agent 0) is the one being trained.
 - The 'opponent' (Agent 1) uses a provided policy model.
+
+When several environments are stepped together, wrap them in
+BatchedOpponentVecEnv so the opponent acts for all of them in a single
+batched forward pass instead of one predict() call per env per step.
 """
 import os
 import sys
@@ -27,6 +31,7 @@ if sys.version_info >= (3, 8):
 
 import gunmayhem
 from stable_baselines3.common.base_class import BaseAlgorithm
+from stable_baselines3.common.vec_env import VecEnvWrapper
 from feature_extraction import get_observation, INPUT_SIZE
 
 # Constants
@@ -67,6 +72,11 @@ class GunMayhemEnv(gym.Env):
         self.frame_count = 0
         self.p1_id = None
         self.p2_id = None
+
+        # Opponent's observation of the current state (computed once per step)
+        self.obs_p2 = None
+        # Episode result from the agent's point of view ('win', 'loss', 'draw')
+        self.outcome = None
         
         # Change to build directory (required by your scripts)
         project_root = os.path.dirname(os.path.abspath(__file__))
@@ -78,6 +88,12 @@ class GunMayhemEnv(gym.Env):
         """Updates the opponent policy."""
         self.opponent_model = opponent_model
 
+    def get_opponent_observation(self) -> np.ndarray:
+        """Returns the opponent's (player 2) observation of the current state."""
+        if self.obs_p2 is None:
+            return np.zeros(INPUT_SIZE, dtype=np.float32)
+        return self.obs_p2
+
     def _get_game_state(self) -> Optional[Dict]:
         """Gets the player states from the game."""
         if not self.game or not self.game.is_running():
@@ -128,11 +144,14 @@ class GunMayhemEnv(gym.Env):
         if p1_state['lives'] <= 0:
             reward -= 100.0  # Big loss penalty
             done = True
+            self.outcome = 'loss'
         elif p2_state['lives'] <= 0:
             reward += 100.0  # Big win bonus
             done = True
+            self.outcome = 'win'
         elif self.frame_count >= MAX_FRAMES:
             done = True # Timeout
+            self.outcome = 'draw'
             
         return reward, done
 
@@ -150,24 +169,35 @@ class GunMayhemEnv(gym.Env):
     def step(self, action_p1):
         """
         Run one timestep of the environment's dynamics.
+
+        `action_p1` is either the agent's 6 actions, or 12 values where the
+        last 6 are the opponent's actions computed externally (this is how
+        BatchedOpponentVecEnv injects its batched predictions).
         """
         os.chdir(self.build_dir)
         
         try:
-            # 1. Get observation for opponent
+            # 1. Check the game is still alive
             p1_state, p2_state = self._get_game_state()
             if p1_state is None:
                 # Game crashed or ended unexpectedly
                 os.chdir(self.original_dir)
                 return self.observation_space.sample(), -100, True, {}
 
-            obs_p2 = get_observation(p2_state, p1_state) # Note: reversed!
-            
             # 2. Get actions for both players
-            action_p1_dict = self._convert_action(action_p1)
+            action_p1 = np.asarray(action_p1).reshape(-1)
+            action_p1_dict = self._convert_action(action_p1[:6])
+            opponent_inference_ms = 0.0
             
-            if self.opponent_model:
+            if action_p1.shape[0] >= 12:
+                action_p2_dict = self._convert_action(action_p1[6:12])
+            elif self.opponent_model:
+                obs_p2 = self.obs_p2
+                if obs_p2 is None:
+                    obs_p2 = get_observation(p2_state, p1_state) # Note: reversed!
+                start = time.perf_counter()
                 action_p2_array, _ = self.opponent_model.predict(obs_p2, deterministic=True)
+                opponent_inference_ms = (time.perf_counter() - start) * 1000.0
                 action_p2_dict = self._convert_action(action_p2_array)
             else:
                 # Dummy opponent does nothing
@@ -206,11 +236,18 @@ class GunMayhemEnv(gym.Env):
             # 6. Compute reward and done
             reward, done = self._compute_reward(new_p1_state, new_p2_state)
 
-            # 7. Get new observation for P1
+            # 7. Get new observations for P1 and for the opponent's next move
             obs_p1 = get_observation(new_p1_state, new_p2_state)
+            self.obs_p2 = get_observation(new_p2_state, new_p1_state) # Note: reversed!
+            info = {
+                'opponent_obs': self.obs_p2,
+                'opponent_inference_ms': opponent_inference_ms,
+            }
+            if done:
+                info['outcome'] = self.outcome
             
             os.chdir(self.original_dir)
-            return obs_p1, reward, done, {}
+            return obs_p1, reward, done, info
 
         except Exception as e:
             print(f"[ENV_ERROR] Exception in step: {e}")
@@ -257,6 +294,8 @@ class GunMayhemEnv(gym.Env):
             self.last_p2_health = p2['health']
             self.last_p2_lives = p2['lives']
             self.frame_count = 0
+            self.obs_p2 = get_observation(p2, p1)
+            self.outcome = None
             
             os.chdir(self.original_dir)
             
@@ -290,4 +329,290 @@ class GunMayhemEnv(gym.Env):
         self.game_state = None
         self.game_control = None
         self.p1_id = None
-        self.p2_id = None
\ No newline at end of file
+        self.p2_id = None
+        self.obs_p2 = None
+
+
+class BatchedOpponentVecEnv(VecEnvWrapper):
+    """
+    VecEnv wrapper that computes the opponent's actions for every env at once.
+
+    Instead of each GunMayhemEnv calling opponent_model.predict() on a single
+    observation (paying the full SB3/torch dispatch cost per env per step),
+    the opponent observations of all envs are stacked and sent through one
+    batched predict() call. The opponent actions are appended to the agent
+    actions, so the inner envs receive 12 values per step.
+
+    With an opponent_pool (see marl_league.OpponentPool), every env samples
+    its own opponent at the start of each episode and reports the episode
+    outcome back to the pool. Envs sharing an opponent are still batched
+    together: one predict() per distinct opponent per step.
+
+    Note: the game engine is a process-wide singleton, so more than one env
+    must live in a SubprocVecEnv (one game per worker process).
+    """
+
+    def __init__(self, venv, opponent_model: Optional[BaseAlgorithm] = None, opponent_pool=None):
+        super(BatchedOpponentVecEnv, self).__init__(venv)
+        self.opponent_model = opponent_model
+        self.opponent_pool = opponent_pool
+        self.opponent_obs = np.zeros((self.num_envs, INPUT_SIZE), dtype=np.float32)
+
+        # Per-env opponents when sampling from a pool: (snapshot name, policy)
+        self.env_opponents = [(None, None)] * self.num_envs
+
+        # Opponent inference cost tracking
+        self.inference_time = 0.0
+        self.inference_calls = 0
+        self.last_inference_ms = 0.0
+
+    def set_opponent_model(self, opponent_model: BaseAlgorithm):
+        """Updates the opponent policy used for all envs."""
+        self.opponent_model = opponent_model
+
+    def _sample_opponents(self, indices):
+        """Start-of-episode opponent choice for the given envs."""
+        if self.opponent_pool is None or len(self.opponent_pool) == 0:
+            return
+        for i in indices:
+            self.env_opponents[i] = self.opponent_pool.sample()
+
+    def _refresh_opponent_obs(self, indices=None):
+        """Pulls the current opponent observations from the inner envs."""
+        if indices is None:
+            indices = list(range(self.num_envs))
+        observations = self.venv.env_method('get_opponent_observation', indices=indices)
+        for i, obs in zip(indices, observations):
+            self.opponent_obs[i] = obs
+
+    def _predict_opponent(self) -> np.ndarray:
+        """One batched forward pass per distinct opponent over its envs' observations."""
+        if self.opponent_pool is not None and self.env_opponents[0][1] is not None:
+            groups = {}
+            for i, (name, policy) in enumerate(self.env_opponents):
+                groups.setdefault(name, (policy, []))[1].append(i)
+        elif self.opponent_model is not None:
+            groups = {None: (self.opponent_model, list(range(self.num_envs)))}
+        else:
+            self.last_inference_ms = 0.0
+            return np.zeros((self.num_envs, 6), dtype=np.int64)
+
+        actions = np.zeros((self.num_envs, 6), dtype=np.int64)
+        start = time.perf_counter()
+        for policy, indices in groups.values():
+            group_actions, _ = policy.predict(self.opponent_obs[indices], deterministic=True)
+            actions[indices] = np.asarray(group_actions).reshape(len(indices), 6)
+        elapsed = time.perf_counter() - start
+
+        self.inference_time += elapsed
+        self.inference_calls += 1
+        self.last_inference_ms = elapsed * 1000.0
+        return actions
+
+    def reset(self):
+        obs = self.venv.reset()
+        self._refresh_opponent_obs()
+        self._sample_opponents(range(self.num_envs))
+        return obs
+
+    def step_async(self, actions):
+        actions = np.asarray(actions).reshape(self.num_envs, -1)
+        opponent_actions = self._predict_opponent().astype(actions.dtype)
+        self.venv.step_async(np.concatenate([actions, opponent_actions], axis=1))
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+
+        # Finished envs were auto-reset by the VecEnv, so their last
+        # 'opponent_obs' belongs to the old episode; fetch fresh ones.
+        reset_indices = []
+        for i, info in enumerate(infos):
+            if dones[i] or 'opponent_obs' not in info:
+                reset_indices.append(i)
+            else:
+                self.opponent_obs[i] = info['opponent_obs']
+            info['opponent_inference_ms'] = self.last_inference_ms / self.num_envs
+            if dones[i] and self.opponent_pool is not None:
+                name = self.env_opponents[i][0]
+                if name is not None:
+                    self.opponent_pool.record_result(name, info.get('outcome'))
+                    info['opponent'] = name
+        if reset_indices:
+            self._refresh_opponent_obs(reset_indices)
+            self._sample_opponents(reset_indices)
+
+        return obs, rewards, dones, infos
+
+    def get_inference_stats(self) -> Dict:
+        """Returns the opponent's inference cost so far."""
+        calls = max(1, self.inference_calls)
+        per_step_ms = self.inference_time * 1000.0 / calls
+        return {
+            'num_envs': self.num_envs,
+            'batched_calls': self.inference_calls,
+            'total_seconds': self.inference_time,
+            'ms_per_step': per_step_ms,
+            'ms_per_env_step': per_step_ms / self.num_envs,
+        }
+
+    def reset_inference_stats(self):
+        self.inference_time = 0.0
+        self.inference_calls = 0
+
+
+class GunMayhemParallelEnv:
+    """
+    PettingZoo-style parallel environment where both players learn.
+
+    GunMayhemEnv only trains player 1 and throws player 2's transition away.
+    Here every step returns observations, rewards, dones and infos for both
+    agents, keyed by agent name, so one simulated frame yields two samples.
+
+    The reward in GunMayhemEnv is zero-sum (damage, lives and the win bonus
+    are mirrored), so player 2's reward is the negation of player 1's.
+    """
+    metadata = {'render.modes': ['human'], 'name': 'gunmayhem_parallel_v0'}
+
+    possible_agents = ['player_1', 'player_2']
+
+    def __init__(self):
+        self.env = GunMayhemEnv()
+        self.agents = list(self.possible_agents)
+        self._observation_space = self.env.observation_space
+        self._action_space = self.env.action_space
+
+    def observation_space(self, agent: str):
+        return self._observation_space
+
+    def action_space(self, agent: str):
+        return self._action_space
+
+    def reset(self) -> Dict[str, np.ndarray]:
+        self.agents = list(self.possible_agents)
+        obs_p1 = self.env.reset()
+        return {
+            'player_1': obs_p1,
+            'player_2': self.env.get_opponent_observation(),
+        }
+
+    def step(self, actions: Dict[str, np.ndarray]):
+        joint_action = np.concatenate([
+            np.asarray(actions['player_1']).reshape(-1)[:6],
+            np.asarray(actions['player_2']).reshape(-1)[:6],
+        ])
+        obs_p1, reward, done, info = self.env.step(joint_action)
+
+        if 'opponent_obs' in info:
+            obs_p2 = info['opponent_obs']
+            reward_p2 = -reward
+        else:
+            # Engine error: both agents get the same penalty and a dummy obs
+            obs_p2 = self.observation_space('player_2').sample()
+            reward_p2 = reward
+
+        outcome = info.get('outcome')
+        mirrored = {'win': 'loss', 'loss': 'win'}.get(outcome, outcome)
+
+        observations = {'player_1': obs_p1, 'player_2': obs_p2}
+        rewards = {'player_1': reward, 'player_2': reward_p2}
+        dones = {'player_1': done, 'player_2': done}
+        infos = {
+            'player_1': {'outcome': outcome} if done else {},
+            'player_2': {'outcome': mirrored} if done else {},
+        }
+        if done:
+            self.agents = []
+        return observations, rewards, dones, infos
+
+    def render(self, mode='human'):
+        self.env.render(mode)
+
+    def close(self):
+        self.env.close()
+
+
+class SharedPolicyVecEnv(VecEnvWrapper):
+    """
+    Exposes both players of every game as separate VecEnv slots.
+
+    Slot 2*i is player 1 of game i and slot 2*i+1 is player 2, so a single
+    SB3 model (shared policy) acts for, and learns from, both perspectives:
+    num_envs games produce 2 * num_envs transitions per simulated frame.
+    Uses the same 12-value action protocol and mirrored reward as
+    GunMayhemParallelEnv, but over a (Subproc)VecEnv of GunMayhemEnv so
+    several games can run in separate processes.
+    """
+
+    def __init__(self, venv):
+        super(SharedPolicyVecEnv, self).__init__(venv)
+        self.num_games = venv.num_envs
+        self.num_envs = 2 * venv.num_envs
+
+    def _interleave(self, obs_p1, obs_p2) -> np.ndarray:
+        obs = np.empty((self.num_envs, INPUT_SIZE), dtype=np.float32)
+        obs[0::2] = obs_p1
+        obs[1::2] = obs_p2
+        return obs
+
+    def _opponent_observations(self, indices=None):
+        return np.asarray(self.venv.env_method('get_opponent_observation', indices=indices))
+
+    def _slot_indices(self, indices):
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
+
+    def get_attr(self, attr_name, indices=None):
+        # Both slots of a game share the same underlying env
+        values = self.venv.get_attr(attr_name)
+        return [values[i // 2] for i in self._slot_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        values = self.venv.env_is_wrapped(wrapper_class)
+        return [values[i // 2] for i in self._slot_indices(indices)]
+
+    def reset(self):
+        obs_p1 = self.venv.reset()
+        return self._interleave(obs_p1, self._opponent_observations())
+
+    def step_async(self, actions):
+        # (2N, 6) -> (N, 12): [player 1 actions | player 2 actions] per game
+        actions = np.asarray(actions).reshape(self.num_games, 12)
+        self.venv.step_async(actions)
+
+    def step_wait(self):
+        obs_p1, rewards, dones, infos = self.venv.step_wait()
+
+        obs_p2 = np.zeros((self.num_games, INPUT_SIZE), dtype=np.float32)
+        rewards_p2 = np.empty_like(rewards)
+        infos_all = []
+        reset_games = []
+        for g, info in enumerate(infos):
+            info_p2 = {}
+            if 'opponent_obs' in info:
+                rewards_p2[g] = -rewards[g]
+            else:
+                rewards_p2[g] = rewards[g]
+            if dones[g]:
+                # The game was auto-reset: info holds the terminal state
+                reset_games.append(g)
+                if 'opponent_obs' in info:
+                    info_p2['terminal_observation'] = info['opponent_obs']
+                outcome = info.get('outcome')
+                info_p2['outcome'] = {'win': 'loss', 'loss': 'win'}.get(outcome, outcome)
+                for key in ('TimeLimit.truncated',):
+                    if key in info:
+                        info_p2[key] = info[key]
+            elif 'opponent_obs' in info:
+                obs_p2[g] = info['opponent_obs']
+            infos_all.extend([info, info_p2])
+        if reset_games:
+            obs_p2[reset_games] = self._opponent_observations(reset_games)
+
+        all_rewards = np.empty(self.num_envs, dtype=np.float32)
+        all_rewards[0::2] = rewards
+        all_rewards[1::2] = rewards_p2
+        all_dones = np.repeat(np.asarray(dones), 2)
+        return self._interleave(obs_p1, obs_p2), all_rewards, all_dones, infos_all
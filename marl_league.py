@@ -0,0 +1,154 @@
+"""
+League self-play for the MARL trainer.
+
+OpponentPool keeps every policy snapshot taken during training on disk
+(models_marl/pool/) and picks the opponent for each episode by prioritized
+fictitious self-play (PFSP): snapshots the learner still struggles against
+are sampled more often than ones it already beats.
+
+- Snapshots are saved as the SB3 .zip (for resuming/inspection) plus the
+  NumPy .npz export, which is what rollouts actually use.
+- Policies are loaded lazily from the .npz and kept in a small LRU cache,
+  so switching opponents every episode never reloads a model zip.
+- Win/draw/loss counts per snapshot are persisted in pool.json.
+"""
+import os
+import json
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from nn.marl_policy_ai import MarlPolicyAI, export_policy
+
+POOL_INDEX = "pool.json"
+
+
+class OpponentPool:
+    """
+    On-disk pool of frozen policy snapshots with PFSP sampling.
+
+    Args:
+        pool_dir: Folder holding the snapshots and pool.json
+        cache_size: Max number of policies kept in memory (LRU)
+        weighting: 'hard' -> (1 - p)^2, favours opponents the learner loses to
+                   'variance' -> p * (1 - p), favours evenly matched opponents
+                   'uniform' -> plain fictitious self-play
+        prior_games: Pseudo-games at 50% added to every snapshot so new
+                     snapshots get sampled before their win rate is known
+    """
+
+    def __init__(self, pool_dir: str, cache_size: int = 8, weighting: str = 'hard',
+                 prior_games: float = 2.0, seed: Optional[int] = None):
+        self.pool_dir = pool_dir
+        self.cache_size = cache_size
+        self.weighting = weighting
+        self.prior_games = prior_games
+        self.rng = np.random.default_rng(seed)
+
+        self.snapshots: List[Dict] = []
+        self._cache: "OrderedDict[str, MarlPolicyAI]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        os.makedirs(self.pool_dir, exist_ok=True)
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _index_path(self) -> str:
+        return os.path.join(self.pool_dir, POOL_INDEX)
+
+    def _load_index(self):
+        path = self._index_path()
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.snapshots = json.load(f)
+
+    def save(self):
+        with open(self._index_path(), 'w') as f:
+            json.dump(self.snapshots, f, indent=2)
+
+    def add_snapshot(self, model, step: int) -> str:
+        """Freeze the current model into the pool and return the snapshot name."""
+        name = f"snapshot_{step:09d}"
+        model.save(os.path.join(self.pool_dir, name))
+        export_policy(model, os.path.join(self.pool_dir, name + ".npz"))
+
+        self.snapshots = [s for s in self.snapshots if s['name'] != name]
+        self.snapshots.append({'name': name, 'step': step, 'wins': 0, 'draws': 0, 'losses': 0})
+        self._cache.pop(name, None)
+        self.save()
+        return name
+
+    # ------------------------------------------------------------------
+    # Lazy loading with LRU cache
+    # ------------------------------------------------------------------
+    def get_policy(self, name: str) -> MarlPolicyAI:
+        policy = self._cache.get(name)
+        if policy is not None:
+            self._cache.move_to_end(name)
+            self.cache_hits += 1
+            return policy
+
+        self.cache_misses += 1
+        policy = MarlPolicyAI.load(os.path.join(self.pool_dir, name + ".npz"))
+        self._cache[name] = policy
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return policy
+
+    # ------------------------------------------------------------------
+    # Prioritized fictitious self-play
+    # ------------------------------------------------------------------
+    def win_rate(self, snapshot: Dict) -> float:
+        """Learner's win rate against a snapshot (draws count half)."""
+        games = snapshot['wins'] + snapshot['draws'] + snapshot['losses']
+        score = snapshot['wins'] + 0.5 * snapshot['draws']
+        return (score + 0.5 * self.prior_games) / (games + self.prior_games)
+
+    def sampling_probabilities(self) -> np.ndarray:
+        p = np.array([self.win_rate(s) for s in self.snapshots], dtype=np.float64)
+        if self.weighting == 'hard':
+            weights = (1.0 - p) ** 2
+        elif self.weighting == 'variance':
+            weights = p * (1.0 - p)
+        else:
+            weights = np.ones_like(p)
+        weights += 1e-6  # never starve a snapshot completely
+        return weights / weights.sum()
+
+    def sample(self) -> Tuple[str, MarlPolicyAI]:
+        """Pick the opponent for one episode."""
+        if not self.snapshots:
+            raise RuntimeError("Opponent pool is empty; add a snapshot first")
+        idx = self.rng.choice(len(self.snapshots), p=self.sampling_probabilities())
+        name = self.snapshots[idx]['name']
+        return name, self.get_policy(name)
+
+    def record_result(self, name: str, outcome: str):
+        """Record an episode outcome from the learner's point of view ('win', 'draw', 'loss')."""
+        key = {'win': 'wins', 'draw': 'draws', 'loss': 'losses'}.get(outcome)
+        if key is None:
+            return
+        for snapshot in self.snapshots:
+            if snapshot['name'] == name:
+                snapshot[key] += 1
+                return
+
+    def summary(self, top: int = 5) -> str:
+        probs = self.sampling_probabilities() if self.snapshots else np.zeros(0)
+        order = np.argsort(-probs)[:top]
+        lines = [f"Opponent pool: {len(self.snapshots)} snapshots, "
+                 f"cache {len(self._cache)}/{self.cache_size} "
+                 f"(hits {self.cache_hits}, misses {self.cache_misses})"]
+        for i in order:
+            s = self.snapshots[i]
+            games = s['wins'] + s['draws'] + s['losses']
+            lines.append(f"  {s['name']}: p={probs[i]:.2f} | learner W/D/L "
+                         f"{s['wins']}/{s['draws']}/{s['losses']} ({games} games)")
+        return "\n".join(lines)
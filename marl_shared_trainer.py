@@ -0,0 +1,92 @@
+"""
+Shared-policy MARL trainer for Gun Mayhem (both players learn).
+
+marl_trainer.py trains player 1 only, so player 2's half of every simulated
+frame is thrown away. Here one PPO policy controls both players of every
+game (SharedPolicyVecEnv) and learns from both perspectives, doubling the
+learning samples per simulated frame.
+
+Run:
+    python marl_shared_trainer.py
+"""
+import os
+import time
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+from marl_environment import GunMayhemEnv, SharedPolicyVecEnv
+from nn.marl_policy_ai import export_policy
+from marl_trainer import LOG_DIR, MODEL_DIR, NUM_ENVS, STEPS_PER_UPDATE, TOTAL_TIMESTEPS, policy_kwargs
+
+# --- Configuration ---
+MODEL_NAME = "ppo_gunmayhem_shared"
+
+
+def create_environment(num_games=NUM_ENVS):
+    """Each game is one process (the engine is a singleton) and gives two policy slots."""
+    env_fns = [GunMayhemEnv for _ in range(num_games)]
+    if num_games > 1:
+        venv = SubprocVecEnv(env_fns)
+    else:
+        venv = DummyVecEnv(env_fns)
+    return SharedPolicyVecEnv(venv)
+
+
+def main():
+    print("="*60)
+    print("MARL (PPO Shared-Policy) Trainer")
+    print("="*60)
+
+    env = create_environment()
+    print(f"{env.num_games} games -> {env.num_envs} learning slots per step")
+
+    model_path = os.path.join(MODEL_DIR, f"{MODEL_NAME}.zip")
+    if os.path.exists(model_path):
+        print("Loading existing model...")
+        model = PPO.load(model_path, env=env)
+        model.set_tensorboard_log(LOG_DIR)
+    else:
+        print("Creating new model...")
+        model = PPO(
+            "MlpPolicy",
+            env,
+            policy_kwargs=policy_kwargs,
+            verbose=1,
+            tensorboard_log=LOG_DIR,
+            n_steps=1024,  # per slot; 2 slots per game keep the rollout size of marl_trainer
+            batch_size=64,
+            n_epochs=10,
+            gamma=0.99,
+            learning_rate=3e-4
+        )
+
+    num_updates = TOTAL_TIMESTEPS // STEPS_PER_UPDATE
+    print(f"Starting training for {TOTAL_TIMESTEPS} samples ({num_updates} updates)...")
+
+    for i in range(num_updates):
+        print(f"\n---=== Update {i+1} / {num_updates} ===---")
+        start_time = time.time()
+
+        model.learn(
+            total_timesteps=STEPS_PER_UPDATE,
+            reset_num_timesteps=False,
+            tb_log_name=MODEL_NAME
+        )
+
+        model.save(os.path.join(MODEL_DIR, MODEL_NAME))
+        export_policy(model, os.path.join(MODEL_DIR, f"{MODEL_NAME}.npz"))
+        print("Model saved.")
+
+        end_time = time.time()
+        print(f"Update {i+1} finished in {(end_time - start_time) / 60:.2f} minutes "
+              f"({STEPS_PER_UPDATE / max(1e-9, end_time - start_time):.0f} samples/s).")
+
+    print("="*60)
+    print("Training Complete!")
+    print(f"Final model saved to: {MODEL_DIR}/{MODEL_NAME}.zip")
+    print("="*60)
+
+    env.close()
+
+
+if __name__ == "__main__":
+    main()
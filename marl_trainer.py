@@ -1,23 +1,33 @@
 """
 MARL Trainer for Gun Mayhem using PPO and Self-Play.
 
-This script trains one PPO model and makes it play against
-a frozen copy of itself, updating the opponent periodically.
+This script trains one PPO model against a league of its own past
+snapshots. Every STEPS_PER_UPDATE steps the current policy is frozen into
+an on-disk opponent pool (marl_league.py); each episode picks its opponent
+from the pool by prioritized fictitious self-play.
+Opponents run through the NumPy export of the policy
+(nn/marl_policy_ai.py), so rollouts never call PPO.predict for them.
 """
 import os
 import time
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
 from stable_baselines3.common.callbacks import CheckpointCallback
-from marl_environment import GunMayhemEnv
+from marl_environment import GunMayhemEnv, BatchedOpponentVecEnv
+from marl_league import OpponentPool
+from nn.marl_policy_ai import export_policy
 
 # --- Configuration ---
 TOTAL_TIMESTEPS = 2_000_000  # Total steps to train for
 STEPS_PER_UPDATE = 100_000    # Steps to train before updating the opponent
+NUM_ENVS = 4                  # Games stepped together (one process each when > 1)
 MODEL_NAME = "ppo_gunmayhem_marl"
 LOG_DIR = "logs_marl"
 MODEL_DIR = "models_marl"
 OPPONENT_PATH = os.path.join(MODEL_DIR, "best_opponent.zip")
+POOL_DIR = os.path.join(MODEL_DIR, "pool")
+POOL_CACHE_SIZE = 8           # Snapshots kept loaded in memory (LRU)
+POOL_WEIGHTING = "hard"       # PFSP weighting: 'hard', 'variance' or 'uniform'
 
 os.makedirs(LOG_DIR, exist_ok=True)
 os.makedirs(MODEL_DIR, exist_ok=True)
@@ -28,11 +38,21 @@ policy_kwargs = dict(
     net_arch=dict(pi=[16], vf=[16]) # pi = policy, vf = value function
 )
 
-def create_environment(opponent_model=None):
-    """Helper function to create and wrap the environment."""
-    env = GunMayhemEnv(opponent_model=opponent_model)
-    env = DummyVecEnv([lambda: env])
-    return env
+def create_environment(opponent_model=None, num_envs=NUM_ENVS, opponent_pool=None):
+    """
+    Helper function to create and wrap the environment.
+
+    The opponent is not given to the individual envs; BatchedOpponentVecEnv
+    predicts its actions for all envs in one batched call per step
+    (per episode from opponent_pool when one is given).
+    The game engine is a singleton, so multiple envs need their own process.
+    """
+    env_fns = [GunMayhemEnv for _ in range(num_envs)]
+    if num_envs > 1:
+        venv = SubprocVecEnv(env_fns)
+    else:
+        venv = DummyVecEnv(env_fns)
+    return BatchedOpponentVecEnv(venv, opponent_model=opponent_model, opponent_pool=opponent_pool)
 
 def main():
     print("="*60)
@@ -43,7 +63,7 @@ def main():
     if not os.path.exists(OPPONENT_PATH):
         print("No opponent model found. Creating a new one...")
         # Create a temporary env with no opponent
-        temp_env = create_environment(opponent_model=None)
+        temp_env = create_environment(opponent_model=None, num_envs=1)
         # Create a new model with small network
         initial_model = PPO(
             "MlpPolicy", 
@@ -53,16 +73,20 @@ def main():
             tensorboard_log=LOG_DIR
         )
         initial_model.save(OPPONENT_PATH)
+        export_policy(initial_model, OPPONENT_PATH.replace(".zip", ".npz"))
         temp_env.close()
         del temp_env
         del initial_model
         print(f"Initial opponent model saved to {OPPONENT_PATH}")
 
-    # 2. Load the initial opponent
-    opponent_model = PPO.load(OPPONENT_PATH)
+    # 2. Open the opponent pool (seeded with the initial opponent)
+    pool = OpponentPool(POOL_DIR, cache_size=POOL_CACHE_SIZE, weighting=POOL_WEIGHTING)
+    if len(pool) == 0:
+        pool.add_snapshot(PPO.load(OPPONENT_PATH), step=0)
+    print(pool.summary())
     
     # 3. Create the main environment
-    env = create_environment(opponent_model=opponent_model)
+    env = create_environment(opponent_pool=pool)
     
     # 4. Load the main model (or create new)
     if os.path.exists(os.path.join(MODEL_DIR, f"{MODEL_NAME}.zip")):
@@ -102,17 +126,22 @@ def main():
             tb_log_name=MODEL_NAME
         )
         
-        # Save the newly trained model
+        # Save the newly trained model (+ its NumPy export for play/eval)
         model.save(os.path.join(MODEL_DIR, MODEL_NAME))
+        export_policy(model, os.path.join(MODEL_DIR, f"{MODEL_NAME}.npz"))
         print("Model saved.")
         
-        # Update the opponent
-        print("Updating opponent model...")
-        opponent_model.load(os.path.join(MODEL_DIR, f"{MODEL_NAME}.zip"))
+        # Freeze the current policy into the league; new episodes may
+        # sample it from now on (no env/model reload needed)
+        print("Adding snapshot to opponent pool...")
+        pool.add_snapshot(model, step=model.num_timesteps)
+        print(pool.summary())
         
-        # Set the environment's opponent to the new model
-        # We must use the 'env.envs[0]' because it's wrapped by DummyVecEnv
-        env.envs[0].set_opponent_model(opponent_model)
+        # Report the opponent's inference cost for this update
+        stats = env.get_inference_stats()
+        print(f"Opponent inference: {stats['ms_per_step']:.3f} ms per batched step "
+              f"({stats['ms_per_env_step']:.3f} ms per env step, {stats['num_envs']} envs)")
+        env.reset_inference_stats()
         
         end_time = time.time()
         print(f"Update {i+1} finished in {(end_time - start_time) / 60:.2f} minutes.")
@@ -123,6 +152,7 @@ def main():
     print("Run 'tensorboard --logdir=logs_marl' to see results.")
     print("="*60)
     
+    pool.save()
     env.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+"""
+Quantized-input LRU memoization for the decide_action() controllers.
+
+Controller inputs change slowly between frames (integer health, distances
+moving a few pixels per frame), yet inference runs every frame. This module
+wraps the pure inference step of a controller in a bounded LRU cache keyed
+by quantized inputs, so repeated or near-identical states skip inference.
+
+Only the stateless part is memoized - decide_action() itself keeps running
+every frame, so the double-jump hold logic is unaffected:
+- FuzzyAI / EvolvableFuzzyAI: _compute_aggression, _compute_jump_desire
+- NeuralAI: _logits (12 features)
+- MarlPolicyAI: logits (single observations; batches bypass the cache)
+
+Cached values are computed at the quantized input (bin center), so results
+do not depend on which exact state filled the entry.
+
+Usage:
+    ai = memoize_controller(FuzzyAI(), quantization={'_compute_aggression': (5, 1, 1)})
+    ...
+    print(format_stats(ai))
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+Steps = Union[float, Sequence[float]]
+
+# Method -> quantization step per input (scalar = same step for every input)
+DEFAULT_QUANTIZATION: Dict[str, Steps] = {
+    # distance px, health, enemy health
+    '_compute_aggression': (2.0, 1.0, 1.0),
+    # height diff px, health, distance px
+    '_compute_jump_desire': (2.0, 1.0, 2.0),
+    # Normalized feature / observation vectors (dx of 1/256 ~ 2.5 px)
+    '_logits': 1.0 / 256.0,
+    'logits': 1.0 / 256.0,
+}
+
+
+class QuantizedLRU:
+    """
+    Memoizes fn(*inputs) on quantized inputs with a bounded LRU.
+
+    Accepts either scalar arguments (one step per argument) or a single
+    1-D vector argument (one step per element, or one step for all).
+    """
+
+    def __init__(self, fn: Callable, steps: Steps, maxsize: int = 4096, name: Optional[str] = None):
+        self.fn = fn
+        self.steps = steps
+        self.maxsize = maxsize
+        self.name = name or getattr(fn, '__name__', 'fn')
+        self._cache: "OrderedDict[tuple, object]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.miss_seconds = 0.0  # time spent in fn on misses
+        self.hit_seconds = 0.0   # time spent answering hits
+
+    def _step(self, i: int) -> float:
+        if isinstance(self.steps, (int, float)):
+            return float(self.steps)
+        return float(self.steps[i])
+
+    def _quantize(self, args):
+        """(key, inputs at the bin center) or (None, None) for uncacheable input."""
+        if len(args) == 1 and not np.isscalar(args[0]):
+            vector = np.asarray(args[0], dtype=np.float64)
+            if vector.ndim != 1:
+                return None, None
+            steps = np.asarray(self.steps, dtype=np.float64)
+            bins = np.rint(vector / steps)
+            center = bins * steps
+            if isinstance(args[0], np.ndarray):
+                center = center.astype(args[0].dtype)
+            else:
+                center = center.tolist()
+            return tuple(bins.astype(np.int64).tolist()), (center,)
+
+        key = tuple(int(round(a / self._step(i))) for i, a in enumerate(args))
+        return key, tuple(k * self._step(i) for i, k in enumerate(key))
+
+    def __call__(self, *args):
+        start = time.perf_counter()
+        key, inputs = self._quantize(args)
+        if key is None:
+            self.bypassed += 1
+            return self.fn(*args)
+
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            self.hit_seconds += time.perf_counter() - start
+            return value
+
+        value = self.fn(*inputs)
+        self._cache[key] = value
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        self.misses += 1
+        self.miss_seconds += time.perf_counter() - start
+        return value
+
+    @property
+    def hit_rate(self) -> float:
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    @property
+    def time_saved(self) -> float:
+        """Estimated seconds saved: hits x average miss cost - time spent on hits."""
+        if not self.misses:
+            return 0.0
+        return self.hits * (self.miss_seconds / self.misses) - self.hit_seconds
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'hit_rate': self.hit_rate,
+            'entries': len(self._cache),
+            'time_saved_s': self.time_saved,
+        }
+
+
+def memoize_controller(ai, quantization: Optional[Dict[str, Steps]] = None, maxsize: int = 4096):
+    """
+    Memoize the inference methods of a controller in place and return it.
+
+    Args:
+        ai: FuzzyAI, EvolvableFuzzyAI, NeuralAI or MarlPolicyAI (others are
+            returned unchanged)
+        quantization: Per-method overrides of DEFAULT_QUANTIZATION
+        maxsize: LRU entries per method
+    """
+    steps = dict(DEFAULT_QUANTIZATION)
+    if quantization:
+        steps.update(quantization)
+
+    caches = getattr(ai, 'memo_caches', {})
+    for name, method_steps in steps.items():
+        if name in caches or not callable(getattr(ai, name, None)):
+            continue
+        caches[name] = QuantizedLRU(getattr(ai, name), method_steps, maxsize, name)
+        setattr(ai, name, caches[name])
+    ai.memo_caches = caches
+    return ai
+
+
+def memo_stats(ai) -> Dict[str, Dict[str, float]]:
+    return {name: cache.stats() for name, cache in getattr(ai, 'memo_caches', {}).items()}
+
+
+def format_stats(ai) -> str:
+    lines = []
+    for name, s in memo_stats(ai).items():
+        lines.append(f"{name}: hit rate {s['hit_rate']:.1%} ({s['hits']}/{s['hits'] + s['misses']}), "
+                     f"{s['entries']} entries, ~{s['time_saved_s'] * 1000:.0f} ms saved")
+    return "\n".join(lines) if lines else "no memoized methods"
@@ -0,0 +1,280 @@
+"""
+Platform navigation graph built from the map.
+
+The fuzzy controllers used to hard-code the three map1 platforms and scan
+them every frame. NavigationGraph is built once per map from
+GameState.get_all_platforms() (or the map in assets/gameConfig.json) and
+precomputes everything a frame needs:
+
+- a grid (GRID_CELL px) giving, for any position, the first platform below
+  the player's feet, so "which platform am I on" is one array lookup
+- jump edges: platforms reachable with a single or double jump, from the
+  player physics (include/Player.hpp: jumpSpeed 800, gravity 2500,
+  xSpeed 300, 2 jumps). Platforms are one-way, so jumping up through a
+  platform from below is allowed.
+- drop edges: platforms reached by walking off the left/right edge
+- all-pairs next hops (Floyd-Warshall on estimated travel time)
+
+route() then answers "which direction and when to jump" with O(1) lookups
+and returns the same (move_left, move_right, should_jump, needs_double_jump)
+tuple as the controllers' old _get_platform_navigation().
+
+Usage:
+    graph = navigation_graph(game_state.get_all_platforms())  # once per match
+    left, right, jump, double_jump = graph.route(ai_x, ai_y, enemy_x, enemy_y)
+"""
+import os
+import json
+import math
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+GAME_CONFIG = os.path.join(PROJECT_ROOT, "assets", "gameConfig.json")
+DEFAULT_MAP = "map1"
+
+# Player physics (include/Player.hpp, gameConfig.json players)
+JUMP_SPEED = 800.0     # px/s
+GRAVITY = 2500.0       # px/s^2 while holding up
+X_SPEED = 300.0        # px/s
+MAX_FALL_SPEED = 1000.0
+PLAYER_HEIGHT = 20.0
+SINGLE_JUMP_HEIGHT = JUMP_SPEED ** 2 / (2.0 * GRAVITY)   # 128 px
+DOUBLE_JUMP_HEIGHT = 2.0 * SINGLE_JUMP_HEIGHT            # 256 px (second jump at the apex)
+
+CLEARANCE = 4.0            # feet must clear a platform top by this much
+SUPPORT_TOLERANCE = 100.0  # max height of the player's top above a platform to count as "on" it
+APPROACH_MARGIN = 100.0    # max horizontal distance from the target platform when taking off
+LANDING_MARGIN = 20.0      # steer this far inside the target platform while airborne
+GRID_CELL = 4              # px
+
+Platform = namedtuple('Platform', ['id', 'x1', 'x2', 'y'])
+# kind: 'jump' or 'drop'; takeoff: (x_lo, x_hi) on the source platform;
+# direction: -1/+1 side to walk off for drops (0 for jumps)
+Edge = namedtuple('Edge', ['kind', 'double_jump', 'takeoff', 'direction', 'cost'])
+
+
+def _airtime(rise: float, double_jump: bool) -> float:
+    """Time from takeoff until the feet come back down to `rise` px above the takeoff level."""
+    if double_jump:
+        t_apex = JUMP_SPEED / GRAVITY
+        rise -= SINGLE_JUMP_HEIGHT
+    else:
+        t_apex = 0.0
+    return t_apex + (JUMP_SPEED + math.sqrt(max(JUMP_SPEED ** 2 - 2.0 * GRAVITY * rise, 0.0))) / GRAVITY
+
+
+def _falltime(depth: float) -> float:
+    """Time to fall `depth` px from rest (capped at MAX_FALL_SPEED)."""
+    t_cap = MAX_FALL_SPEED / GRAVITY
+    d_cap = 0.5 * GRAVITY * t_cap ** 2
+    if depth <= d_cap:
+        return math.sqrt(2.0 * depth / GRAVITY)
+    return t_cap + (depth - d_cap) / MAX_FALL_SPEED
+
+
+def parse_platforms(platforms) -> List[Platform]:
+    """
+    Platforms from GameState.get_all_platforms() (id -> {x, y, width, ...})
+    or a gameConfig.json map list ([{id, x, y, w, h}, ...]), sorted by id.
+    """
+    items = platforms.items() if isinstance(platforms, dict) else ((p['id'], p) for p in platforms)
+    parsed = []
+    for pid, p in items:
+        width = p['width'] if 'width' in p else p['w']
+        parsed.append(Platform(str(pid), float(p['x']), float(p['x']) + float(width), float(p['y'])))
+    return sorted(parsed, key=lambda p: p.id)
+
+
+def load_map(name: str = DEFAULT_MAP, config_path: str = GAME_CONFIG) -> List[Platform]:
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    return parse_platforms(config['maps'][name]['platforms'])
+
+
+class NavigationGraph:
+    """Reachability graph and O(1) route queries for one map."""
+
+    def __init__(self, platforms: List[Platform]):
+        self.platforms = list(platforms)
+        self.edges: Dict[Tuple[int, int], Edge] = {}
+        self._build_grid()
+        self._build_edges()
+        self._build_next_hops()
+
+    def _build_grid(self):
+        """landing[row, col] = index of the first platform at or below feet y, -1 if none."""
+        self.width = int(max([1280.0] + [p.x2 for p in self.platforms])) + GRID_CELL
+        self.height = int(max([720.0] + [p.y for p in self.platforms])) + GRID_CELL
+        cols = self.width // GRID_CELL + 1
+        rows = self.height // GRID_CELL + 1
+        self.landing = np.full((rows, cols), -1, dtype=np.int16)
+        # Highest platform last so it wins where several are below a cell
+        for k in sorted(range(len(self.platforms)), key=lambda k: -self.platforms[k].y):
+            p = self.platforms[k]
+            c1 = max(int(math.ceil(p.x1 / GRID_CELL)), 0)
+            c2 = min(int(p.x2 // GRID_CELL), cols - 1)
+            r2 = min(int(p.y // GRID_CELL), rows - 1)
+            self.landing[:r2 + 1, c1:c2 + 1] = k
+
+    def _jump_edge(self, src: Platform, dst: Platform) -> Optional[Edge]:
+        rise = src.y - dst.y + CLEARANCE
+        if rise <= 0.0 or rise > DOUBLE_JUMP_HEIGHT:
+            return None
+        double_jump = rise > SINGLE_JUMP_HEIGHT
+        airtime = _airtime(rise, double_jump)
+        reach = X_SPEED * airtime
+        lo, hi = max(src.x1, dst.x1 - reach), min(src.x2, dst.x2 + reach)
+        if lo > hi:
+            return None
+        return Edge('jump', double_jump, (lo, hi), 0, airtime)
+
+    def _drop_edge(self, src: Platform, dst: Platform) -> Optional[Edge]:
+        depth = dst.y - src.y
+        if depth <= 0.0:
+            return None
+        falltime = _falltime(depth)
+        reach = X_SPEED * falltime
+        best = None
+        for direction, edge_x in ((-1, src.x1), (1, src.x2)):
+            # Walking off: the player falls anywhere within `reach` of the edge
+            near, far = (edge_x - reach, edge_x) if direction < 0 else (edge_x, edge_x + reach)
+            if dst.x1 > far or dst.x2 < near:
+                continue
+            # Another platform of the map directly below the edge would catch us first
+            if self._first_below(edge_x + direction, src.y) is not dst:
+                continue
+            cost = falltime + abs(edge_x - 0.5 * (src.x1 + src.x2)) / X_SPEED
+            if best is None or cost < best.cost:
+                takeoff = (src.x1, src.x1 + LANDING_MARGIN) if direction < 0 else (src.x2 - LANDING_MARGIN, src.x2)
+                best = Edge('drop', False, takeoff, direction, cost)
+        return best
+
+    def _first_below(self, x: float, y: float) -> Optional[Platform]:
+        below = [p for p in self.platforms if p.x1 <= x <= p.x2 and p.y > y]
+        return min(below, key=lambda p: p.y) if below else None
+
+    def _build_edges(self):
+        for i, src in enumerate(self.platforms):
+            for j, dst in enumerate(self.platforms):
+                if i == j:
+                    continue
+                edge = self._jump_edge(src, dst) or self._drop_edge(src, dst)
+                if edge is not None:
+                    self.edges[(i, j)] = edge
+
+    def _build_next_hops(self):
+        n = len(self.platforms)
+        cost = np.full((n, n), np.inf)
+        np.fill_diagonal(cost, 0.0)
+        self.next_hop = np.full((n, n), -1, dtype=np.int16)
+        for (i, j), edge in self.edges.items():
+            cost[i, j] = edge.cost
+            self.next_hop[i, j] = j
+        for k in range(n):
+            via = cost[:, k:k + 1] + cost[k:k + 1, :]
+            better = via < cost
+            cost = np.where(better, via, cost)
+            self.next_hop = np.where(better, self.next_hop[:, k:k + 1], self.next_hop)
+        self.cost = cost
+
+    def platform_at(self, x: float, y: float, tolerance: float = SUPPORT_TOLERANCE) -> int:
+        """Index of the platform a player at (x, y) stands on or is just above, -1 if none."""
+        col = int(x) // GRID_CELL
+        if col < 0 or col >= self.landing.shape[1]:
+            return -1
+        row = min(max(int(y + PLAYER_HEIGHT) // GRID_CELL, 0), self.landing.shape[0] - 1)
+        k = int(self.landing[row, col])
+        if k < 0 or self.platforms[k].y - y >= tolerance:
+            return -1
+        return k
+
+    def route(self, ai_x: float, ai_y: float, enemy_x: float, enemy_y: float,
+              tolerance: float = SUPPORT_TOLERANCE, jump_zone: float = APPROACH_MARGIN):
+        """
+        Next move towards the enemy's platform.
+
+        Args:
+            tolerance: See platform_at()
+            jump_zone: Max horizontal distance outside the target platform to jump from
+
+        Returns:
+            (move_left, move_right, should_jump, needs_double_jump)
+        """
+        move_left = ai_x > enemy_x
+        move_right = ai_x < enemy_x
+        src = self.platform_at(ai_x, ai_y, tolerance)
+        if src < 0:
+            # Falling or jumping: head for the enemy, jump if below it
+            return move_left, move_right, ai_y > enemy_y, False
+        dst = self.platform_at(enemy_x, enemy_y, tolerance)
+        if dst < 0 or dst == src or self.next_hop[src, dst] < 0:
+            return move_left, move_right, False, False
+
+        hop = int(self.next_hop[src, dst])
+        edge = self.edges[(src, hop)]
+        lo, hi = edge.takeoff
+        if edge.kind == 'jump':
+            target = self.platforms[hop]
+            lo, hi = max(lo, target.x1 - jump_zone), min(hi, target.x2 + jump_zone)
+        if ai_x < lo:
+            return False, True, False, edge.double_jump
+        if ai_x > hi:
+            return True, False, False, edge.double_jump
+
+        if edge.kind == 'drop':
+            return edge.direction < 0, edge.direction > 0, False, False
+        # In the takeoff zone: jump and steer to land inside the target
+        target = self.platforms[hop]
+        return (ai_x > target.x2 - LANDING_MARGIN, ai_x < target.x1 + LANDING_MARGIN,
+                True, edge.double_jump)
+
+    def describe(self) -> str:
+        lines = []
+        for (i, j), e in sorted(self.edges.items()):
+            kind = 'double jump' if e.double_jump else ('jump' if e.kind == 'jump' else 'drop')
+            lines.append(f"{self.platforms[i].id} -> {self.platforms[j].id}: {kind} "
+                         f"from x {e.takeoff[0]:.0f}-{e.takeoff[1]:.0f} ({e.cost:.2f}s)")
+        return "\n".join(lines)
+
+
+_graphs: Dict[tuple, NavigationGraph] = {}
+# (platforms object, graph) from the last call. Controllers pass the same
+# get_all_platforms() result every frame, so this skips parsing it again.
+# The object itself is held, not its id(), so the id cannot be recycled.
+_last: Tuple[object, Optional[NavigationGraph]] = (None, None)
+
+
+def navigation_graph(platforms=None) -> NavigationGraph:
+    """
+    Graph for a map, built on first use and cached.
+
+    Args:
+        platforms: GameState.get_all_platforms() result, a list of Platform,
+                   a NavigationGraph (returned as is), or None for
+                   DEFAULT_MAP from assets/gameConfig.json
+    """
+    global _last
+    if isinstance(platforms, NavigationGraph):
+        return platforms
+    if platforms is not None and platforms is _last[0]:
+        return _last[1]
+    if platforms is None:
+        key = (DEFAULT_MAP,)
+        if key not in _graphs:
+            _graphs[key] = NavigationGraph(load_map())
+        return _graphs[key]
+    parsed = platforms if (isinstance(platforms, list) and platforms
+                           and isinstance(platforms[0], Platform)) else parse_platforms(platforms)
+    key = tuple(parsed)
+    graph = _graphs.get(key)
+    if graph is None:
+        graph = _graphs[key] = NavigationGraph(parsed)
+    _last = (platforms, graph)
+    return graph
+
+
+if __name__ == "__main__":
+    print(navigation_graph().describe())
@@ -2,4 +2,7 @@
 
 __all__ = [
     "neural_ai",
+    "marl_policy_ai",
+    "population",
+    "quantized",
 ]
@@ -0,0 +1,147 @@
+"""
+Decisions/sec of NeuralAI against the original pure-Python forward pass.
+
+Runs both controllers on the same random player states, checks that they
+press the same buttons and prints throughput. --population P also times
+P NeuralAI controllers against one BatchedNeuralControllers frame
+(nn/population.py) deciding for all P genomes at once.
+
+Run:
+    python -m nn.benchmark --decisions 20000 --population 64
+"""
+import os
+import sys
+import math
+import time
+import random
+import argparse
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ga.neural_genome import NeuralGenome, INPUT_SIZE, HIDDEN_SIZE, OUTPUT_SIZE, W1_SIZE, B1_SIZE, W2_SIZE, B2_SIZE
+from nn.neural_ai import NeuralAI
+from nn.population import PopulationInference, BatchedNeuralControllers
+
+
+class ListNeuralAI(NeuralAI):
+    """The previous NeuralAI: nested-loop mat-vec over gene lists, math.tanh/sigmoid per element."""
+
+    def __init__(self, genome: NeuralGenome, action_threshold: float = 0.5):
+        super().__init__(genome, action_threshold)
+        g = [float(v) for v in genome.genes]
+        off = W1_SIZE + B1_SIZE
+        self.W1_list = g[0:W1_SIZE]
+        self.b1_list = g[W1_SIZE:off]
+        self.W2_list = g[off:off + W2_SIZE]
+        self.b2_list = g[off + W2_SIZE:off + W2_SIZE + B2_SIZE]
+
+    @staticmethod
+    def _dot_mv(W: List[float], x: List[float], out_dim: int, in_dim: int, b: List[float]) -> List[float]:
+        y = [0.0] * out_dim
+        for o in range(out_dim):
+            s = 0.0
+            base = o * in_dim
+            for i in range(in_dim):
+                s += W[base + i] * x[i]
+            y[o] = s + b[o]
+        return y
+
+    def _forward_list(self, x: List[float]) -> List[float]:
+        h = [math.tanh(v) for v in self._dot_mv(self.W1_list, x, HIDDEN_SIZE, INPUT_SIZE, self.b1_list)]
+        o = self._dot_mv(self.W2_list, h, OUTPUT_SIZE, HIDDEN_SIZE, self.b2_list)
+        return [0.0 if v < -50 else (1.0 if v > 50 else 1.0 / (1.0 + math.exp(-v))) for v in o]
+
+    def decide_action(self, me: Dict, enemy: Dict) -> Dict[str, bool]:
+        up_p, left_p, down_p, right_p, primary_p, secondary_p = self._forward_list(self._features(me, enemy))
+        if up_p > self.action_threshold:
+            self.jump_hold_frames = min(self.max_jump_hold, self.jump_hold_frames + 1)
+        else:
+            self.jump_hold_frames = max(0, self.jump_hold_frames - 2)
+        return {
+            'up': self.jump_hold_frames > 0,
+            'left': left_p > self.action_threshold,
+            'down': down_p > self.action_threshold,
+            'right': right_p > self.action_threshold,
+            'primaryFire': primary_p > self.action_threshold,
+            'secondaryFire': secondary_p > self.action_threshold,
+        }
+
+
+def random_states(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    def player():
+        return {'x': rng.uniform(0, 1000), 'y': rng.uniform(100, 500), 'health': rng.randint(0, 100),
+                'lives': rng.randint(1, 3), 'facing_direction': rng.randint(0, 1)}
+    return [(player(), player()) for _ in range(n)]
+
+
+def decisions_per_second(ai, states) -> float:
+    start = time.perf_counter()
+    for me, enemy in states:
+        ai.decide_action(me, enemy)
+    return len(states) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NeuralAI decisions/sec")
+    parser.add_argument('--decisions', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--population', type=int, default=0, help='also benchmark batched inference for P genomes')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    genome = NeuralGenome()
+    states = random_states(args.decisions, args.seed)
+
+    mismatches = 0
+    old, new = ListNeuralAI(genome), NeuralAI(genome)
+    for me, enemy in states:
+        mismatches += old.decide_action(me, enemy) != new.decide_action(me, enemy)
+
+    old_rate = decisions_per_second(ListNeuralAI(genome), states)
+    new_rate = decisions_per_second(NeuralAI(genome), states)
+    print(f"pure Python : {old_rate:10.0f} decisions/s ({1e6 / old_rate:.1f} us)")
+    print(f"NumPy       : {new_rate:10.0f} decisions/s ({1e6 / new_rate:.1f} us)")
+    print(f"speedup     : {new_rate / old_rate:.2f}x, {mismatches}/{len(states)} decisions differ")
+
+    if args.population > 0:
+        population_benchmark(args.population, states)
+
+
+def population_benchmark(size: int, states):
+    """One frame of `size` genomes: a NeuralAI each vs one batched call."""
+    population = [NeuralGenome() for _ in range(size)]
+    frames = [states[i:i + size] for i in range(0, len(states) - size + 1, size)]
+    singles = [NeuralAI(g) for g in population]
+    inference = PopulationInference(population)
+    batched = BatchedNeuralControllers(inference, list(range(size)))
+
+    mismatches = 0
+    for frame in frames:
+        mes, enemies = [s[0] for s in frame], [s[1] for s in frame]
+        expected = [ai.decide_action(me, enemy) for ai, me, enemy in zip(singles, mes, enemies)]
+        mismatches += sum(a != b for a, b in zip(batched.decide_actions(mes, enemies), expected))
+
+    for ai in singles:
+        ai.jump_hold_frames = 0
+    batched.reset()
+    start = time.perf_counter()
+    for frame in frames:
+        for ai, (me, enemy) in zip(singles, frame):
+            ai.decide_action(me, enemy)
+    single_rate = len(frames) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for frame in frames:
+        batched.decide_actions([s[0] for s in frame], [s[1] for s in frame])
+    batched_rate = len(frames) / (time.perf_counter() - start)
+    print(f"\npopulation of {size}:")
+    print(f"NeuralAI x{size:<4}: {single_rate:10.0f} frames/s ({1e6 / single_rate:.1f} us)")
+    print(f"batched     : {batched_rate:10.0f} frames/s ({1e6 / batched_rate:.1f} us)")
+    print(f"speedup     : {batched_rate / single_rate:.2f}x, {mismatches}/{len(frames) * size} decisions differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Dependency-free inference for the MARL (PPO) policy.
+
+marl_trainer.py trains a tiny MlpPolicy (12 -> 16 tanh -> 6 logits) with a
+MultiBinary(6) action space. Loading it through stable-baselines3 pulls in the
+whole torch stack and pays its dispatch cost on every predict() call. This
+module exports the policy weights to a small .npz and runs the forward pass
+and the deterministic Bernoulli thresholding directly in NumPy.
+
+- export_policy(model, path): write an SB3 PPO policy to .npz (needs torch only
+  because the model itself is a torch module)
+- MarlPolicyAI.load(path): NumPy controller with decide_action() for play and
+  tournaments, and an SB3-compatible predict() for self-play opponents
+"""
+from __future__ import annotations
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from feature_extraction import get_observation
+
+ACTION_KEYS = ('up', 'left', 'down', 'right', 'primaryFire', 'secondaryFire')
+
+_ACTIVATIONS = {
+    'tanh': np.tanh,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'identity': lambda x: x,
+}
+
+
+def extract_policy_weights(model) -> Dict[str, np.ndarray]:
+    """
+    Pull the actor weights out of an SB3 PPO MlpPolicy.
+
+    Only the policy branch is exported (mlp_extractor.policy_net + action_net);
+    the value head is not needed to act.
+    """
+    policy = model.policy
+    arrays = {}
+    layer = 0
+    for module in policy.mlp_extractor.policy_net:
+        if hasattr(module, 'weight'):
+            arrays[f'hidden_weights_{layer}'] = module.weight.detach().cpu().numpy().astype(np.float32)
+            arrays[f'hidden_biases_{layer}'] = module.bias.detach().cpu().numpy().astype(np.float32)
+            layer += 1
+    arrays['action_weights'] = policy.action_net.weight.detach().cpu().numpy().astype(np.float32)
+    arrays['action_biases'] = policy.action_net.bias.detach().cpu().numpy().astype(np.float32)
+
+    activation = getattr(policy, 'activation_fn', None)
+    name = activation.__name__.lower() if activation is not None else 'tanh'
+    arrays['activation'] = np.array(name)
+    return arrays
+
+
+def export_policy(model, path: str) -> str:
+    """Save an SB3 PPO policy as a NumPy .npz file and return its path."""
+    if not path.endswith('.npz'):
+        path = path + '.npz'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez(path, **extract_policy_weights(model))
+    return path
+
+
+class MarlPolicyAI:
+    """
+    NumPy forward pass of an exported PPO policy.
+
+    deterministic=True in SB3 takes the mode of the Bernoulli distribution,
+    i.e. an action is pressed when its probability is above 0.5, which is the
+    same as its logit being above 0. No sigmoid is needed.
+    """
+
+    def __init__(self, hidden: List[Tuple[np.ndarray, np.ndarray]],
+                 action_weights: np.ndarray, action_biases: np.ndarray,
+                 activation: str = 'tanh'):
+        # Store transposed weights so batched inputs are simply x @ W + b
+        self.hidden = [(np.ascontiguousarray(W.T), b) for W, b in hidden]
+        self.action_weights = np.ascontiguousarray(action_weights.T)
+        self.action_biases = action_biases
+        self.activation = _ACTIVATIONS[activation]
+        self.trace = None  # DecisionTrace when enabled (decision_trace.attach_trace)
+
+    @classmethod
+    def load(cls, path: str) -> "MarlPolicyAI":
+        if not path.endswith('.npz'):
+            path = path + '.npz'
+        with np.load(path) as data:
+            return cls._from_arrays({k: data[k] for k in data.files})
+
+    @classmethod
+    def from_sb3(cls, model) -> "MarlPolicyAI":
+        """Build directly from an already loaded SB3 model (no file round-trip)."""
+        return cls._from_arrays(extract_policy_weights(model))
+
+    @classmethod
+    def _from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "MarlPolicyAI":
+        hidden = []
+        layer = 0
+        while f'hidden_weights_{layer}' in arrays:
+            hidden.append((arrays[f'hidden_weights_{layer}'], arrays[f'hidden_biases_{layer}']))
+            layer += 1
+        return cls(hidden, arrays['action_weights'], arrays['action_biases'],
+                   str(arrays.get('activation', 'tanh')))
+
+    def logits(self, obs: np.ndarray) -> np.ndarray:
+        h = np.asarray(obs, dtype=np.float32)
+        for W, b in self.hidden:
+            h = self.activation(h @ W + b)
+        return h @ self.action_weights + self.action_biases
+
+    def predict(self, obs: np.ndarray, state=None, episode_start=None,
+                deterministic: bool = True) -> Tuple[np.ndarray, Optional[object]]:
+        """
+        Same call shape as SB3's predict(): accepts one observation or a batch
+        and returns (actions, None). Only deterministic actions are supported.
+        """
+        return (self.logits(obs) > 0.0).astype(np.int8), None
+
+    def _convert_action(self, arr) -> Dict[str, bool]:
+        return {key: bool(arr[i]) for i, key in enumerate(ACTION_KEYS)}
+
+    def decide_action(self, me: Dict, enemy: Dict) -> Dict[str, bool]:
+        obs = get_observation(me, enemy)
+        logits = self.logits(obs)
+        actions = self._convert_action(logits > 0.0)
+        if self.trace is not None:
+            self.trace.record(abs(enemy['x'] - me['x']), me['y'] - enemy['y'], me['health'], enemy['health'],
+                              outputs=logits, actions=actions)
+        return actions
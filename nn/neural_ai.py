@@ -1,94 +1,82 @@
 """
 Neural AI controller using a fixed-topology feed-forward network evolved via GA.
-- Inputs (12): normalized features from player and enemy states
+- Inputs (12): normalized features from player and enemy states (feature_extraction.base_features_into)
 - Hidden: 16 tanh
 - Outputs (6): action probabilities (sigmoid) -> threshold to booleans
+
+W1/W2 are NumPy matrices built once from the genome. decide_action() writes
+the features into a preallocated vector and compares output logits with the
+threshold's logit, so no sigmoid or intermediate lists are needed per frame
+(see nn/benchmark.py for decisions/sec against the old pure-Python loops).
 """
 from __future__ import annotations
 import math
 from typing import Dict, List
+
+import numpy as np
+
 from ga.neural_genome import (
     NeuralGenome, INPUT_SIZE, HIDDEN_SIZE, OUTPUT_SIZE,
     W1_SIZE, B1_SIZE, W2_SIZE, B2_SIZE
 )
+from feature_extraction import base_features_into
 
 
-def tanh(x: float) -> float:
-    return math.tanh(x)
+def unpack_genes(genes) -> tuple:
+    """(W1 (16, 12), b1 (16,), W2 (6, 16), b2 (6,)) float64 arrays from the flat [W1, b1, W2, b2] genes."""
+    g = np.asarray(genes, dtype=np.float64)
+    off = 0
+    W1 = g[off:off + W1_SIZE].reshape(HIDDEN_SIZE, INPUT_SIZE); off += W1_SIZE
+    b1 = g[off:off + B1_SIZE]; off += B1_SIZE
+    W2 = g[off:off + W2_SIZE].reshape(OUTPUT_SIZE, HIDDEN_SIZE); off += W2_SIZE
+    b2 = g[off:off + B2_SIZE]
+    return W1, b1, W2, b2
 
 
-def sigmoid(x: float) -> float:
-    # clamp to avoid overflow
-    if x < -50:
-        return 0.0
-    if x > 50:
-        return 1.0
-    return 1.0 / (1.0 + math.exp(-x))
+def _logit(p: float) -> float:
+    if p <= 0.0:
+        return -math.inf
+    if p >= 1.0:
+        return math.inf
+    return math.log(p / (1.0 - p))
 
 
 class NeuralAI:
     def __init__(self, genome: NeuralGenome, action_threshold: float = 0.5):
         self.genome = genome
         self.action_threshold = action_threshold
-        # unpack weights/biases views (no copies)
-        g = genome.genes
-        self.W1 = g[0:W1_SIZE]
-        self.b1 = g[W1_SIZE:W1_SIZE+B1_SIZE]
-        off = W1_SIZE + B1_SIZE
-        self.W2 = g[off:off+W2_SIZE]
-        self.b2 = g[off+W2_SIZE:off+W2_SIZE+B2_SIZE]
+        # sigmoid(z) > threshold  <=>  z > logit(threshold)
+        self.logit_threshold = _logit(action_threshold)
+        # row-major [out x in] weight matrices, built once (copies of the genes)
+        self.W1, self.b1, self.W2, self.b2 = unpack_genes(genome.genes)
+        self._x = np.empty(INPUT_SIZE, dtype=np.float64)
         # jump hold state
         self.jump_hold_frames = 0
         self.max_jump_hold = 20  # consistent with double-jump requirement
+        self.trace = None  # DecisionTrace when enabled (decision_trace.attach_trace)
+
+    def _logits(self, x) -> np.ndarray:
+        h = np.tanh(self.W1 @ x + self.b1)
+        return self.W2 @ h + self.b2
+
+    def _forward(self, x) -> np.ndarray:
+        """Action probabilities for a 12-feature vector."""
+        return 1.0 / (1.0 + np.exp(-self._logits(np.asarray(x, dtype=np.float64))))
 
-    def _dot_mv(self, W: List[float], x: List[float], out_dim: int, in_dim: int, b: List[float]) -> List[float]:
-        # y = W x + b; W is row-major [out_dim x in_dim]
-        y = [0.0] * out_dim
-        idx = 0
-        for o in range(out_dim):
-            s = 0.0
-            base = o * in_dim
-            for i in range(in_dim):
-                s += W[base + i] * x[i]
-            y[o] = s + b[o]
-        return y
-
-    def _forward(self, x: List[float]) -> List[float]:
-        # Layer1
-        h = self._dot_mv(self.W1, x, HIDDEN_SIZE, INPUT_SIZE, self.b1)
-        h = [tanh(v) for v in h]
-        # Layer2
-        o = self._dot_mv(self.W2, h, OUTPUT_SIZE, HIDDEN_SIZE, self.b2)
-        o = [sigmoid(v) for v in o]
-        return o
+    def _features_into(self, me: Dict, enemy: Dict, x: np.ndarray) -> np.ndarray:
+        return base_features_into(me, enemy, x)
 
     def _features(self, me: Dict, enemy: Dict) -> List[float]:
-        # Build 12 normalized features
-        # Positions normalized by screen (assumed 1280x720-like)
-        dx = (enemy['x'] - me['x']) / 640.0  # ~ -2..2
-        dy = (enemy['y'] - me['y']) / 360.0  # ~ -2..2 (positive means enemy lower)
-        dist = math.hypot(dx, dy)  # ~0..3
-        me_hp = (me['health'] / 100.0)
-        en_hp = (enemy['health'] / 100.0)
-        me_lives = (me['lives'] / 3.0)
-        en_lives = (enemy['lives'] / 3.0)
-        # Facing: -1 left, +1 right
-        facing = -1.0 if me.get('facing_direction', 1) == 0 else 1.0
-        # Height indicators
-        above = 1.0 if me['y'] < enemy['y'] - 40 else 0.0
-        below = 1.0 if me['y'] > enemy['y'] + 40 else 0.0
-        same_y = 1.0 if abs(me['y'] - enemy['y']) <= 40 else 0.0
-        # Bias-like constant
-        bias = 1.0
-        return [dx, dy, dist, me_hp, en_hp, me_lives, en_lives, facing, above, below, same_y, bias]
+        """The 12 normalized features as a list."""
+        return self._features_into(me, enemy, np.empty(INPUT_SIZE, dtype=np.float64)).tolist()
 
     def decide_action(self, me: Dict, enemy: Dict) -> Dict[str, bool]:
-        x = self._features(me, enemy)
-        probs = self._forward(x)
-        up_p, left_p, down_p, right_p, primary_p, secondary_p = probs
+        z = self._logits(self._features_into(me, enemy, self._x))
+        t = self.logit_threshold
+        up_z, left_z, down_z, right_z, primary_z, secondary_z = z.tolist()
 
         # Jump hold logic for double-jump/platform reach
-        up = up_p > self.action_threshold
+        up = up_z > t
         if up:
             self.jump_hold_frames = min(self.max_jump_hold, self.jump_hold_frames + 1)
         else:
@@ -97,10 +85,14 @@ class NeuralAI:
 
         actions = {
             'up': up_pressed,
-            'left': left_p > self.action_threshold,
-            'down': down_p > self.action_threshold,
-            'right': right_p > self.action_threshold,
-            'primaryFire': primary_p > self.action_threshold,
-            'secondaryFire': secondary_p > self.action_threshold,
+            'left': left_z > t,
+            'down': down_z > t,
+            'right': right_z > t,
+            'primaryFire': primary_z > t,
+            'secondaryFire': secondary_z > t,
         }
+        if self.trace is not None:
+            probs = (1.0 / (1.0 + np.exp(-z))).tolist()
+            self.trace.record(abs(enemy['x'] - me['x']), me['y'] - enemy['y'], me['health'], enemy['health'],
+                              jump_frames=self.jump_hold_frames, outputs=probs, actions=actions)
         return actions
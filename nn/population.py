@@ -0,0 +1,123 @@
+"""
+Population-batched inference for NeuralAI genomes.
+
+Every NeuralGenome in a generation has the same (12, 16, 6) network, so
+their weights stack into (P, 16, 12) / (P, 6, 16) tensors and any number
+of observations - each paired with the genome that should answer it - are
+evaluated with one batched matmul instead of one NeuralAI call per bot.
+
+- PopulationInference(genomes): the stacked weights; logits(X, index)
+- BatchedNeuralControllers(inference, index): K controller slots (e.g. both
+  bots of every match running in lockstep) with NeuralAI's jump-hold logic,
+  deciding all slots from one inference call per frame
+
+Features come from feature_extraction.base_features_into, like NeuralAI's.
+
+NeuralGATrainer does not use this: the game engine is a singleton, so its
+matches only have two bots per frame, where two NeuralAI calls are faster.
+The batched path serves offline evaluation of many genomes at once
+(nn/benchmark.py, nn/quantized.py).
+
+Usage:
+    inference = PopulationInference(population)
+    bots = BatchedNeuralControllers(inference, [inference.index(g1), inference.index(g2)])
+    a1, a2 = bots.decide_actions([p1, p2], [p2, p1])
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from feature_extraction import base_features_into
+from ga.neural_genome import INPUT_SIZE
+from nn.neural_ai import _logit, unpack_genes
+
+
+def features_batch(mes: Sequence[Dict], enemies: Sequence[Dict]) -> np.ndarray:
+    """NeuralAI's 12 features for K (me, enemy) pairs as a (K, 12) array."""
+    x = np.empty((len(mes), INPUT_SIZE), dtype=np.float64)
+    for row, me, enemy in zip(x, mes, enemies):
+        base_features_into(me, enemy, row)
+    return x
+
+
+class PopulationInference:
+    """Weights of P genomes stacked for batched evaluation."""
+
+    def __init__(self, genomes: Sequence):
+        self.genomes = list(genomes)
+        layers = [unpack_genes(g.genes if hasattr(g, 'genes') else g) for g in self.genomes]
+        self.W1 = np.stack([l[0] for l in layers])   # (P, 16, 12)
+        self.b1 = np.stack([l[1] for l in layers])   # (P, 16)
+        self.W2 = np.stack([l[2] for l in layers])   # (P, 6, 16)
+        self.b2 = np.stack([l[3] for l in layers])   # (P, 6)
+        self._index = {id(g): i for i, g in enumerate(self.genomes)}
+
+    def __len__(self) -> int:
+        return len(self.genomes)
+
+    def index(self, genome) -> int:
+        """Row of a genome object passed to the constructor."""
+        return self._index[id(genome)]
+
+    def logits(self, x: np.ndarray, index=None) -> np.ndarray:
+        """
+        Output logits for K observations.
+
+        Args:
+            x: (K, 12) features
+            index: (K,) genome row per observation; None means row i answers
+                   observation i (K == P)
+        """
+        return self.evaluate(self.gather(index), x)
+
+    def gather(self, index=None) -> tuple:
+        """(W1, b1, W2, b2) rows for a fixed genome index (all genomes if None)."""
+        if index is None:
+            return self.W1, self.b1, self.W2, self.b2
+        index = np.asarray(index)
+        return self.W1[index], self.b1[index], self.W2[index], self.b2[index]
+
+    def evaluate(self, weights: tuple, x: np.ndarray) -> np.ndarray:
+        """Logits of x[k] through the k-th genome of gathered weights."""
+        W1, b1, W2, b2 = weights
+        h = np.tanh(np.matmul(W1, x[:, :, None])[:, :, 0] + b1)
+        return np.matmul(W2, h[:, :, None])[:, :, 0] + b2
+
+    def probabilities(self, x: np.ndarray, index=None) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-self.logits(x, index)))
+
+
+class BatchedNeuralControllers:
+    """
+    K NeuralAI-equivalent controllers sharing one inference call per frame.
+
+    Args:
+        inference: PopulationInference holding the genomes
+        index: Genome row of each slot
+        action_threshold: Same meaning as NeuralAI's
+    """
+
+    def __init__(self, inference: PopulationInference, index: Sequence[int], action_threshold: float = 0.5):
+        self.inference = inference
+        self.index = np.asarray(index, dtype=np.int64)
+        # Slots keep their genome, so gather the weights once
+        self._weights = inference.gather(self.index)
+        self.logit_threshold = _logit(action_threshold)
+        self.max_jump_hold = 20
+        self.reset()
+
+    def reset(self):
+        self.jump_hold_frames = np.zeros(len(self.index), dtype=np.int64)
+
+    def decide_actions(self, mes: Sequence[Dict], enemies: Sequence[Dict]) -> List[Dict[str, bool]]:
+        """Actions for every slot; slot k plays mes[k] against enemies[k]."""
+        pressed = self.inference.evaluate(self._weights, features_batch(mes, enemies)) > self.logit_threshold
+        # Jump hold logic for double-jump/platform reach (as NeuralAI.decide_action)
+        up = pressed[:, 0]
+        self.jump_hold_frames = np.where(up, np.minimum(self.max_jump_hold, self.jump_hold_frames + 1),
+                                         np.maximum(0, self.jump_hold_frames - 2))
+        pressed[:, 0] = self.jump_hold_frames > 0
+        return [{
+            'up': row[0], 'left': row[1], 'down': row[2], 'right': row[3],
+            'primaryFire': row[4], 'secondaryFire': row[5],
+        } for row in pressed.tolist()]
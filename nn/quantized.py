@@ -0,0 +1,242 @@
+"""
+Int8-quantized inference for evolved NeuralAI genomes - SLOWER than float.
+
+Measured with "python -m nn.quantized": a single bot runs at 0.43-0.48x
+NeuralAI's speed and a batch of 64 at 0.82-0.95x the float batch. NumPy has
+no int8 GEMM, so the integer matmuls cannot beat BLAS float64. What it saves
+is weight memory (155 KB -> 24 KB for 64 genomes), and each button agrees
+with float inference 99.4-99.7% of the time (whole actions 97.5%).
+Tournaments and trainers therefore keep NeuralAI. This module is the
+reference integer path for a future native int8 backend, not a speed-up.
+
+Each layer gets one symmetric scale. The input scale is calibrated on a
+recorded observation set: (me, enemy) state pairs or a (N, 12) feature array.
+The weight scale comes from the largest weight, and the hidden scale is 1/127
+because tanh is bounded. A decision then uses only integer arithmetic:
+
+    acc1 = W1q @ xq + b1q                  integer accumulate
+    hq   = tanh[(acc1 * m1) >> SHIFT]      fixed-point rescale + lookup table
+    acc2 = W2q @ hq + b2q                  integer; logits = acc2 * out_scale
+
+Probabilities (traces, _forward) come from a sigmoid lookup table.
+QuantizedNeuralAI has NeuralAI's interface, and QuantizedPopulationInference
+plugs into BatchedNeuralControllers (nn/population.py), so agreement and
+speed can be compared on the same inputs. Running "python -m nn.quantized"
+reports both.
+
+Usage:
+    calibration = observation_features(recorded_states)
+    ai = QuantizedNeuralAI(genome, calibration)
+"""
+import os
+import sys
+import time
+import argparse
+from collections import namedtuple
+from typing import Dict, Sequence
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ga.neural_genome import NeuralGenome, INPUT_SIZE
+from nn.neural_ai import NeuralAI, unpack_genes
+from nn.population import PopulationInference, BatchedNeuralControllers, features_batch
+
+INT8_MAX = 127
+SHIFT = 16                 # fixed-point bits of the requantization multiplier
+TANH_STEPS = 64            # LUT entries per unit of hidden pre-activation
+SIGMOID_RANGE = 8.0
+SIGMOID_STEPS = 32
+
+_sigmoid_grid = np.arange(-SIGMOID_RANGE * SIGMOID_STEPS, SIGMOID_RANGE * SIGMOID_STEPS + 1) / SIGMOID_STEPS
+SIGMOID_LUT = 1.0 / (1.0 + np.exp(-_sigmoid_grid))
+_SIGMOID_OFFSET = int(SIGMOID_RANGE * SIGMOID_STEPS)
+
+# W*q int8 weights (held as int64 for the matmuls), b*q biases at the
+# accumulator scale, m1 the fixed-point hidden requantization multiplier,
+# tanh the LUT for every reachable layer-1 accumulator (entry k is index
+# k - offset), x_scale / out_scale the float scales of the input and of acc2
+QuantizedLayers = namedtuple('QuantizedLayers', ['W1q', 'b1q', 'm1', 'tanh', 'offset', 'W2q', 'b2q',
+                                                 'x_scale', 'out_scale'])
+
+
+def tanh_table(half_width: int):
+    """int8 tanh (scale 1/127) at k / TANH_STEPS for k in -half_width..half_width, and the offset."""
+    grid = np.arange(-half_width, half_width + 1) / TANH_STEPS
+    return np.round(np.tanh(grid) * INT8_MAX).astype(np.int64), half_width
+
+
+def observation_features(states) -> np.ndarray:
+    """(N, 12) NeuralAI features from (me, enemy) pairs (or a feature array, returned as is)."""
+    if isinstance(states, np.ndarray):
+        return states.reshape(-1, INPUT_SIZE).astype(np.float64)
+    return features_batch([s[0] for s in states], [s[1] for s in states])
+
+
+def input_scale(calibration: np.ndarray) -> float:
+    """Input scale mapping the largest calibration feature to INT8_MAX."""
+    peak = float(np.max(np.abs(calibration))) if calibration.size else 1.0
+    return max(peak, 1e-6) / INT8_MAX
+
+
+def _symmetric(values: np.ndarray):
+    scale = max(float(np.max(np.abs(values))), 1e-8) / INT8_MAX
+    return np.clip(np.round(values / scale), -INT8_MAX, INT8_MAX).astype(np.int32), scale
+
+
+def quantize_genes(genes, x_scale: float) -> QuantizedLayers:
+    """Quantize one genome's layers for inputs quantized with x_scale."""
+    W1, b1, W2, b2 = unpack_genes(genes)
+    W1q, w1_scale = _symmetric(W1)
+    W2q, w2_scale = _symmetric(W2)
+    acc1_scale = x_scale * w1_scale
+    out_scale = w2_scale / INT8_MAX
+    b1q = np.round(b1 / acc1_scale).astype(np.int64)
+    m1 = int(round(acc1_scale * TANH_STEPS * (1 << SHIFT)))
+    # Largest |acc1| any int8 input can produce, so LUT lookups never need clipping
+    bound = int((np.abs(W1q).sum(axis=1) * INT8_MAX + np.abs(b1q)).max())
+    tanh, offset = tanh_table(((bound * m1) >> SHIFT) + 1)
+    return QuantizedLayers(W1q.astype(np.int64), b1q, m1, tanh, offset,
+                           W2q.astype(np.int64), np.round(b2 / out_scale).astype(np.int64),
+                           x_scale, out_scale)
+
+
+def quantize_input(x: np.ndarray, x_scale: float) -> np.ndarray:
+    """int8-range integers (int64) of x; values beyond the calibration range saturate."""
+    xq = np.rint(x * (1.0 / x_scale))
+    np.minimum(xq, INT8_MAX, out=xq)
+    np.maximum(xq, -INT8_MAX, out=xq)
+    return xq.astype(np.int64)
+
+
+def tanh_lut(acc1: np.ndarray, m1, tanh: np.ndarray, offset: int) -> np.ndarray:
+    """Hidden activations (int, scale 1/127) from layer-1 accumulators."""
+    return tanh[((acc1 * m1 + (1 << (SHIFT - 1))) >> SHIFT) + offset]
+
+
+def sigmoid_lut(logits: np.ndarray) -> np.ndarray:
+    idx = np.round(logits * SIGMOID_STEPS).astype(np.int64)
+    return SIGMOID_LUT[np.clip(idx + _SIGMOID_OFFSET, 0, len(SIGMOID_LUT) - 1)]
+
+
+class QuantizedNeuralAI(NeuralAI):
+    """
+    NeuralAI with int8 weights/activations and integer matmuls.
+
+    Args:
+        genome: NeuralGenome
+        calibration: Recorded observations, see observation_features()
+        action_threshold: Same meaning as NeuralAI's
+    """
+
+    def __init__(self, genome: NeuralGenome, calibration, action_threshold: float = 0.5):
+        super().__init__(genome, action_threshold)
+        self.layers = quantize_genes(genome.genes, input_scale(observation_features(calibration)))
+
+    def _logits(self, x) -> np.ndarray:
+        q = self.layers
+        h = tanh_lut(q.W1q @ quantize_input(x, q.x_scale) + q.b1q, q.m1, q.tanh, q.offset)
+        return (q.W2q @ h + q.b2q) * q.out_scale
+
+    def _forward(self, x) -> np.ndarray:
+        return sigmoid_lut(self._logits(np.asarray(x, dtype=np.float64)))
+
+
+class QuantizedPopulationInference(PopulationInference):
+    """PopulationInference with every genome quantized against one shared input scale."""
+
+    def __init__(self, genomes: Sequence, calibration):
+        super().__init__(genomes)
+        self.x_scale = input_scale(observation_features(calibration))
+        layers = [quantize_genes(g.genes if hasattr(g, 'genes') else g, self.x_scale) for g in self.genomes]
+        self.W1q = np.stack([l.W1q for l in layers])                     # (P, 16, 12)
+        self.b1q = np.stack([l.b1q for l in layers])                     # (P, 16)
+        self.m1 = np.array([l.m1 for l in layers], dtype=np.int64)[:, None]
+        self.W2q = np.stack([l.W2q for l in layers])                     # (P, 6, 16)
+        self.b2q = np.stack([l.b2q for l in layers])                     # (P, 6)
+        self.out_scale = np.array([l.out_scale for l in layers])[:, None]
+        # One LUT wide enough for every genome
+        self.tanh, self.offset = tanh_table(max(l.offset for l in layers))
+
+    def gather(self, index=None) -> tuple:
+        if index is None:
+            return self.W1q, self.b1q, self.m1, self.W2q, self.b2q, self.out_scale
+        index = np.asarray(index)
+        return (self.W1q[index], self.b1q[index], self.m1[index],
+                self.W2q[index], self.b2q[index], self.out_scale[index])
+
+    def evaluate(self, weights: tuple, x: np.ndarray) -> np.ndarray:
+        W1q, b1q, m1, W2q, b2q, out_scale = weights
+        xq = quantize_input(x, self.x_scale)
+        h = tanh_lut(np.matmul(W1q, xq[:, :, None])[:, :, 0] + b1q, m1, self.tanh, self.offset)
+        return (np.matmul(W2q, h[:, :, None])[:, :, 0] + b2q) * out_scale
+
+    def probabilities(self, x: np.ndarray, index=None) -> np.ndarray:
+        return sigmoid_lut(self.logits(x, index))
+
+
+def action_agreement(float_ai, quantized_ai, states) -> Dict[str, float]:
+    """Fraction of decisions where each button (and the whole action) matches."""
+    keys = ('up', 'left', 'down', 'right', 'primaryFire', 'secondaryFire')
+    same = dict.fromkeys(keys, 0)
+    whole = 0
+    for me, enemy in states:
+        a, b = float_ai.decide_action(me, enemy), quantized_ai.decide_action(me, enemy)
+        for k in keys:
+            same[k] += a[k] == b[k]
+        whole += a == b
+    n = max(1, len(states))
+    agreement = {k: v / n for k, v in same.items()}
+    agreement['all'] = whole / n
+    return agreement
+
+
+def main():
+    from nn.benchmark import random_states, decisions_per_second
+
+    parser = argparse.ArgumentParser(description="Accuracy and throughput of int8 NeuralAI inference")
+    parser.add_argument('--genomes', type=int, default=20)
+    parser.add_argument('--calibration', type=int, default=5000, help='recorded states used for calibration')
+    parser.add_argument('--decisions', type=int, default=5000)
+    parser.add_argument('--population', type=int, default=64)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    genomes = [NeuralGenome(rng=np.random.default_rng(args.seed + i)) for i in range(args.genomes)]
+    calibration = observation_features(random_states(args.calibration, args.seed))
+    states = random_states(args.decisions, args.seed + 1)
+
+    agreement = {}
+    for genome in genomes:
+        for k, v in action_agreement(NeuralAI(genome), QuantizedNeuralAI(genome, calibration), states).items():
+            agreement[k] = agreement.get(k, 0.0) + v / len(genomes)
+    print(f"action agreement over {len(genomes)} genomes x {len(states)} states:")
+    print("  " + "  ".join(f"{k}={v:.2%}" for k, v in agreement.items()))
+
+    float_rate = decisions_per_second(NeuralAI(genomes[0]), states)
+    int_rate = decisions_per_second(QuantizedNeuralAI(genomes[0], calibration), states)
+    print(f"single bot : float {float_rate:9.0f}/s  int8 {int_rate:9.0f}/s  ({int_rate / float_rate:.2f}x)")
+
+    size = args.population
+    population = [NeuralGenome(rng=np.random.default_rng(1000 + i)) for i in range(size)]
+    mes, enemies = [s[0] for s in states[:size]], [s[1] for s in states[:size]]
+    for name, inference in (('float', PopulationInference(population)),
+                            ('int8', QuantizedPopulationInference(population, calibration))):
+        bots = BatchedNeuralControllers(inference, list(range(size)))
+        start = time.perf_counter()
+        frames = max(1, args.decisions // size)
+        for _ in range(frames):
+            bots.decide_actions(mes, enemies)
+        elapsed = time.perf_counter() - start
+        # int8 weights + int32 biases as they would be stored (they are widened for NumPy's matmul)
+        weight_bytes = sum(a.nbytes for a in inference.gather()) if name == 'float' else \
+            (inference.W1q.size + inference.W2q.size) + 4 * (inference.b1q.size + inference.b2q.size)
+        print(f"batched {size:3d} {name:5s}: {frames * size / elapsed:9.0f} decisions/s, "
+              f"weights {weight_bytes / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,22 +26,21 @@ if sys.version_info >= (3, 8):
             os.add_dll_directory(path)
 
 import gunmayhem
-from stable_baselines3 import PPO
-from feature_extraction import get_observation  # Use the same feature extractor
+from nn.marl_policy_ai import MarlPolicyAI
 
 # Use absolute path so changing into build/ doesn't break model loading
 MODEL_PATH = os.path.join(PROJECT_ROOT, "models_marl", "ppo_gunmayhem_marl")
 
-def _convert_action(action_array) -> dict:
-    """Converts MultiBinary array [0,1,0,1,1,0] to action dict."""
-    return {
-        'up': bool(action_array[0]),
-        'left': bool(action_array[1]),
-        'down': bool(action_array[2]),
-        'right': bool(action_array[3]),
-        'primaryFire': bool(action_array[4]),
-        'secondaryFire': bool(action_array[5]),
-    }
+
+def load_policy(model_path: str) -> MarlPolicyAI:
+    """
+    Load the NumPy export of the policy (no torch import).
+    Falls back to loading the SB3 .zip once and converting it in memory.
+    """
+    if os.path.exists(model_path + ".npz"):
+        return MarlPolicyAI.load(model_path + ".npz")
+    from stable_baselines3 import PPO
+    return MarlPolicyAI.from_sb3(PPO.load(model_path))
 
 def main():
     build_dir = os.path.join(PROJECT_ROOT, 'build')
@@ -54,7 +53,7 @@ def main():
 
     # Load trained model
     try:
-        model = PPO.load(MODEL_PATH)
+        ai = load_policy(MODEL_PATH)
         print(f"✓ Loaded trained MARL model from {MODEL_PATH}")
     except Exception as e:
         print(f"⚠ Could not load model: {e}")
@@ -104,14 +103,10 @@ def main():
                     break
                 
                 # --- AI Decision ---
-                # 1. Get observation for AI (P2 vs P1)
-                obs_p2 = get_observation(p2_state, p1_state)
-                
-                # 2. Predict action
-                action_p2_array, _ = model.predict(obs_p2, deterministic=True)
+                # Observation (P2 vs P1) + NumPy forward pass
+                action_p2_dict = ai.decide_action(p2_state, p1_state)
                 
-                # 3. Convert and apply action (positional args only; pybind method doesn't accept kwargs)
-                action_p2_dict = _convert_action(action_p2_array)
+                # Apply action (positional args only; pybind method doesn't accept kwargs)
                 game_control.set_player_movement(
                     p2_id,
                     bool(action_p2_dict['up']),
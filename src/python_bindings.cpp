@@ -16,6 +16,7 @@
 #include "Bullet.hpp"
 #include "Platform.hpp"
 #include "MovableObject.hpp"
+#include "RangedWeapon.hpp"
 
 namespace py = pybind11;
 
@@ -41,6 +42,18 @@ py::dict getPlayerState(Player* player) {
     
     state["facing_direction"] = static_cast<int>(player->getFacingDirection());
     
+    // Weapon state of the weapon the player currently fires with
+    if (auto* weapon = player->getActiveWeapon()) {
+        state["ammo"] = weapon->getAmmo();
+        state["max_ammo"] = weapon->getMaxAmmo();
+        auto* ranged = dynamic_cast<RangedWeapon*>(weapon);
+        state["is_reloading"] = ranged ? ranged->getIsReloading() : false;
+    } else {
+        state["ammo"] = 0;
+        state["max_ammo"] = 0;
+        state["is_reloading"] = false;
+    }
+    
     state["collider_x"] = rect.x;
     state["collider_y"] = rect.y;
     state["collider_w"] = rect.w;
@@ -146,6 +159,43 @@ public:
         return bullets;
     }
     
+    // Same data as getAllBullets, but as columns (one list per field) so
+    // Python can build NumPy arrays without iterating over per-bullet dicts
+    py::dict getBulletArrays() {
+        std::vector<float> xs, ys, dirXs, dirYs;
+        std::vector<std::string> ownerIds;
+        auto& gsm = _Game::Instance().getGameStateMachine();
+        auto& states = gsm.getGameStates();
+        
+        auto* currentState = states.empty() ? nullptr : dynamic_cast<PlayState*>(states.back());
+        
+        if (currentState) {
+            const auto& objectsMap = currentState->getLayeredGameObjectsMap();
+            auto it = objectsMap.find("bullets");
+            if (it != objectsMap.end()) {
+                for (const auto& [id, obj] : it->second) {
+                    auto* bullet = dynamic_cast<Bullet*>(obj.get());
+                    if (!bullet || bullet->isExpired()) continue;
+                    auto rect = bullet->getColliderRect();
+                    auto dir = bullet->getDirection();
+                    xs.push_back(rect.x);
+                    ys.push_back(rect.y);
+                    dirXs.push_back(dir.x);
+                    dirYs.push_back(dir.y);
+                    ownerIds.push_back(bullet->getPlayerId());
+                }
+            }
+        }
+        
+        py::dict arrays;
+        arrays["x"] = xs;
+        arrays["y"] = ys;
+        arrays["direction_x"] = dirXs;
+        arrays["direction_y"] = dirYs;
+        arrays["owner_id"] = ownerIds;
+        return arrays;
+    }
+    
     py::dict getAllPlatforms() {
         py::dict platforms;
         auto& gsm = _Game::Instance().getGameStateMachine();
@@ -295,6 +345,7 @@ PYBIND11_MODULE(gunmayhem, m) {
         .def(py::init<>())
         .def("get_all_players", &GameStateWrapper::getAllPlayers)
         .def("get_all_bullets", &GameStateWrapper::getAllBullets)
+        .def("get_bullet_arrays", &GameStateWrapper::getBulletArrays)
         .def("get_all_platforms", &GameStateWrapper::getAllPlatforms)
         .def("get_game_info", &GameStateWrapper::getGameInfo);
     
@@ -0,0 +1,23 @@
+"""CMA-ES checkpoints."""
+import numpy as np
+
+from ga.cma_trainer import CMAESTrainer
+from ga.fuzzy_genome import GENE_NAMES
+
+
+def _genes(genomes):
+    return np.array([[g.genes[k] for k in GENE_NAMES] for g in genomes])
+
+
+def test_checkpoint_restores_opponent_pool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    trainer = CMAESTrainer(seed=1, workers=1)
+    trainer.tell(trainer.ask(), np.arange(trainer.lam, dtype=float))
+    trainer.save_checkpoint()
+
+    resumed = CMAESTrainer(seed=2, workers=1)
+    assert not np.allclose(_genes(resumed.opponents), _genes(trainer.opponents))
+    resumed.load_checkpoint()
+    assert np.array_equal(_genes(resumed.opponents), _genes(trainer.opponents))
+    assert np.array_equal(resumed.mean, trainer.mean)
+    assert np.array_equal(resumed.ask(), trainer.ask())
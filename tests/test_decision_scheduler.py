@@ -0,0 +1,34 @@
+"""DecisionScheduler holding and per-match reset."""
+from decision_scheduler import DecisionScheduler
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+    def decide_action(self, me, enemy):
+        self.calls += 1
+        return {'up': False, 'left': self.calls % 2 == 1}
+
+
+def _state():
+    return {'x': 0, 'y': 400, 'health': 100, 'lives': 3}
+
+
+def test_reset_between_matches_drops_held_action_and_keeps_stats():
+    ai = DecisionScheduler(Counter(), interval=4)
+    for _ in range(3):
+        ai.decide_action(_state(), _state())
+    assert (ai.ai.calls, ai.frames) == (1, 3)
+
+    ai.reset(keep_stats=True)
+    ai.decide_action(_state(), _state())  # new match: decides at once
+    assert ai.ai.calls == 2 and ai.ai.resets == 2
+    assert (ai.frames, ai.decisions) == (4, 2)
+
+    ai.reset()
+    assert (ai.frames, ai.decisions) == (0, 0)
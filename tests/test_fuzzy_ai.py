@@ -0,0 +1,75 @@
+"""FuzzyAI / EvolvableFuzzyAI decision bookkeeping."""
+import pytest
+
+pytest.importorskip("skfuzzy")
+
+from fuzzy.fuzzy_ai import FuzzyAI
+from fuzzy.evolvable_fuzzy_ai import EvolvableFuzzyAI
+from ga.fuzzy_genome import FuzzyGenome
+
+GENES = FuzzyGenome().genes.copy()
+
+
+def _state(x, y, health):
+    return {'x': x, 'y': y, 'health': health, 'lives': 3, 'facing_direction': 1}
+
+
+@pytest.mark.parametrize("make_ai", [lambda: FuzzyAI(inference='analytic'),
+                                     lambda: EvolvableFuzzyAI(FuzzyGenome(GENES), inference='analytic')])
+def test_fuzzy_state_not_reused_after_health_change(make_ai):
+    ai = make_ai()
+    me, enemy = _state(300, 400, 100), _state(500, 400, 100)
+    ai.decide_action(me, enemy)
+    assert ai.get_fuzzy_state(me, enemy)['aggression'] == ai.last_fuzzy_state[1]
+
+    hit = _state(300, 400, 10)  # same positions, low health
+    fresh = make_ai().get_fuzzy_state(hit, enemy)
+    state = ai.get_fuzzy_state(hit, enemy)
+    assert state['aggression'] == pytest.approx(fresh['aggression'])
+    assert state['jump_desire'] == pytest.approx(fresh['jump_desire'])
+    assert state['aggression'] != pytest.approx(ai.last_fuzzy_state[1])
+
+
+def test_fallback_receives_platforms(monkeypatch):
+    import fuzzy.fuzzy_ai as fuzzy_ai
+    import fuzzy.evolvable_fuzzy_ai as evolvable_fuzzy_ai
+
+    seen = []
+
+    class Recorder(fuzzy_ai.SimpleFuzzyAI):
+        def decide_action(self, ai_state, enemy_state, platforms=None):
+            seen.append(platforms)
+            return super().decide_action(ai_state, enemy_state, platforms)
+
+    for module in (fuzzy_ai, evolvable_fuzzy_ai):
+        monkeypatch.setattr(module, 'FUZZY_AVAILABLE', False)
+        monkeypatch.setattr(module, 'SimpleFuzzyAI', Recorder)
+    platforms = {1: {'x': 0, 'y': 500, 'width': 800, 'height': 20}}
+    me, enemy = _state(300, 400, 100), _state(500, 400, 100)
+    FuzzyAI().decide_action(me, enemy, platforms)
+    EvolvableFuzzyAI(FuzzyGenome(GENES)).decide_action(me, enemy, platforms)
+    assert seen == [platforms, platforms]
+
+
+def test_evolvable_controllers_own_their_fuzzy_variables():
+    ai1 = EvolvableFuzzyAI(FuzzyGenome(GENES))
+    ai2 = EvolvableFuzzyAI(FuzzyGenome(GENES))
+    # Universes are shared read-only arrays; variables and simulations are
+    # per controller, so their per-simulation state goes away with it
+    assert ai1.distance.universe is ai2.distance.universe
+    assert ai1.distance is not ai2.distance
+    assert ai1.aggression_ctrl is not ai2.aggression_ctrl
+    me, enemy = _state(300, 400, 100), _state(500, 400, 100)
+    assert ai1.get_fuzzy_state(me, enemy) == ai2.get_fuzzy_state(me, enemy)
+
+
+def test_evolvable_skfuzzy_objects_are_built_on_first_use():
+    me, enemy = _state(300, 400, 100), _state(500, 400, 100)
+    batched = EvolvableFuzzyAI(FuzzyGenome(GENES), inference='analytic')
+    batched.decide_action(me, enemy, fuzzy_outputs=(50.0, 50.0))
+    assert 'aggression_sim' not in vars(batched)
+
+    ai = EvolvableFuzzyAI(FuzzyGenome(GENES))
+    assert 'aggression_sim' not in vars(ai)
+    ai.decide_action(me, enemy)
+    assert 'aggression_sim' in vars(ai) and 'jump_sim' in vars(ai)
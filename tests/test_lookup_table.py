@@ -0,0 +1,50 @@
+"""Lookup-table surfaces and the shared rule base against scikit-fuzzy."""
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("skfuzzy")
+
+from fuzzy.fuzzy_ai import FuzzyAI
+from fuzzy.evolvable_fuzzy_ai import EvolvableFuzzyAI
+from fuzzy.lookup_table import ERROR_TOLERANCE, compile_surfaces, evaluate_rules, within_tolerance
+from fuzzy.rule_base import AGGRESSION_INPUTS, AGGRESSION_RULES, JUMP_INPUTS, JUMP_RULES
+from ga.fuzzy_genome import FuzzyGenome
+
+
+def _seeded_genome(seed):
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        return FuzzyGenome()
+    finally:
+        random.setstate(state)
+
+
+# Fixed genomes: random ones can have a faint-rule corner beyond the max bound (see ERROR_TOLERANCE)
+@pytest.mark.parametrize("make_ai", [FuzzyAI, lambda: EvolvableFuzzyAI(_seeded_genome(0))])
+def test_surfaces_within_tolerance(make_ai):
+    surfaces = compile_surfaces(make_ai(), error_samples=300)
+    for name, surface in surfaces.items():
+        assert within_tolerance(surface), (name, surface.max_error, surface.p99_error, ERROR_TOLERANCE)
+
+
+def test_controller_rules_match_rule_base():
+    ai = FuzzyAI()
+    rng = np.random.default_rng(1)
+    for output_name, names, rules, sim in (('aggression', AGGRESSION_INPUTS, AGGRESSION_RULES, ai.aggression_sim),
+                                           ('should_jump', JUMP_INPUTS, JUMP_RULES, ai.jump_sim)):
+        lows = [getattr(ai, n).universe.min() for n in names]
+        highs = [getattr(ai, n).universe.max() for n in names]
+        points = rng.uniform(lows, highs, size=(50, 3))
+        vectorized = evaluate_rules(ai, output_name, rules, {n: points[:, i] for i, n in enumerate(names)})
+        for point, expected in zip(points, vectorized):
+            for name, value in zip(names, point):
+                sim.input[name] = value
+            try:
+                sim.compute()
+                exact = sim.output[output_name]
+            except Exception:
+                continue  # no rule fired
+            assert exact == pytest.approx(expected, abs=0.1)
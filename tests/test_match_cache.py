@@ -0,0 +1,44 @@
+"""MatchCache keys and round trips."""
+import sqlite3
+
+from ga.match_cache import MatchCache
+
+A, B = 'a' * 40, 'b' * 40  # A < B: A is genome_a of the sorted key
+
+
+def test_store_lookup_round_trip(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = MatchCache(path, engine='test')
+    a_first = ('player1', {'p1_health': 80.0, 'p2_health': 0.0, 'shots1': 5, 'shots2': 2})
+    b_first = ('player2', {'p1_health': 10.0, 'p2_health': 60.0, 'shots1': 1, 'shots2': 7})
+    cache.store([(A, B, 1200, a_first), (B, A, 1200, b_first), (A, B, 600, ('draw', {}))])
+
+    # Both orders of the pair are stored under the same sorted hashes with a
+    # different side, each with stats as seen from its own player1
+    assert cache.lookup(A, B, 1200) == a_first
+    assert cache.lookup(B, A, 1200) == b_first
+    assert len(cache) == 2  # failed (empty-stats) matches are not stored
+    assert cache.lookup(A, B, 600) is None
+    assert cache.take_stats() == {'cache_hits': 2, 'cache_misses': 1, 'cache_hit_rate': 2 / 3}
+    cache.close()
+
+    reopened = MatchCache(path, engine='test')
+    assert reopened.lookup(B, A, 1200) == b_first
+    assert MatchCache(path, engine='rebuilt').lookup(B, A, 1200) is None
+    reopened.close()
+
+
+def test_old_key_layout_starts_over(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE matches (genome_a TEXT, genome_b TEXT, side INTEGER, seed INTEGER,"
+               " max_frames INTEGER, engine TEXT, winner TEXT, stats TEXT)")
+    db.execute("INSERT INTO matches VALUES (?, ?, 0, 7, 1200, 'test', 'player1', '{}')", (A, B))
+    db.commit()
+    db.close()
+
+    cache = MatchCache(path, engine='test')
+    assert len(cache) == 0
+    cache.store([(A, B, 1200, ('player1', {'shots1': 1}))])
+    assert cache.lookup(A, B, 1200) == ('player1', {'shots1': 1})
+    cache.close()
@@ -0,0 +1,45 @@
+"""Round-robin match plans and player2's view of a result."""
+import random
+from collections import Counter
+
+import pytest
+
+from ga.match_schedule import SIDE_KEYS, round_robin, swap_sides
+
+
+@pytest.mark.parametrize("size,k", [(2, 1), (3, 1), (5, 2), (7, 3), (8, 4), (10, 3), (13, 5), (20, 4), (4, 10), (9, 8)])
+@pytest.mark.parametrize("seed", range(5))
+def test_round_robin_balance(size, k, seed):
+    plan = round_robin(size, k, random.Random(seed))
+    k = min(k, size - 1)
+    pairs = [frozenset(p) for p in plan]
+    assert all(a != b for a, b in plan)
+    assert len(set(pairs)) == len(plan)  # no pairing twice, in either order
+
+    matches = Counter(i for p in plan for i in p)
+    assert all(k <= matches[i] <= k + 1 for i in range(size))
+    assert sum(matches[i] - k for i in range(size)) == (size * k) % 2
+    assert len(plan) == (size * k + 1) // 2
+
+    p1 = Counter(a for a, _ in plan)
+    p2 = Counter(b for _, b in plan)
+    assert all(abs(p1[i] - p2[i]) <= 1 for i in range(size))
+
+
+def test_round_robin_degenerate_sizes():
+    assert round_robin(1, 3) == []
+    assert round_robin(5, 0) == []
+    assert round_robin(2, 3, random.Random(0)) in ([(0, 1)], [(1, 0)])
+
+
+def test_swap_sides_exchanges_every_side_key():
+    stats = {'p1_health': 80.0, 'p2_health': 10.0, 'shots1': 6, 'shots2': 2,
+             'frames': 900, 'winner_health': 80.0}
+    winner, swapped = swap_sides(('player1', stats))
+    assert winner == 'player2'
+    for key1, key2 in SIDE_KEYS:
+        assert (swapped[key1], swapped[key2]) == (stats[key2], stats[key1])
+    assert swapped['frames'] == 900 and swapped['winner_health'] == 80.0
+    assert stats['p1_health'] == 80.0  # input untouched
+    assert swap_sides(('draw', {}))[0] == 'draw'
+    assert swap_sides(swap_sides(('player2', stats))) == ('player2', stats)
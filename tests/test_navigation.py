@@ -0,0 +1,31 @@
+"""navigation_graph() caching: one graph per map, no re-parse per frame."""
+import json
+
+from navigation import GAME_CONFIG, NavigationGraph, navigation_graph
+
+
+def _game_state_platforms():
+    with open(GAME_CONFIG) as f:
+        config = json.load(f)
+    return {p['id']: {'x': p['x'], 'y': p['y'], 'width': p['w']}
+            for p in config['maps']['map1']['platforms']}
+
+
+def test_graph_is_resolved_once_per_map():
+    platforms = _game_state_platforms()
+    graph = navigation_graph(platforms)
+    assert isinstance(graph, NavigationGraph)
+    assert navigation_graph(platforms) is graph
+    assert navigation_graph(_game_state_platforms()) is graph  # equal map, new dict
+    assert navigation_graph(graph) is graph
+
+
+def test_changed_platforms_get_their_own_graph():
+    platforms = _game_state_platforms()
+    graph = navigation_graph(platforms)
+    moved = _game_state_platforms()
+    first = next(iter(moved))
+    moved[first] = dict(moved[first], y=moved[first]['y'] - 40)
+    other = navigation_graph(moved)
+    assert other is not graph
+    assert navigation_graph(platforms) is graph
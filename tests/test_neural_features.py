@@ -0,0 +1,34 @@
+"""One feature layout for NeuralAI, the batched controllers and MARL observations."""
+import numpy as np
+
+from feature_extraction import get_observation
+from ga.neural_genome import NeuralGenome
+from nn.neural_ai import NeuralAI
+from nn.population import BatchedNeuralControllers, PopulationInference, features_batch
+
+
+def _states(rng, n):
+    return [{'x': float(rng.uniform(0, 1280)), 'y': float(rng.uniform(0, 720)),
+             'health': float(rng.uniform(0, 100)), 'lives': int(rng.integers(0, 4)),
+             'facing_direction': int(rng.integers(0, 2))} for _ in range(n)]
+
+
+def test_feature_layouts_agree():
+    rng = np.random.default_rng(0)
+    mes, enemies = _states(rng, 32), _states(rng, 32)
+    ai = NeuralAI(NeuralGenome(rng=rng))
+    batch = features_batch(mes, enemies)
+    for row, me, enemy in zip(batch, mes, enemies):
+        assert np.array_equal(row, ai._features(me, enemy))
+        assert np.allclose(row, get_observation(me, enemy), atol=1e-6)
+
+
+def test_batched_controllers_match_neural_ai():
+    rng = np.random.default_rng(1)
+    population = [NeuralGenome(rng=rng) for _ in range(4)]
+    bots = BatchedNeuralControllers(PopulationInference(population), range(4))
+    singles = [NeuralAI(g) for g in population]
+    for _ in range(20):
+        mes, enemies = _states(rng, 4), _states(rng, 4)
+        batched = bots.decide_actions(mes, enemies)
+        assert batched == [ai.decide_action(me, enemy) for ai, me, enemy in zip(singles, mes, enemies)]
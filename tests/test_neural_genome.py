@@ -0,0 +1,33 @@
+"""NeuralGenome save/load in both file formats."""
+import numpy as np
+import pytest
+
+from ga.neural_genome import TOTAL_GENES, NeuralGenome
+
+
+def test_json_and_binary_load_the_same_genome(tmp_path):
+    genome = NeuralGenome(rng=np.random.default_rng(3))
+    genome.mutate(mutation_rate=1.0, sigma=0.37)  # values with full float32 mantissas
+    genome.fitness, genome.wins, genome.losses, genome.matches_played = 61.25, 4, 2, 7
+
+    genome.save(str(tmp_path / 'g.json'))
+    genome.save(str(tmp_path / 'g.bin'))
+    from_json = NeuralGenome.load(str(tmp_path / 'g.json'))
+    from_bin = NeuralGenome.load(str(tmp_path / 'g.bin'))
+
+    for loaded in (from_json, from_bin):
+        assert loaded.genes.dtype == np.float32
+        assert np.array_equal(loaded.genes, genome.genes)
+        assert loaded.content_hash() == genome.content_hash()
+        assert (loaded.fitness, loaded.wins, loaded.losses, loaded.matches_played) == (61.25, 4, 2, 7)
+    assert (tmp_path / 'g.bin').stat().st_size == 30 + 4 * TOTAL_GENES == 1270
+    # Loaded genes are owned copies, not views of the file buffer
+    from_bin.mutate(mutation_rate=1.0)
+    assert not np.array_equal(from_bin.genes, genome.genes)
+
+
+def test_binary_rejects_other_files(tmp_path):
+    path = tmp_path / 'bad.bin'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        NeuralGenome.load(str(path))
@@ -0,0 +1,32 @@
+"""Scalar and array membership math of fuzzy/rule_base.py, and the backends built on it."""
+import numpy as np
+
+from fuzzy.analytic import AnalyticInference
+from fuzzy.batched import BatchedFuzzyInference
+from fuzzy.evolvable_fuzzy_ai import membership_params
+from fuzzy.rule_base import UNIVERSES, sampled_membership, sampled_trimf
+from ga.fuzzy_genome import FuzzyGenome
+
+
+def test_scalar_membership_matches_array():
+    params = membership_params(FuzzyGenome().genes)
+    rng = np.random.default_rng(0)
+    for (var, term), abc in params.items():
+        low, high = UNIVERSES[var]
+        xs = np.concatenate([rng.uniform(low - 50, high + 50, 200), np.asarray(abc, dtype=np.float64)])
+        expected = sampled_trimf(xs, *abc, low, high)
+        actual = [sampled_membership(float(x), abc, low, high) for x in xs]
+        np.testing.assert_allclose(actual, expected, atol=1e-12, err_msg=f"{var}.{term}")
+
+
+def test_analytic_matches_batched():
+    genome = FuzzyGenome()
+    analytic = AnalyticInference(membership_params(genome.genes))
+    batched = BatchedFuzzyInference([genome])
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        distance, height_diff = rng.uniform(0, 1300), rng.uniform(-400, 400)
+        health, enemy_health = rng.uniform(0, 100, 2)
+        aggression, jump_desire = batched.compute(distance, height_diff, health, enemy_health)
+        assert abs(analytic.aggression(distance, health, enemy_health) - aggression[0]) < 0.1
+        assert abs(analytic.jump_desire(height_diff, health, distance) - jump_desire[0]) < 0.1
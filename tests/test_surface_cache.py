@@ -0,0 +1,31 @@
+"""Surface cache keys follow the rule base the controllers are built from."""
+import pytest
+
+from fuzzy import rule_base
+from fuzzy.fuzzy_ai import MEMBERSHIP_PARAMS
+from fuzzy.surface_cache import cache_key, rule_base_fingerprint
+
+
+def test_fingerprint_changes_with_universes(monkeypatch):
+    fingerprint, key = rule_base_fingerprint(), cache_key(MEMBERSHIP_PARAMS)
+    monkeypatch.setitem(rule_base.UNIVERSES, 'distance', (0, 1400))
+    assert rule_base_fingerprint() != fingerprint
+    assert cache_key(MEMBERSHIP_PARAMS) != key
+
+
+def test_fingerprint_changes_with_rules():
+    before = rule_base_fingerprint()
+    rule_base.JUMP_RULES.append(([('health', 'high')], 'no'))
+    try:
+        assert rule_base_fingerprint() != before
+    finally:
+        rule_base.JUMP_RULES.pop()
+
+
+def test_controllers_use_rule_base_universes():
+    pytest.importorskip("skfuzzy")
+    from fuzzy.fuzzy_ai import FuzzyAI
+    ai = FuzzyAI()
+    for name, (low, high) in rule_base.UNIVERSES.items():
+        universe = getattr(ai, name).universe
+        assert (universe[0], universe[-1]) == (low, high)
@@ -0,0 +1,147 @@
+"""
+Vectorized bullet threat assessment and dodge selection.
+
+For P players and B live bullets (GameState.get_bullet_arrays(), see
+feature_extraction.bullet_arrays) everything is computed as (P, B) or
+(actions, P, B) NumPy arrays, so the cost stays flat at dozens of bullets
+per frame instead of looping over get_all_bullets() dicts:
+
+- time to impact of every bullet that is not the player's own, is moving
+  towards them and whose path crosses their collider (bullets fly straight
+  at BULLET_SPEED)
+- for each dodge action (stay, left, right, jump, jump+left, jump+right) the
+  player's displacement at each impact time from the movement physics
+  (navigation.py constants), and which bullets would still hit
+- the dodge with the fewest urgency-weighted hits (ties prefer smaller moves)
+
+Use it from any loop with apply_dodge(), pass bullets= to FuzzyAI /
+EvolvableFuzzyAI.decide_action(), or add threat_features() to NN inputs
+(get_threat_observation()).
+
+Usage:
+    threats = assess([p1, p2], game_state.get_bullet_arrays())
+    a1 = apply_dodge(a1, threats, 0)
+"""
+from collections import namedtuple
+from typing import Dict, Sequence
+
+import numpy as np
+
+from feature_extraction import (
+    BULLET_HEIGHT, BULLET_SPEED, BulletArrays, bullet_arrays, get_extended_observation,
+)
+from navigation import GRAVITY, JUMP_SPEED, PLAYER_HEIGHT, X_SPEED
+
+PLAYER_WIDTH = 10.0
+HORIZON = 0.5          # s; bullets arriving later are ignored
+DODGE_WINDOW = 0.25    # s; controllers only dodge bullets closer than this
+URGENCY_EPS = 0.05     # s; weight of a hit = 1 / (time to impact + eps)
+
+DODGE_ACTIONS = ('stay', 'left', 'right', 'jump', 'jump_left', 'jump_right')
+STAY = 0
+_DODGE_VX = np.array([0.0, -X_SPEED, X_SPEED, 0.0, -X_SPEED, X_SPEED])[:, None, None]
+_DODGE_JUMP = np.array([0.0, 0.0, 0.0, 1.0, 1.0, 1.0])[:, None, None]
+# Tie-break: prefer not moving, then walking, then jumping
+_DODGE_PREFERENCE = np.array([0.0, 1e-3, 1e-3, 2e-3, 3e-3, 3e-3])[:, None]
+
+THREAT_FEATURES = 4  # see threat_features()
+
+Threats = namedtuple('Threats', ['time_to_impact', 'incoming', 'danger', 'dodge', 'scores'])
+
+
+def _player_arrays(players: Sequence[Dict]):
+    w = np.array([p.get('width', PLAYER_WIDTH) for p in players], dtype=np.float32)
+    h = np.array([p.get('height', PLAYER_HEIGHT) for p in players], dtype=np.float32)
+    cx = np.array([p['x'] for p in players], dtype=np.float32) + 0.5 * w
+    cy = np.array([p['y'] for p in players], dtype=np.float32) + 0.5 * h
+    ids = np.array([str(p.get('id', '')) for p in players], dtype=str)
+    return cx, cy, w, h, ids
+
+
+def assess(players: Sequence[Dict], bullets, horizon: float = HORIZON) -> Threats:
+    """
+    Threats to each player from all bullets.
+
+    Args:
+        players: Player state dicts (x, y, id; width/height optional)
+        bullets: BulletArrays or anything feature_extraction.bullet_arrays() accepts
+
+    Returns:
+        Threats of (P,) arrays: time_to_impact (inf if none), incoming (count),
+        danger (0..1, 1 = impact now), dodge (index into DODGE_ACTIONS);
+        scores is (len(DODGE_ACTIONS), P) weighted hits per action
+    """
+    if not isinstance(bullets, BulletArrays):
+        bullets = bullet_arrays(bullets)
+    n = len(players)
+    cx, cy, w, h, ids = _player_arrays(players)
+    if bullets.x.size == 0 or n == 0:
+        zeros = np.zeros(n, dtype=np.float32)
+        return Threats(np.full(n, np.inf, dtype=np.float32), np.zeros(n, dtype=np.int32),
+                       zeros, np.zeros(n, dtype=np.int64), np.zeros((len(DODGE_ACTIONS), n), dtype=np.float32))
+
+    bdx, bdy = bullets.direction_x[None, :], bullets.direction_y[None, :]
+    rx = cx[:, None] - bullets.x[None, :]                      # (P, B)
+    ry = cy[:, None] - bullets.y[None, :]
+    tti = (rx * bdx + ry * bdy) / BULLET_SPEED
+    half_extent = 0.5 * (h[:, None] + BULLET_HEIGHT) * np.abs(bdx) + \
+                  0.5 * (w[:, None] + BULLET_HEIGHT) * np.abs(bdy)
+    live = (bullets.owner_id[None, :] != ids[:, None]) & (tti >= 0.0) & (tti <= horizon)
+
+    # Player displacement at each impact time for every dodge action: (A, P, B)
+    t = np.where(live, tti, 0.0)[None, :, :]
+    sx = _DODGE_VX * t
+    sy = -_DODGE_JUMP * (JUMP_SPEED * t - 0.5 * GRAVITY * t * t)
+    across = np.abs((rx + sx) * bdy - (ry + sy) * bdx)
+    along = (rx + sx) * bdx + (ry + sy) * bdy
+    hits = live[None] & (across <= half_extent[None]) & (along >= 0.0)
+
+    weight = 1.0 / (tti + URGENCY_EPS)
+    scores = np.where(hits, weight[None], 0.0).sum(axis=-1)    # (A, P)
+    dodge = np.argmin(scores + _DODGE_PREFERENCE, axis=0)
+    dodge = np.where(scores[STAY] > 0.0, dodge, STAY)
+
+    stay_hits = hits[STAY]
+    time_to_impact = np.where(stay_hits, tti, np.inf).min(axis=1)
+    danger = np.where(np.isfinite(time_to_impact), 1.0 - np.minimum(time_to_impact, horizon) / horizon, 0.0)
+    return Threats(time_to_impact.astype(np.float32), stay_hits.sum(axis=1).astype(np.int32),
+                   danger.astype(np.float32), dodge, scores.astype(np.float32))
+
+
+def apply_dodge(actions: Dict[str, bool], threats: Threats, index: int = 0,
+                window: float = DODGE_WINDOW) -> Dict[str, bool]:
+    """Override movement of a controller's actions with player `index`'s dodge when a hit is imminent."""
+    dodge = DODGE_ACTIONS[int(threats.dodge[index])]
+    if dodge == 'stay' or threats.time_to_impact[index] > window:
+        return actions
+    actions = dict(actions)
+    if 'jump' in dodge:
+        actions['up'] = True
+    if dodge.endswith('left'):
+        actions['left'], actions['right'] = True, False
+    elif dodge.endswith('right'):
+        actions['left'], actions['right'] = False, True
+    return actions
+
+
+def threat_features(threats: Threats, index: int = 0) -> np.ndarray:
+    """
+    Fixed-size NN inputs for player `index`:
+    [time to impact / HORIZON (1 = none), danger, dodge x direction (-1/0/1), dodge jumps (0/1)]
+    """
+    dodge = DODGE_ACTIONS[int(threats.dodge[index])]
+    tti = threats.time_to_impact[index]
+    return np.array([
+        min(float(tti), HORIZON) / HORIZON,
+        float(threats.danger[index]),
+        -1.0 if dodge.endswith('left') else (1.0 if dodge.endswith('right') else 0.0),
+        1.0 if 'jump' in dodge else 0.0,
+    ], dtype=np.float32)
+
+
+def get_threat_observation(me: Dict, enemy: Dict, bullets) -> np.ndarray:
+    """feature_extraction.get_extended_observation() followed by threat_features()."""
+    if not isinstance(bullets, BulletArrays):
+        bullets = bullet_arrays(bullets)
+    return np.concatenate([get_extended_observation(me, enemy, bullets),
+                           threat_features(assess([me], bullets))])
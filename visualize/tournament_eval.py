@@ -2,7 +2,7 @@
 Tournament evaluation among three bots:
 - fuzzy (baseline FuzzyAI)
 - fuzzy_ga (EvolvableFuzzyAI using evolved_genomes/best_genome.json)
-- marl (SB3 PPO policy from models_marl/best_opponent.zip)
+- marl (PPO policy from models_marl/best_opponent, NumPy export if available)
 
 Each pair plays N matches (default 5) headless. Results are saved to visualize/tournament_results/ as JSON.
 
@@ -37,17 +37,25 @@ if sys.version_info >= (3, 8):
 import argparse
 import gunmayhem
 
-from fuzzy.fuzzy_ai import FuzzyAI, SimpleFuzzyAI, FUZZY_AVAILABLE
+from fuzzy.fuzzy_ai import FuzzyAI, SimpleFuzzyAI, FUZZY_AVAILABLE, INFERENCE_BACKENDS
 from fuzzy.evolvable_fuzzy_ai import EvolvableFuzzyAI
 from ga.fuzzy_genome import FuzzyGenome
-from stable_baselines3 import PPO
-from feature_extraction import get_observation
+from nn.marl_policy_ai import MarlPolicyAI
+from memoization import memoize_controller, memo_stats, format_stats
+from decision_scheduler import DecisionScheduler
+from threat_assessment import apply_dodge, assess
 
 
-def make_ai(kind: str):
+class PassiveAI:
+    """Fallback when no MARL model is available: does nothing."""
+    def decide_action(self, me: Dict, enemy: Dict) -> Dict:
+        return {'up': False, 'left': False, 'down': False, 'right': False, 'primaryFire': False, 'secondaryFire': False}
+
+
+def make_ai(kind: str, fuzzy_inference: str = 'skfuzzy'):
     kind = kind.lower()
     if kind == "fuzzy":
-        return FuzzyAI() if FUZZY_AVAILABLE else SimpleFuzzyAI()
+        return FuzzyAI(inference=fuzzy_inference) if FUZZY_AVAILABLE else SimpleFuzzyAI()
     if kind == "fuzzy_ga":
         # Try to load evolved genome
         path = os.path.join(PROJECT_ROOT, "evolved_genomes", "best_genome.json")
@@ -55,40 +63,26 @@ def make_ai(kind: str):
             g = FuzzyGenome.load(path)
         except Exception:
             g = FuzzyGenome()
-        return EvolvableFuzzyAI(g)
+        return EvolvableFuzzyAI(g, inference=fuzzy_inference)
     if kind == "marl":
         model_path = os.path.join(PROJECT_ROOT, "models_marl", "best_opponent")
+        if os.path.exists(model_path + ".npz"):
+            return MarlPolicyAI.load(model_path + ".npz")
         try:
-            model = PPO.load(model_path)
+            # No NumPy export yet: load SB3 once and convert in memory
+            from stable_baselines3 import PPO
+            return MarlPolicyAI.from_sb3(PPO.load(model_path))
         except Exception:
-            model = None
-
-        class MarlPolicyAI:
-            def __init__(self, m):
-                self.model = m
-            def _convert_action(self, arr) -> Dict:
-                return {
-                    'up': bool(arr[0]),
-                    'left': bool(arr[1]),
-                    'down': bool(arr[2]),
-                    'right': bool(arr[3]),
-                    'primaryFire': bool(arr[4]),
-                    'secondaryFire': bool(arr[5]),
-                }
-            def decide_action(self, me: Dict, enemy: Dict) -> Dict:
-                if self.model is None:
-                    # Fallback: passive actions
-                    return {'up': False, 'left': False, 'down': False, 'right': False, 'primaryFire': False, 'secondaryFire': False}
-                obs = get_observation(me, enemy)
-                action_arr, _ = self.model.predict(obs, deterministic=True)
-                return self._convert_action(action_arr)
-
-        return MarlPolicyAI(model)
+            return PassiveAI()
     raise ValueError(f"Unknown AI kind: {kind}")
 
 
-def play_match(ai1, ai2, max_frames=1200, render=False) -> Tuple[str, Dict]:
-    """Run one headless match between two AIs. Returns (winner, stats)."""
+def play_match(ai1, ai2, max_frames=1200, render=False, dodge=False) -> Tuple[str, Dict]:
+    """
+    Run one headless match between two AIs. Returns (winner, stats).
+    
+    dodge=True overrides both AIs' movement with threat_assessment dodges when a bullet is about to hit.
+    """
     build_dir = os.path.join(PROJECT_ROOT, 'build')
     os.makedirs(build_dir, exist_ok=True)
     original_dir = os.getcwd()
@@ -150,6 +144,10 @@ def play_match(ai1, ai2, max_frames=1200, render=False) -> Tuple[str, Dict]:
                 # Decide actions
                 a1 = ai1.decide_action(p1, p2)
                 a2 = ai2.decide_action(p2, p1)
+                if dodge:
+                    threats = assess([p1, p2], game_state.get_bullet_arrays())
+                    a1 = apply_dodge(a1, threats, 0)
+                    a2 = apply_dodge(a2, threats, 1)
                 if a1.get('primaryFire'): shots1 += 1
                 if a2.get('primaryFire'): shots2 += 1
 
@@ -208,23 +206,37 @@ def play_match(ai1, ai2, max_frames=1200, render=False) -> Tuple[str, Dict]:
         return 'draw', {'error': str(e)}
 
 
-def run_pair(name1: str, name2: str, matches: int, render=False, alternate_sides: bool = True):
-    ai1 = make_ai(name1)
-    ai2 = make_ai(name2)
+def run_pair(name1: str, name2: str, matches: int, render=False, alternate_sides: bool = True,
+             fuzzy_inference: str = 'skfuzzy', memoize: bool = False, decision_interval: int = 1,
+             dodge: bool = False):
+    ai1 = make_ai(name1, fuzzy_inference)
+    ai2 = make_ai(name2, fuzzy_inference)
+    if memoize:
+        memoize_controller(ai1)
+        memoize_controller(ai2)
+    if decision_interval > 1:
+        ai1 = DecisionScheduler(ai1, decision_interval)
+        ai2 = DecisionScheduler(ai2, decision_interval)
     results = []
     p1_wins = p2_wins = draws = 0
     for i in range(matches):
+        # Fresh held actions / jump state each match; schedule stats add up over the pair
+        for ai in (ai1, ai2):
+            if isinstance(ai, DecisionScheduler):
+                ai.reset(keep_stats=True)
+            elif hasattr(ai, 'reset'):
+                ai.reset()
         # Alternate sides by swapping AI roles every other match (unless disabled)
         if (i % 2 == 0) or (not alternate_sides):
             # ai1 takes Player1 side, ai2 takes Player2 side
-            winner, stats = play_match(ai1, ai2, render=render)
+            winner, stats = play_match(ai1, ai2, render=render, dodge=dodge)
             winner_side = 'p1' if winner == 'ai1' else ('p2' if winner == 'ai2' else 'none')
             mapped_winner = winner  # already in identity space (ai1 vs ai2)
             p1_ai_id, p2_ai_id = 'ai1', 'ai2'
             p1_name, p2_name = name1, name2
         else:
             # ai2 takes Player1 side, ai1 takes Player2 side
-            winner, stats = play_match(ai2, ai1, render=render)
+            winner, stats = play_match(ai2, ai1, render=render, dodge=dodge)
             winner_side = 'p1' if winner == 'ai1' else ('p2' if winner == 'ai2' else 'none')
             # Map back to identity space: match-level 'ai1' corresponds to identity 'ai2' here
             if winner == 'ai1':
@@ -250,6 +262,12 @@ def run_pair(name1: str, name2: str, matches: int, render=False, alternate_sides
             'p2_name': p2_name,
             'stats': stats,
         })
+    if memoize:
+        for name, ai in ((name1, ai1), (name2, ai2)):
+            print(f"  [memo] {name}: " + format_stats(ai).replace("\n", "\n  [memo] " + name + ": "))
+    if decision_interval > 1:
+        for name, ai in ((name1, ai1), (name2, ai2)):
+            print(f"  [schedule] {name}: {ai.format_stats()}")
     return {
         'pair': f"{name1}_vs_{name2}",
         'p1': name1,
@@ -259,16 +277,36 @@ def run_pair(name1: str, name2: str, matches: int, render=False, alternate_sides
             'p1_wins': p1_wins,
             'p2_wins': p2_wins,
             'draws': draws,
-        }
+        },
+        'memo': {name1: memo_stats(ai1), name2: memo_stats(ai2)} if memoize else None,
+        'decision_interval': decision_interval,
+        'schedule': {name1: ai1.stats(), name2: ai2.stats()} if decision_interval > 1 else None,
     }
 
 
+def win_rate(pair: Dict) -> float:
+    """Share of decided matches won by the pair's first AI (draws count half)."""
+    s = pair['summary']
+    total = s['p1_wins'] + s['p2_wins'] + s['draws']
+    return (s['p1_wins'] + 0.5 * s['draws']) / total if total else 0.0
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run tournament among fuzzy, fuzzy_ga, nn")
     parser.add_argument('--matches', type=int, default=5, help='Matches per pair')
     parser.add_argument('--render', action='store_true', help='Render matches (slower)')
     parser.add_argument('--show-summary', action='store_true', help='Print summary to console')
     parser.add_argument('--fixed-sides', action='store_true', help='Do not alternate sides between matches (ai1 always P1)')
+    parser.add_argument('--fuzzy-inference', choices=INFERENCE_BACKENDS, default='skfuzzy',
+                        help='Fuzzy inference backend (analytic/lut are much faster than skfuzzy)')
+    parser.add_argument('--memoize', action='store_true',
+                        help='Cache controller inference on quantized inputs (see memoization.py)')
+    parser.add_argument('--decision-interval', type=int, default=1,
+                        help='Query controllers every k frames and hold actions in between (see decision_scheduler.py)')
+    parser.add_argument('--dodge', action='store_true',
+                        help='Let every bot dodge imminent bullets (see threat_assessment.py)')
+    parser.add_argument('--compare-interval', action='store_true',
+                        help='Also run every pair at 60 Hz and report the win-rate change of --decision-interval')
     args = parser.parse_args()
 
     pairs = [
@@ -281,13 +319,23 @@ def main():
         'timestamp': datetime.now().isoformat(timespec='seconds'),
         'matches_per_pair': args.matches,
         'alternate_sides': (not args.fixed_sides),
+        'decision_interval': args.decision_interval,
         'pairs': []
     }
 
     print("\n=== Running tournament ===")
     for p1, p2 in pairs:
         print(f"- {p1} vs {p2} ({args.matches} matches)")
-        res = run_pair(p1, p2, args.matches, render=args.render, alternate_sides=(not args.fixed_sides))
+        res = run_pair(p1, p2, args.matches, render=args.render, alternate_sides=(not args.fixed_sides),
+                       fuzzy_inference=args.fuzzy_inference, memoize=args.memoize,
+                       decision_interval=args.decision_interval, dodge=args.dodge)
+        if args.compare_interval and args.decision_interval > 1:
+            baseline = run_pair(p1, p2, args.matches, render=args.render, alternate_sides=(not args.fixed_sides),
+                                fuzzy_inference=args.fuzzy_inference, memoize=args.memoize, dodge=args.dodge)
+            res['baseline_summary'] = baseline['summary']
+            res['win_rate_change'] = win_rate(res) - win_rate(baseline)
+            print(f"  {p1} win rate at 1/{args.decision_interval} frames: {win_rate(res):.0%} "
+                  f"(60 Hz: {win_rate(baseline):.0%}, change {res['win_rate_change']:+.0%})")
         all_results['pairs'].append(res)
 
     # Save results